@@ -0,0 +1,700 @@
+"""Performance benchmarks for the Watalappam Business Manager.
+
+Run all benchmarks with ``python benchmarks.py`` or pick some by name, for
+example ``python benchmarks.py formatting``.
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from order_store import COLUMNS
+
+
+DASHBOARD_GROWTH_BUDGET_MB = 5.0  # over 200 dashboard opens, after warm-up
+FIRST_PAINT_BUDGET_S = 2.0  # app start to a drawn window, whatever the order count
+IMPORT_BUDGET_S = 0.5  # importing the app and the CLI, before any window or data
+# Modules only the dashboard, exports and receipts need, loaded on first use
+HEAVY_MODULES = ("numpy", "pandas", "matplotlib", "mplcursors", "PIL")
+
+
+def synthetic_orders(count, seed=0):
+    """Return a DataFrame of ``count`` random orders spread over two years."""
+    rng = np.random.default_rng(seed)
+    dates = pd.Timestamp("2025-01-01") + pd.to_timedelta(
+        np.sort(rng.integers(0, 730, count)), unit="D"
+    )
+    qty_500g = rng.integers(0, 5, count)
+    qty_1kg = rng.integers(0, 3, count)
+    items = [
+        {product_id: quantity for product_id, quantity in (("500g", small), ("1kg", large)) if quantity}
+        for small, large in zip(qty_500g.tolist(), qty_1kg.tolist())
+    ]
+    return pd.DataFrame(
+        {
+            "Order No": [f"{i:08x}" for i in range(count)],
+            "Date": dates.strftime("%Y-%m-%d"),
+            "Customer Name": [f"Customer {i % 5000}" for i in range(count)],
+            "Phone Number": rng.integers(700000000, 779999999, count),
+            "Address": [f"{i % 300} Main Street" for i in range(count)],
+            "Items": items,
+            "Total": (qty_500g * 500 + qty_1kg * 1000).astype(float),
+            "Status": rng.choice(["Pending", "In Progress", "Completed"], count),
+        },
+        columns=COLUMNS,
+    )
+
+
+def timed(func, *args, repeat=3):
+    """Return the best wall-clock time of ``repeat`` calls, in seconds."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(*args)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def _iterrows_rows(df):
+    # The per-row loop that load_recent_orders used before display_rows
+    from catalog import items_text
+
+    rows = []
+    for index, row in df.iterrows():
+        try:
+            phone = int(row["Phone Number"])
+            phone_str = f"{phone:010d}"
+        except (ValueError, TypeError):
+            phone_str = "Invalid"
+        rows.append(
+            (
+                row["Order No"],
+                row["Date"],
+                row["Customer Name"],
+                phone_str,
+                row["Address"],
+                items_text(row["Items"]),
+                row["Total"],
+                row["Status"],
+            )
+        )
+    return rows
+
+
+def bench_formatting():
+    """Row formatting for the order table: iterrows loop vs display_rows."""
+    from order_schema import compact_orders
+    from order_table import display_rows
+
+    for count in (10_000, 100_000):
+        df = synthetic_orders(count)
+        loop = timed(_iterrows_rows, df, repeat=1)
+        vectorized = timed(display_rows, compact_orders(df))
+        print(
+            f"{count:>7} orders: iterrows {loop * 1000:8.1f} ms, "
+            f"display_rows {vectorized * 1000:7.1f} ms ({loop / vectorized:.0f}x)"
+        )
+
+
+def bench_date_filter():
+    """Date-range filtering: string scan vs sorted-date binary search."""
+    import os
+    import tempfile
+
+    from order_store import OrderStore
+    from storage import SQLiteStorage
+
+    df = synthetic_orders(100_000)
+    with tempfile.TemporaryDirectory() as directory:
+        storage = SQLiteStorage(os.path.join(directory, "orders.db"))
+        storage.save({}, df.to_dict("records"), [])
+        store = OrderStore(storage)
+        rebuild = timed(store.between, "2025-01-01", "2025-01-01", repeat=1)  # builds the date index
+        scan = timed(lambda: df[(df["Date"] >= "2025-01-01") & (df["Date"] <= "2025-12-31")])
+        indexed = timed(store.between, "2025-01-01", "2025-12-31")
+        print(
+            f"100000 orders, one year: string scan {scan * 1000:.2f} ms, "
+            f"searchsorted {indexed * 1000:.3f} ms"
+        )
+        # The first filter after a change patches the index instead of sorting again
+        order_no = df["Order No"].iloc[500]
+
+        def filter_after(change):
+            change()
+            return timed(store.between, "2025-01-01", "2025-12-31", repeat=1)
+
+        after_update = min(filter_after(lambda: store.update(order_no, {"Date": "2025-06-01"})) for _ in range(3))
+        after_add = min(
+            filter_after(lambda: store.add({**df.iloc[0].to_dict(), "Order No": f"new{time.perf_counter_ns()}"}))
+            for _ in range(3)
+        )
+        print(
+            f"first filter after an update {after_update * 1000:.2f} ms, after an add {after_add * 1000:.2f} ms "
+            f"(rebuilding the index: {rebuild * 1000:.0f} ms)"
+        )
+        store.close()
+
+
+def dashboard_memory_growth(root, opens=200):
+    """Return the MB held after opening the report dashboard ``opens`` times.
+
+    Growth is traced from the tenth open on, after imports and caches have
+    warmed up. ``root`` is a Tk root; the dashboard is destroyed at the end.
+    """
+    import tracemalloc
+
+    from catalog import Catalog
+    from dashboard import ReportDashboard
+    from rollups import SalesRollup
+
+    rollup = SalesRollup()
+    rollup.rebuild(synthetic_orders(5_000).to_dict("records"))
+    summary = rollup.summary("2025-06-01")
+    data = {
+        "total_orders": int(summary["totals"]["orders"]),
+        "total_sales": summary["totals"]["total"],
+        "orders_today": int(summary["today"]["orders"]),
+        "sales_today": summary["today"]["total"],
+        "sales_by_date": summary["sales_by_date"],
+        "revenue_breakdown": Catalog().by_name(rollup.revenue_by_day(Catalog()).sum()).to_dict(),
+    }
+    dashboard = None
+    tracemalloc.start()
+    baseline = None
+    try:
+        for i in range(opens):
+            # Same steps as WatalappamBusinessApp.show_report_dashboard
+            if dashboard is None or not dashboard.is_alive():
+                dashboard = ReportDashboard(root)
+            dashboard.update(data)
+            dashboard.show()
+            root.update()
+            dashboard.hide()
+            if i == 9:
+                baseline = tracemalloc.get_traced_memory()[0]
+        return (tracemalloc.get_traced_memory()[0] - baseline) / 1e6
+    finally:
+        tracemalloc.stop()
+        if dashboard is not None and dashboard.is_alive():
+            dashboard.window.destroy()
+
+
+def bench_dashboard_memory(opens=200, budget_mb=DASHBOARD_GROWTH_BUDGET_MB):
+    """Memory growth from opening the report dashboard repeatedly."""
+    import tkinter as tk
+
+    try:
+        root = tk.Tk()
+    except tk.TclError as e:
+        print(f"skipped: no display available ({e})")
+        return
+    root.withdraw()
+    try:
+        growth = dashboard_memory_growth(root, opens)
+    finally:
+        root.destroy()
+    print(f"{opens} opens: {growth:.2f} MB growth after warm-up (budget {budget_mb} MB)")
+    if growth > budget_mb:
+        raise SystemExit(f"dashboard memory growth {growth:.2f} MB exceeds {budget_mb} MB")
+
+
+def bench_receipts(count=1000):
+    """Receipt rendering: reloading assets per receipt vs the cached template."""
+    import tempfile
+
+    from catalog import Catalog
+    from receipts import load_assets, receipt_template, render_receipt
+
+    def uncached(order, catalog, folder):
+        # What every receipt cost before the asset cache: reload and redraw
+        load_assets.cache_clear()
+        receipt_template.cache_clear()
+        return render_receipt(order, catalog, folder)
+
+    try:
+        load_assets()
+    except OSError as e:
+        print(f"skipped: receipt fonts not available ({e})")
+        return
+    orders = synthetic_orders(count).to_dict("records")
+    catalog = Catalog()
+    with tempfile.TemporaryDirectory() as folder:
+        results = {}
+        for name, render in (("uncached", uncached), ("cached", render_receipt)):
+            start = time.perf_counter()
+            for order in orders:
+                render(order, catalog, folder)
+            results[name] = (time.perf_counter() - start) / count
+        print(
+            f"{count} receipts: uncached {results['uncached'] * 1000:.2f} ms/receipt, "
+            f"cached {results['cached'] * 1000:.2f} ms/receipt "
+            f"({results['uncached'] / results['cached']:.1f}x)"
+        )
+
+
+def bench_receipt_pdf(count=1000):
+    """Bulk receipts: one PNG per order vs one multi-page vector PDF."""
+    import os
+    import tempfile
+
+    from catalog import Catalog
+    from receipts import export_receipts_pdf, render_receipts
+
+    try:
+        import reportlab  # noqa: F401
+    except ImportError:
+        print("skipped: reportlab is not installed")
+        return
+    orders = synthetic_orders(count).to_dict("records")
+    catalog = Catalog()
+    with tempfile.TemporaryDirectory() as folder:
+        start = time.perf_counter()
+        filenames, failures = render_receipts(orders, catalog, folder)
+        png_time = time.perf_counter() - start
+        if failures:
+            print(f"skipped: receipts could not be rendered ({next(iter(failures.values()))})")
+            return
+        png_bytes = sum(os.path.getsize(filename) for filename in filenames)
+        pdf_path = os.path.join(folder, "receipts.pdf")
+        start = time.perf_counter()
+        export_receipts_pdf(orders, catalog, pdf_path)
+        pdf_time = time.perf_counter() - start
+        pdf_bytes = os.path.getsize(pdf_path)
+    print(
+        f"{count} receipts: PNG {png_time / count * 1000:.2f} ms and {png_bytes / count / 1024:.1f} KB each "
+        f"(all cores), PDF {pdf_time / count * 1000:.2f} ms and {pdf_bytes / count / 1024:.1f} KB per page"
+    )
+
+
+def bench_import(count=100_000):
+    """Bulk CSV import: chunked parsing and column-wise validation."""
+    import os
+    import tempfile
+    import tracemalloc
+
+    from catalog import Catalog
+    from order_import import import_orders
+    from order_journal import OrderJournal
+    from order_store import OrderStore
+    from storage import SQLiteStorage, workbook_frame
+
+    df = workbook_frame(synthetic_orders(count).to_dict("records"))
+    df["Phone Number"] = df["Phone Number"].astype(str)
+    df.loc[df.index[::100], "Phone Number"] = "not a number"  # 1% bad rows
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "orders.csv")
+        df.to_csv(path, index=False)
+        del df
+        results = []
+        for traced in (False, True):
+            # tracemalloc slows Python down a lot, so time and measure separately
+            store = OrderStore(
+                SQLiteStorage(os.path.join(directory, f"orders{traced:d}.db")),
+                journal=OrderJournal(os.path.join(directory, f"orders{traced:d}.journal.jsonl")),
+            )
+            if traced:
+                tracemalloc.start()
+            start = time.perf_counter()
+            added, errors = import_orders(store, path, Catalog())
+            results.append(time.perf_counter() - start)
+            if traced:
+                held, peak = tracemalloc.get_traced_memory()
+                tracemalloc.stop()
+            store.close()
+    elapsed = results[0]
+    print(
+        f"{count} rows: {added} imported, {len(errors)} rejected in {elapsed:.2f} s; "
+        f"{held / 1e6:.0f} MB held by the new orders, {peak / 1e6:.0f} MB peak"
+    )
+
+
+def bench_export(count=100_000):
+    """Streaming export to CSV, Parquet and XLSX, and its peak memory."""
+    import os
+    import tempfile
+    import tracemalloc
+
+    from order_export import export_orders
+    from order_store import OrderStore
+    from storage import SQLiteStorage
+
+    with tempfile.TemporaryDirectory() as directory:
+        storage = SQLiteStorage(os.path.join(directory, "orders.db"))
+        storage.save({}, synthetic_orders(count).to_dict("records"), [])
+        store = OrderStore(storage)
+        for extension in (".csv", ".parquet", ".xlsx"):
+            path = os.path.join(directory, "orders" + extension)
+            try:
+                elapsed = timed(export_orders, store, path, repeat=1)
+            except ImportError as e:
+                print(f"{extension[1:]:>7}: skipped ({e})")
+                continue
+            print(f"{extension[1:]:>7}: {elapsed:.2f} s, {os.path.getsize(path) / 1e6:.1f} MB")
+        full_frame = store.to_frame().memory_usage(deep=True).sum()
+        tracemalloc.start()
+        export_orders(store, os.path.join(directory, "orders.csv"))
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        store.close()
+    print(f"CSV export peak {peak / 1e6:.0f} MB; one DataFrame of all orders is {full_frame / 1e6:.0f} MB")
+
+
+def bench_schema(count=1_000_000):
+    """Memory of an order DataFrame: default dtypes vs the compact schema."""
+    from order_schema import compact_orders
+
+    df = synthetic_orders(count)
+    # Dates and text as the store holds them: Python strings
+    plain = df.astype({"Order No": object, "Date": object, "Customer Name": object, "Address": object, "Status": object})
+    start = time.perf_counter()
+    compact = compact_orders(plain)
+    elapsed = time.perf_counter() - start
+    before = plain.memory_usage(deep=True)
+    after = compact.memory_usage(deep=True)
+    # "Items" dicts become one quantity column per product
+    for name in ["Index"] + list(dict.fromkeys(list(plain.columns) + list(compact.columns))):
+        print(
+            f"{name:>14}: {before.get(name, 0) / 1e6:7.1f} MB -> {after.get(name, 0) / 1e6:6.1f} MB  "
+            f"{compact[name].dtype if name in compact else ''}"
+        )
+    print(
+        f"{count} orders: {before.sum() / 1e6:.0f} MB -> {after.sum() / 1e6:.0f} MB "
+        f"({before.sum() / after.sum():.1f}x smaller), converted in {elapsed:.2f} s"
+    )
+
+
+def bench_customers(customers=50_000, budget_ms=1.0):
+    """Customer type-ahead: index build and prefix lookups with many customers."""
+    from customer_index import CustomerIndex
+
+    rng = np.random.default_rng(0)
+    first = ["Nimal", "Kamal", "Sunil", "Ravindu", "Chamari", "Dilani", "Ishara", "Tharindu"]
+    last = ["Perera", "Fernando", "Silva", "Jayasinghe", "Bandara", "Wickramasinghe"]
+    df = synthetic_orders(customers * 2)
+    phones = rng.choice(np.arange(700_000_000, 780_000_000), customers, replace=False)
+    df["Phone Number"] = phones[np.arange(len(df)) % customers]
+    df["Customer Name"] = [
+        f"{first[i % len(first)]} {last[i // len(first) % len(last)]} {i}" for i in np.arange(len(df)) % customers
+    ]
+    orders = df.to_dict("records")
+    index = CustomerIndex()
+    build = timed(index.rebuild, orders, repeat=1)
+    extra = dict(orders[0], **{"Order No": "extra", "Phone Number": 699_999_999})
+    lookups = {
+        "name prefix 'ravindu fer'": lambda: index.search("ravindu fer"),
+        "word prefix 'silva 12'": lambda: index.search("silva 12"),
+        "phone prefix '07712'": lambda: index.search("07712"),
+        "add + remove an order": lambda: (index.apply(None, extra), index.apply(extra, None)),
+    }
+    print(f"{len(index)} customers, {len(orders)} orders: index built in {build * 1000:.0f} ms")
+    slowest = 0.0
+    for name, lookup in lookups.items():
+        elapsed = timed(lookup, repeat=200)
+        slowest = max(slowest, elapsed)
+        print(f"{name:>26}: {elapsed * 1e6:6.0f} us")
+    if slowest * 1000 > budget_ms:
+        raise SystemExit(f"customer lookup {slowest * 1000:.2f} ms exceeds {budget_ms} ms")
+
+
+def bench_workbook_cache(count=100_000):
+    """Loading a workbook of orders: parsing the XLSX vs the Arrow cache."""
+    import os
+    import tempfile
+
+    from storage import ExcelStorage, export_excel
+
+    with tempfile.TemporaryDirectory() as directory:
+        storage = ExcelStorage(os.path.join(directory, "orders.xlsx"))
+        export_excel(synthetic_orders(count).to_dict("records"), storage.path)
+        parsed = timed(storage.load, repeat=1)  # Also writes the cache
+        if not os.path.exists(storage.cache_path):
+            print("skipped: the cache needs pyarrow")
+            return
+        cached = timed(storage.load)
+        cache_size = os.path.getsize(storage.cache_path)
+        os.utime(storage.path)  # As if the workbook was edited in Excel
+        stale = timed(storage.load, repeat=1)
+    print(f"parse {count} orders: {parsed:.2f} s, from cache: {cached * 1000:.0f} ms ({cache_size / 1e6:.1f} MB)")
+    print(f"after an outside edit: {stale:.2f} s (parsed again)")
+
+
+def bench_catalog(count=1_000_000):
+    """Order totals and revenue: per-order loop vs joins over line items."""
+    from catalog import Catalog, line_items
+
+    catalog = Catalog()
+    for size in range(2, 12):
+        catalog.set(f"{size}kg", f"{size}kg Watalappam", 900 * size)
+    orders = synthetic_orders(count).to_dict("records")
+    start = time.perf_counter()
+    items = line_items(orders)
+    normalize = time.perf_counter() - start
+    loop = timed(lambda: {order["Order No"]: catalog.total(order["Items"], order["Date"]) for order in orders}, repeat=1)
+    joined = timed(catalog.order_totals, items)
+    revenue = timed(catalog.revenue, items)
+    print(
+        f"{count} orders, {len(items)} line items (normalized in {normalize:.2f} s): "
+        f"loop {loop:.2f} s, join {joined:.2f} s ({loop / joined:.1f}x); "
+        f"revenue by product {revenue * 1000:.0f} ms"
+    )
+
+
+def bench_price_history(count=1_000_000, store_count=100_000):
+    """Revenue at order-time prices: as-of join, and the cached per-day revenue."""
+    import os
+    import tempfile
+
+    from catalog import DEFAULT_PRODUCTS, Catalog, line_items
+    from order_store import OrderStore
+    from rollups import SalesRollup
+    from storage import SQLiteStorage
+
+    # A price change every month of the two years of orders
+    months = pd.date_range("2025-01-01", periods=24, freq="MS").strftime("%Y-%m-%d")
+    catalog = Catalog(
+        {
+            product_id: {
+                "name": product["name"],
+                "price": product["price"],
+                "history": [[month, product["price"] + 10 * n] for n, month in enumerate(months)],
+            }
+            for product_id, product in DEFAULT_PRODUCTS.items()
+        }
+    )
+    orders = synthetic_orders(count)
+    items = line_items(orders.to_dict("records"))
+    sample = items.head(100_000)
+    loop = timed(lambda: [catalog.price(product, date) for product, date in zip(sample["Product"], sample["Date"])], repeat=1)
+    joined = timed(catalog.price_lines, items)
+    print(
+        f"{len(items)} line items: as-of join {joined:.2f} s; "
+        f"a per-line price lookup would take {loop * len(items) / len(sample):.1f} s"
+    )
+
+    # The rollup has a row per day, so its size, not the order count, sets the cost
+    with tempfile.TemporaryDirectory() as directory:
+        storage = SQLiteStorage(os.path.join(directory, "orders.db"))
+        storage.save({}, orders.head(store_count).to_dict("records"), [])
+        store = OrderStore(storage, rollup=SalesRollup(os.path.join(directory, "rollups.json")))
+        full = timed(store.revenue_by_day, catalog, repeat=1)
+        cached = timed(store.revenue_by_day, catalog)
+        order = dict(store.get("00000000"))
+        order["Status"] = "Completed"
+        one_change = timed(lambda: (store.update(order["Order No"], order), store.revenue_by_day(catalog)))
+        store.close()
+    print(
+        f"per-day revenue of {store_count} orders: priced from scratch {full * 1000:.0f} ms, "
+        f"cached {cached * 1000:.1f} ms, after one order changes {one_change * 1000:.1f} ms"
+    )
+
+
+_FIRST_PAINT = """
+import sys
+import time
+import tkinter as tk
+
+from watalappam_business_app import WatalappamBusinessApp
+
+root = tk.Tk()
+app = WatalappamBusinessApp(root)
+root.wait_visibility(root)
+root.update_idletasks()
+# perf_counter uses a system-wide clock, so the parent can compare it
+print(time.perf_counter(), flush=True)
+app.on_close()
+"""
+
+
+def _terminal(path, tag, orders, results):
+    """Add and edit orders like a busy counter terminal, flushing each change."""
+    import statistics
+
+    from order_store import OrderStore
+    from storage import SQLiteStorage
+
+    store = OrderStore(SQLiteStorage(path), flush_delay=3600)
+    flushes = []
+    for number in range(orders):
+        store.add(
+            {
+                "Order No": f"{tag}{number}",
+                "Date": "2025-03-01",
+                "Customer Name": tag,
+                "Phone Number": 771234567,
+                "Address": "Colombo",
+                "Items": {"500g": 1},
+                "Total": 500.0,
+                "Status": "Pending",
+            }
+        )
+        # Both terminals keep editing the same order, each a different field
+        field = "Address" if tag == "a" else "Status"
+        store.update("shared", {field: f"{tag}{number}"})
+        start = time.perf_counter()
+        store.flush()
+        flushes.append(time.perf_counter() - start)
+    store.close()
+    flushes.sort()
+    results.put((statistics.median(flushes), flushes[int(len(flushes) * 0.95)]))
+
+
+def bench_shared_store(count=100_000, orders=500):
+    """Two terminals on one database: flush time under the lock file, and no lost orders."""
+    import multiprocessing
+    import os
+    import tempfile
+
+    from order_store import OrderStore
+    from storage import SQLiteStorage
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "orders.db")
+        storage = SQLiteStorage(path)
+        rows = synthetic_orders(count).to_dict("records")
+        rows.append({**rows[0], "Order No": "shared"})
+        # What every save cost when each terminal rewrote all orders
+        rewrite = timed(storage.save, {}, rows, [], repeat=1)
+        storage.close()
+
+        results = multiprocessing.Queue()
+        terminals = [multiprocessing.Process(target=_terminal, args=(path, tag, orders, results)) for tag in "ab"]
+        start = time.perf_counter()
+        for terminal in terminals:
+            terminal.start()
+        timings = [results.get() for _ in terminals]
+        for terminal in terminals:
+            terminal.join()
+        elapsed = time.perf_counter() - start
+
+        store = OrderStore(SQLiteStorage(path))
+        shared = store.get("shared")
+        lost = count + 1 + 2 * orders - len(store)
+        store.close()
+    print(f"rewriting all {count} orders under the lock: {rewrite * 1000:.0f} ms")
+    for tag, (median, p95) in zip("ab", timings):
+        print(f"terminal {tag}: flush of one change {median * 1000:.1f} ms median, {p95 * 1000:.1f} ms p95")
+    print(f"{2 * orders} orders from two terminals in {elapsed:.2f} s")
+    merged = shared["Address"] == f"a{orders - 1}" and shared["Status"] == f"b{orders - 1}"
+    print(f"lost orders: {lost}; both edits of the shared order kept: {merged}")
+    if lost or not merged:
+        raise SystemExit("concurrent terminals lost changes")
+
+
+def first_paint_time(orders=10_000):
+    """Return the seconds from starting the app to its first drawn window.
+
+    The app runs in a fresh interpreter in a folder holding ``orders``
+    synthetic orders and an up-to-date rollup. Raises RuntimeError with
+    the app's last error line if it does not start, e.g. without a display.
+    """
+    import os
+    import subprocess
+    import sys
+    import tempfile
+
+    from order_service import ROLLUP_FILE
+    from rollups import SalesRollup
+    from storage import SQLiteStorage
+
+    repo = os.path.dirname(os.path.abspath(__file__))
+    with tempfile.TemporaryDirectory() as directory:
+        rows = synthetic_orders(orders).to_dict("records")
+        storage = SQLiteStorage(os.path.join(directory, "watalappam_orders.db"))
+        storage.save({}, rows, [])
+        storage.close()
+        rollup = SalesRollup(os.path.join(directory, ROLLUP_FILE))
+        rollup.rebuild(rows)
+        rollup.save()
+        start = time.perf_counter()
+        child = subprocess.run(
+            [sys.executable, "-c", _FIRST_PAINT],
+            cwd=directory,
+            env=dict(os.environ, PYTHONPATH=repo),
+            capture_output=True,
+            text=True,
+        )
+    if child.returncode != 0:
+        raise RuntimeError(child.stderr.strip().splitlines()[-1])
+    return float(child.stdout.split()[-1]) - start
+
+
+def import_cost(modules=("watalappam_business_app", "cli")):
+    """Return the seconds it takes to import ``modules`` and the heavy modules they load.
+
+    The modules are imported in a fresh interpreter run with ``-X importtime``,
+    so the time is the cumulative import time of each, dependencies included.
+    """
+    import os
+    import subprocess
+    import sys
+
+    repo = os.path.dirname(os.path.abspath(__file__))
+    code = f"import sys, {', '.join(modules)}; print(' '.join(sorted(set(sys.modules) & {set(HEAVY_MODULES)!r})))"
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=repo,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    # Lines look like "import time: <self us> | <cumulative us> | <indented name>"
+    imports = {}
+    for line in result.stderr.splitlines():
+        parts = line.split("|")
+        if len(parts) == 3 and parts[1].strip().isdigit():
+            imports[parts[2].strip()] = int(parts[1]) / 1e6
+    return sum(imports.get(module, 0.0) for module in modules), result.stdout.split()
+
+
+def bench_startup(import_budget_s=IMPORT_BUDGET_S, paint_budget_s=FIRST_PAINT_BUDGET_S):
+    """App startup: module import time and time to the first painted window."""
+    import_time, heavy = import_cost()
+    print(f"import watalappam_business_app and cli: {import_time * 1000:.0f} ms (budget {import_budget_s * 1000:.0f} ms)")
+    print(f"heavy modules loaded at import: {', '.join(heavy) or 'none'}")
+
+    try:
+        paint_time = first_paint_time(100_000)
+    except RuntimeError as e:
+        paint_time = None
+        print(f"first paint skipped: {e}")
+    else:
+        print(f"first paint with 100000 orders: {paint_time * 1000:.0f} ms (budget {paint_budget_s * 1000:.0f} ms)")
+    if import_time > import_budget_s or heavy:
+        raise SystemExit("app import is over budget or loads heavy modules")
+    if paint_time is not None and paint_time > paint_budget_s:
+        raise SystemExit(f"first paint {paint_time:.2f} s exceeds {paint_budget_s} s")
+
+
+BENCHMARKS = {
+    "formatting": bench_formatting,
+    "date_filter": bench_date_filter,
+    "dashboard_memory": bench_dashboard_memory,
+    "receipts": bench_receipts,
+    "receipt_pdf": bench_receipt_pdf,
+    "startup": bench_startup,
+    "import": bench_import,
+    "export": bench_export,
+    "workbook_cache": bench_workbook_cache,
+    "schema": bench_schema,
+    "customers": bench_customers,
+    "catalog": bench_catalog,
+    "price_history": bench_price_history,
+    "shared_store": bench_shared_store,
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("names", nargs="*", help=f"benchmarks to run: {', '.join(BENCHMARKS)}")
+    args = parser.parse_args()
+    unknown = set(args.names) - set(BENCHMARKS)
+    if unknown:
+        parser.error(f"unknown benchmark: {', '.join(sorted(unknown))}")
+    for name in args.names or BENCHMARKS:
+        print(f"== {name}: {BENCHMARKS[name].__doc__}")
+        BENCHMARKS[name]()
+
+
+if __name__ == "__main__":
+    main()
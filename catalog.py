@@ -0,0 +1,286 @@
+import bisect
+import json
+import os
+from datetime import datetime
+
+from order_journal import atomic_write
+
+
+# The two sizes sold before the catalog existed; their ids are the keys of
+# the old prices.json and the "<id> Quantity" columns of old workbooks
+DEFAULT_PRODUCTS = {
+    "500g": {"name": "500g Watalappam", "price": 500},
+    "1kg": {"name": "1kg Watalappam", "price": 1000},
+}
+QUANTITY_SUFFIX = " Quantity"
+# Effective date of a first price with no date, e.g. from before price
+# history; such a price applies to every earlier order
+EARLIEST = "1970-01-01"
+
+
+def quantity_column(product_id):
+    """Return the workbook column holding the quantities of a product."""
+    return product_id + QUANTITY_SUFFIX
+
+
+def quantity_columns(columns):
+    """Return the product ids of the "<id> Quantity" columns, in order."""
+    return [column[: -len(QUANTITY_SUFFIX)] for column in columns if column.endswith(QUANTITY_SUFFIX)]
+
+
+def items_from_columns(row):
+    """Return an order dict with its "<id> Quantity" values moved into "Items".
+
+    Rows that already have "Items" are returned unchanged. This is how
+    orders from workbooks and journals written before the catalog are read.
+    """
+    if "Items" in row:
+        return row
+    row = dict(row)
+    items = {}
+    for product_id in quantity_columns(list(row)):
+        quantity = row.pop(quantity_column(product_id))
+        try:
+            quantity = int(quantity)
+        except (TypeError, ValueError):  # Empty cells are NaN
+            continue
+        if quantity:
+            items[product_id] = quantity
+    row["Items"] = items
+    return row
+
+
+def items_text(items):
+    """Format the items of an order for the order table, e.g. "2 × 500g"."""
+    return ", ".join(f"{quantity} × {product_id}" for product_id, quantity in items.items())
+
+
+def line_items(orders):
+    """Return the normalized line items of order dicts as a DataFrame.
+
+    One row per order and product, with the columns "Order No", "Date",
+    "Product" and "Quantity". The date lets ``Catalog.price_lines`` price
+    each line as of the day it was ordered.
+    """
+    import pandas as pd
+
+    rows = [
+        (order["Order No"], order.get("Date"), product_id, quantity)
+        for order in orders
+        for product_id, quantity in (order.get("Items") or {}).items()
+    ]
+    return pd.DataFrame(rows, columns=["Order No", "Date", "Product", "Quantity"])
+
+
+def _iso(date):
+    if date is None:
+        return datetime.now().strftime("%Y-%m-%d")
+    if hasattr(date, "strftime"):
+        return date.strftime("%Y-%m-%d")
+    return str(date)
+
+
+class Catalog:
+    """The products on sale, with their names and dated prices.
+
+    ``products`` maps each product id to a dict with its "name", its latest
+    "price" and its price "history": [effective ISO date, price] versions,
+    oldest first, in the order products are listed in the app. A price
+    change adds a version instead of overwriting the price, so orders are
+    always priced as of their own date (orders dated before the first
+    version get the first price). Line items refer to products by id.
+    Totals over many orders are computed by an as-of join of the line
+    items against ``price_history``, not per product.
+    """
+
+    def __init__(self, products=None, path=None):
+        self.path = path
+        self.products = {}
+        for product_id, product in (products or DEFAULT_PRODUCTS).items():
+            history = product.get("history") or [[EARLIEST, product["price"]]]
+            self._put(product_id, product["name"], history)
+
+    @classmethod
+    def load(cls, path, legacy_prices=None):
+        """Load the catalog, or create it from an old prices.json.
+
+        Without either file the catalog starts with the default products.
+        A newly created catalog is saved to ``path`` straight away.
+        Catalogs saved before price history have one price per product,
+        which becomes its first version.
+        """
+        if os.path.exists(path):
+            with open(path, "r") as file:
+                return cls(json.load(file)["products"], path)
+        products = {product_id: dict(product) for product_id, product in DEFAULT_PRODUCTS.items()}
+        if legacy_prices and os.path.exists(legacy_prices):
+            with open(legacy_prices, "r") as file:
+                for product_id, price in json.load(file).items():
+                    default = DEFAULT_PRODUCTS.get(product_id, {"name": product_id})
+                    products[product_id] = {"name": default["name"], "price": price}
+        catalog = cls(products, path)
+        catalog.save()
+        return catalog
+
+    def save(self, path=None):
+        data = json.dumps({"products": self.products}, indent=2)
+
+        def write(tmp_path):
+            with open(tmp_path, "w") as file:
+                file.write(data)
+
+        atomic_write(path or self.path, write)
+
+    def copy(self):
+        """Return a copy to edit, or to hand to a worker while this one changes."""
+        return type(self)(self.products, self.path)
+
+    def __contains__(self, product_id):
+        return product_id in self.products
+
+    def __iter__(self):
+        return iter(self.products)
+
+    def _put(self, product_id, name, history):
+        product_id = str(product_id).strip()
+        if not product_id or product_id.endswith(QUANTITY_SUFFIX.strip()):
+            raise ValueError(f"Invalid product id: {product_id!r}")
+        history = sorted([_iso(date), float(price)] for date, price in history)
+        self.products[product_id] = {"name": name, "price": history[-1][1], "history": history}
+
+    def set(self, product_id, name, price, effective=None):
+        """Add a product, or rename and reprice an existing one.
+
+        A new price takes effect on the ISO date ``effective`` (default
+        today); orders dated before it keep the price they had. The first
+        price of a new product applies from ``effective`` or, by default,
+        to every date. A price change can't start before today: the orders
+        already placed keep the totals they were saved with, so repricing
+        them would make revenue and receipts disagree with those totals.
+        """
+        product_id = str(product_id).strip()
+        product = self.products.get(product_id)
+        price = float(price)
+        if product is None:
+            history = [[effective or EARLIEST, price]]
+        else:
+            history = [list(version) for version in product["history"]]
+            if price != self.price(product_id, effective):
+                date, today = _iso(effective), _iso(None)
+                if date < today:
+                    raise ValueError(
+                        f"{product_id} already has prices; a new price can apply from today ({today}) on, not from {date}"
+                    )
+                history = [version for version in history if version[0] != date] + [[date, price]]
+        self._put(product_id, name, history)
+
+    def name(self, product_id):
+        """Return a product's name; unknown ids are shown as they are."""
+        product = self.products.get(product_id)
+        return product["name"] if product else product_id
+
+    def price(self, product_id, date=None):
+        """Return a product's price on an ISO date (default today).
+
+        Unknown products cost nothing.
+        """
+        product = self.products.get(product_id)
+        if product is None:
+            return 0.0
+        history = product["history"]
+        position = bisect.bisect_right([version[0] for version in history], _iso(date)) - 1
+        return history[max(position, 0)][1]
+
+    def price_key(self):
+        """Return a value that changes whenever any price version changes."""
+        return tuple(
+            (product_id, tuple(map(tuple, product["history"]))) for product_id, product in self.products.items()
+        )
+
+    def total(self, items, date=None):
+        """Return the price of one order's items on an ISO date (default today)."""
+        return float(sum(quantity * self.price(product_id, date) for product_id, quantity in items.items()))
+
+    def frame(self):
+        """Return the catalog with today's prices, as a DataFrame indexed by product id."""
+        import pandas as pd
+
+        return pd.DataFrame(
+            {
+                "name": [product["name"] for product in self.products.values()],
+                "price": [self.price(product_id) for product_id in self.products],
+            },
+            index=list(self.products),
+        )
+
+    def price_history(self):
+        """Return every price version as a DataFrame sorted by "From".
+
+        The columns are "Product", "From" (``datetime64[s]``) and "Price".
+        """
+        import pandas as pd
+
+        rows = [
+            (product_id, date, price)
+            for product_id, product in self.products.items()
+            for date, price in product["history"]
+        ]
+        history = pd.DataFrame(rows, columns=["Product", "From", "Price"])
+        history["Product"] = history["Product"].astype(str)
+        history["From"] = pd.to_datetime(history["From"]).astype("datetime64[s]")
+        return history.sort_values("From", kind="stable", ignore_index=True)
+
+    def price_lines(self, items):
+        """Join line items with the catalog, adding "Price" and "Line Total".
+
+        Line items with a "Date" column are priced as of that date, with a
+        ``merge_asof`` on the price history; the others, and lines with no
+        valid date, at today's prices. Unknown products cost nothing.
+        """
+        import numpy as np
+        import pandas as pd
+
+        if "Date" not in items:
+            priced = items.join(self.frame()["price"].rename("Price"), on="Product")
+        else:
+            today = pd.Timestamp(_iso(None))
+            history = self.price_history()
+            lines = pd.DataFrame(
+                {
+                    "Product": items["Product"].to_numpy(),
+                    "On": pd.to_datetime(items["Date"], errors="coerce").fillna(today).to_numpy(),
+                    "Row": np.arange(len(items)),
+                }
+            )
+            lines["Product"] = lines["Product"].astype(str)
+            lines["On"] = lines["On"].astype("datetime64[s]")
+            lines = lines.sort_values("On", kind="stable")
+            matched = pd.merge_asof(lines, history, left_on="On", right_on="From", by="Product")
+            # Lines dated before a product's first version get its first price
+            first = history.drop_duplicates("Product").set_index("Product")["Price"]
+            price = matched["Price"].fillna(matched["Product"].map(first))
+            priced = items.copy()
+            priced["Price"] = pd.Series(price.to_numpy(), index=matched["Row"].to_numpy()).sort_index().to_numpy()
+        priced["Price"] = priced["Price"].astype(float).fillna(0.0)
+        priced["Line Total"] = priced["Quantity"] * priced["Price"]
+        return priced
+
+    def order_totals(self, items):
+        """Return the total of every order in a line-item table, by "Order No"."""
+        return self.price_lines(items).groupby("Order No", sort=False)["Line Total"].sum()
+
+    def by_name(self, values):
+        """Sum values keyed by product id into values by product name.
+
+        Every catalog product is listed, with zero if it has no value.
+        """
+        import pandas as pd
+
+        values = pd.Series(values, dtype=float)
+        product_ids = list(dict.fromkeys(list(self.products) + list(values.index)))
+        names = pd.Series([self.name(product_id) for product_id in product_ids], index=product_ids)
+        return values.reindex(product_ids, fill_value=0.0).groupby(names, sort=False).sum()
+
+    def revenue(self, items):
+        """Return revenue by product name for a line-item table, via ``price_lines``."""
+        return self.by_name(self.price_lines(items).groupby("Product", sort=False)["Line Total"].sum())
@@ -0,0 +1,234 @@
+"""Command-line interface for the Watalappam Business Manager.
+
+Works on the same order database as the app, without opening a window:
+
+    python cli.py add --name "Nimal" --phone 0771234567 --address "Colombo" --item 500g=2
+    python cli.py product 2kg --name "2kg Watalappam" --price 1900
+    python cli.py products
+    python cli.py import orders.xlsx
+    python cli.py export march.xlsx --from 2025-03-01 --to 2025-03-31
+    python cli.py list --from 2025-03-01 --to 2025-03-31 --status Pending
+    python cli.py report
+    python cli.py receipts --from 2025-03-01 --to 2025-03-31 --pdf march.pdf
+
+Run ``python cli.py <command> --help`` for the options of each command.
+"""
+import argparse
+
+from catalog import items_text
+from customer_index import phone_key, phone_text
+from date_filters import parse_date
+from order_service import (
+    CATALOG_FILE,
+    DATA_FILE,
+    EXCEL_FILE,
+    PRICE_FILE,
+    RECEIPT_FOLDER,
+    load_catalog,
+    new_order,
+    open_store,
+    sales_report,
+)
+from order_store import COLUMNS, STATUSES
+from receipts import export_receipts_pdf, render_receipts, select_orders
+
+
+def _iso_date(text):
+    try:
+        return parse_date(text).isoformat()
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e))
+
+
+def _print_progress(done, total):
+    print(f"\r{done}/{total}", end="", flush=True)
+
+
+def _item(text):
+    product_id, separator, quantity = text.partition("=")
+    if not separator or not product_id.strip():
+        raise argparse.ArgumentTypeError(f"expected PRODUCT=QUANTITY, got {text!r}")
+    return product_id.strip(), quantity.strip()
+
+
+def add_command(store, catalog, args):
+    order = new_order(
+        args.name, args.phone, args.address, dict(args.items), args.status, catalog, args.date
+    )
+    store.add(order)
+    print(f"Added order {order['Order No']}: Rs {order['Total']:.2f}")
+
+
+def import_command(store, catalog, args):
+    from order_import import import_orders
+
+    added, errors = import_orders(store, args.file, catalog)
+    for line, error in errors:
+        print(f"Row {line}: {error}")
+    print(f"{added} orders imported, {len(errors)} rejected")
+
+
+def export_command(store, catalog, args):
+    from order_export import export_orders
+
+    manifest = export_orders(store, args.file, args.start, args.end, args.status)
+    print(f"{manifest['rows']} orders exported to {args.file} (sha256 {manifest['sha256']})")
+
+
+def list_command(store, catalog, args):
+    orders = select_orders(store, args.start, args.end, args.status)
+    if not orders:
+        print("No orders found.")
+        return
+    import pandas as pd
+
+    df = pd.DataFrame(orders, columns=COLUMNS)
+    df["Items"] = df["Items"].map(items_text)
+    # As text: a blank phone would turn the whole column into floats
+    phones = [phone_key(phone) for phone in df["Phone Number"]]
+    df["Phone Number"] = ["" if phone is None else phone_text(phone) for phone in phones]
+    print(df.to_string(index=False))
+
+
+def report_command(store, catalog, args):
+    report = sales_report(store, catalog, args.today)
+    print(f"Total orders: {report['total_orders']}")
+    print(f"Total sales: Rs {report['total_sales']:.2f}")
+    print(f"Orders today: {report['orders_today']}")
+    print(f"Sales today: Rs {report['sales_today']:.2f}")
+    for name, revenue in report["revenue_breakdown"].items():
+        print(f"{name} revenue: Rs {revenue:.2f}")
+    recent = report["sales_by_date"].tail(args.days)
+    if len(recent):
+        print(f"Last {len(recent)} days with sales:")
+        for date, total in recent.items():
+            print(f"  {date}  Rs {total:.2f}")
+
+
+def receipts_command(store, catalog, args):
+    orders = select_orders(store, args.start, args.end, args.status)
+    if args.pdf:
+        print(f"Writing {len(orders)} receipts to {args.pdf}")
+        export_receipts_pdf(orders, catalog, args.pdf, _print_progress)
+        print()
+        return
+    print(f"Rendering {len(orders)} receipts into {args.folder}")
+    filenames, failures = render_receipts(orders, catalog, args.folder, args.workers, _print_progress)
+    print()
+    for order_no, error in failures.items():
+        print(f"Order {order_no}: {error}")
+    print(f"{len(filenames)} receipts written, {len(failures)} failed")
+    if failures:
+        raise SystemExit(1)
+
+
+def products_command(store, catalog, args):
+    for product_id, product in catalog.products.items():
+        print(f"{product_id:<10} {product['name']:<30} Rs {catalog.price(product_id):.2f}")
+        if args.history:
+            for start, price in product["history"]:
+                print(f"{'':<10} from {start}: Rs {price:.2f}")
+
+
+def product_command(store, catalog, args):
+    name = args.name or catalog.name(args.id)
+    if args.price is None and args.id not in catalog:
+        raise ValueError(f"New product {args.id} needs a --price")
+    catalog.set(args.id, name, catalog.price(args.id, args.start) if args.price is None else args.price, args.start)
+    catalog.save()
+    print(f"Saved product {args.id}: {name}, Rs {catalog.price(args.id, args.start):.2f}")
+
+
+def _add_filter_arguments(parser):
+    parser.add_argument("--from", dest="start", type=_iso_date, help="first order date")
+    parser.add_argument("--to", dest="end", type=_iso_date, help="last order date")
+    parser.add_argument("--status", choices=STATUSES, help="only orders with this status")
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--data", default=DATA_FILE, help="order database or workbook")
+    parser.add_argument("--journal", help="order journal (default: next to --data, named after this computer)")
+    parser.add_argument("--rollups", help="saved sales rollups (default: next to --data, named after this computer)")
+    parser.add_argument(
+        "--excel", help=f"workbook imported on first run (default: {EXCEL_FILE}, if --data is the default)"
+    )
+    parser.add_argument("--catalog", default=CATALOG_FILE, help="product catalog")
+    parser.add_argument("--prices", default=PRICE_FILE, help="old price list, read into a new catalog")
+    # Commands that only touch the catalog set orders=False, so no order store is opened
+    parser.set_defaults(orders=True)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    add = commands.add_parser("add", help="add one order")
+    add.add_argument("--name", required=True)
+    add.add_argument("--phone", required=True)
+    add.add_argument("--address", default="")
+    add.add_argument(
+        "--item", dest="items", type=_item, action="append", default=[], metavar="PRODUCT=QUANTITY",
+        help="quantity of a product; repeat for each product",
+    )
+    add.add_argument("--status", choices=STATUSES, default="Pending")
+    add.add_argument("--date", type=_iso_date, help="order date (default: today)")
+    add.set_defaults(run=add_command)
+
+    import_ = commands.add_parser("import", help="add the orders in a CSV file or workbook")
+    import_.add_argument("file")
+    import_.set_defaults(run=import_command)
+
+    export = commands.add_parser("export", help="write orders to a CSV, Parquet or XLSX file")
+    export.add_argument("file")
+    _add_filter_arguments(export)
+    export.set_defaults(run=export_command)
+
+    list_ = commands.add_parser("list", help="print orders")
+    _add_filter_arguments(list_)
+    list_.set_defaults(run=list_command)
+
+    report = commands.add_parser("report", help="print sales totals")
+    report.add_argument("--today", type=_iso_date, help="date to report as today")
+    report.add_argument("--days", type=int, default=7, help="recent days to list")
+    report.set_defaults(run=report_command)
+
+    receipts = commands.add_parser("receipts", help="render receipts for many orders")
+    _add_filter_arguments(receipts)
+    receipts.add_argument("--folder", default=RECEIPT_FOLDER, help="where to save the receipts")
+    receipts.add_argument("--workers", type=int, help="worker processes (default: one per CPU)")
+    receipts.add_argument("--pdf", help="write one PDF with a page per receipt instead of images")
+    receipts.set_defaults(run=receipts_command)
+
+    products = commands.add_parser("products", help="list the product catalog")
+    products.add_argument("--history", action="store_true", help="also list earlier prices")
+    products.set_defaults(run=products_command, orders=False)
+
+    product = commands.add_parser("product", help="add a product, or rename or reprice one")
+    product.add_argument("id", help="product id, as used by add --item")
+    product.add_argument("--name", help="name shown on receipts (default: unchanged, or the id)")
+    product.add_argument("--price", type=float, help="price per item")
+    product.add_argument(
+        "--from", dest="start", type=_iso_date,
+        help="date the new price applies from, today or later (default: today)",
+    )
+    product.set_defaults(run=product_command, orders=False)
+    return parser
+
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    catalog = load_catalog(args.catalog, args.prices)
+    store = None
+    try:
+        if args.orders:
+            # Another --data is a new database unless --excel names its workbook
+            excel = args.excel or (EXCEL_FILE if args.data == DATA_FILE else None)
+            store = open_store(args.data, args.journal, args.rollups, excel)
+        args.run(store, catalog, args)
+    except ValueError as e:
+        parser.exit(1, f"error: {e}\n")
+    finally:
+        if store is not None:
+            store.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,34 @@
+"""Fixtures shared by the tests: sample orders and a temporary order store."""
+import pytest
+
+from order_store import OrderStore
+from storage import SQLiteStorage
+
+
+def _order(order_no="1", date="2025-03-01", **fields):
+    """Return a sample order; ``fields`` replace its columns by name."""
+    return {
+        "Order No": order_no,
+        "Date": date,
+        "Customer Name": "Nimal",
+        "Phone Number": 771234567,
+        "Address": "Colombo",
+        "Items": {"500g": 2},
+        "Total": 1000.0,
+        "Status": "Pending",
+        **fields,
+    }
+
+
+@pytest.fixture
+def order():
+    """The sample order factory, e.g. ``order("2", **{"Phone Number": None})``."""
+    return _order
+
+
+@pytest.fixture
+def store(tmp_path):
+    """An empty store on ``tmp_path/orders.db`` that only flushes when closed."""
+    store = OrderStore(SQLiteStorage(str(tmp_path / "orders.db")), flush_delay=3600)
+    yield store
+    store.close()
@@ -0,0 +1,152 @@
+import bisect
+import math
+
+
+def normalize_name(name):
+    """Return a customer name lower-cased, with runs of whitespace collapsed."""
+    if not isinstance(name, str):
+        return ""
+    return " ".join(name.casefold().split())
+
+
+def phone_key(value):
+    """Return a phone number as an int, or None if it is not a number."""
+    try:
+        if isinstance(value, float) and not math.isfinite(value):
+            return None
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def phone_text(phone):
+    """Format a phone number as shown in the order table."""
+    return f"{phone:010d}"
+
+
+class CustomerIndex:
+    """Customers seen in the orders, found by phone number or name prefix.
+
+    A customer is a phone number: ``orders`` maps every phone number to its
+    orders, keyed by "Order No". Names live in a sorted list of (normalized
+    name, phone) keys - one per word of the name, so "fern" finds "Ravindu
+    Fernando" - and phone numbers in a sorted list of their table text, so a
+    prefix lookup is a binary search plus a short scan. ``apply`` is called
+    with the old and new version of an order on every mutation, like
+    ``SalesRollup.apply``, so nothing is rebuilt while the app runs.
+    """
+
+    def __init__(self):
+        self.orders = {}
+        self._names = []
+        self._name_counts = {}
+        self._phones = []
+
+    def __len__(self):
+        return len(self.orders)
+
+    @staticmethod
+    def _name_keys(order, phone):
+        words = normalize_name(order.get("Customer Name")).split()
+        return [(" ".join(words[i:]), phone) for i in range(len(words))]
+
+    def rebuild(self, orders):
+        """Index raw order dicts from scratch, sorting each list once."""
+        self.orders = {}
+        self._name_counts = {}
+        for order in orders:
+            phone = phone_key(order.get("Phone Number"))
+            if phone is None:
+                continue
+            self.orders.setdefault(phone, {})[str(order["Order No"])] = order
+            for key in self._name_keys(order, phone):
+                self._name_counts[key] = self._name_counts.get(key, 0) + 1
+        self._names = sorted(self._name_counts)
+        self._phones = sorted(phone_text(phone) for phone in self.orders)
+
+    def apply(self, old, new):
+        """Account for an order changing from ``old`` to ``new``.
+
+        Pass ``old=None`` for a new order and ``new=None`` for a deleted one.
+        """
+        if old is not None:
+            self._remove(old)
+        if new is not None:
+            self._add(new)
+
+    def _add(self, order):
+        phone = phone_key(order.get("Phone Number"))
+        if phone is None:
+            return
+        if phone not in self.orders:
+            self.orders[phone] = {}
+            bisect.insort(self._phones, phone_text(phone))
+        self.orders[phone][str(order["Order No"])] = order
+        for key in self._name_keys(order, phone):
+            count = self._name_counts.get(key, 0)
+            if count == 0:
+                bisect.insort(self._names, key)
+            self._name_counts[key] = count + 1
+
+    def _remove(self, order):
+        phone = phone_key(order.get("Phone Number"))
+        if phone is None or phone not in self.orders:
+            return
+        orders = self.orders[phone]
+        orders.pop(str(order["Order No"]), None)
+        if not orders:
+            del self.orders[phone]
+            text = phone_text(phone)
+            del self._phones[bisect.bisect_left(self._phones, text)]
+        for key in self._name_keys(order, phone):
+            count = self._name_counts.get(key, 0) - 1
+            if count > 0:
+                self._name_counts[key] = count
+            elif count == 0:
+                del self._name_counts[key]
+                del self._names[bisect.bisect_left(self._names, key)]
+
+    def customer(self, phone):
+        """Return the details of a customer's latest order, or None.
+
+        The dict has the "Customer Name", "Phone Number" and "Address" of
+        the most recent order and the number of "Orders" placed.
+        """
+        orders = self.orders.get(phone_key(phone))
+        if not orders:
+            return None
+        latest = max(orders.values(), key=lambda order: str(order.get("Date")))
+        return {
+            "Customer Name": latest.get("Customer Name"),
+            "Phone Number": phone_key(phone),
+            "Address": latest.get("Address"),
+            "Orders": len(orders),
+        }
+
+    def search(self, text, limit=10):
+        """Return up to ``limit`` customers matching typed text.
+
+        Text made of digits is matched against the start of the phone
+        number as shown in the table (with its leading zero); anything else
+        against the start of any word of the customer name. Customers are
+        returned as ``customer`` dicts, in name or phone order.
+        """
+        text = text.strip()
+        phones = []
+        if text.isdigit():
+            start = bisect.bisect_left(self._phones, text)
+            for number in self._phones[start : start + limit]:
+                if not number.startswith(text):
+                    break
+                phones.append(int(number))
+        elif normalize_name(text):
+            prefix = normalize_name(text)
+            position = bisect.bisect_left(self._names, (prefix,))
+            while position < len(self._names) and len(phones) < limit:
+                key, phone = self._names[position]
+                if not key.startswith(prefix):
+                    break
+                if phone not in phones:
+                    phones.append(phone)
+                position += 1
+        return [self.customer(phone) for phone in phones]
@@ -0,0 +1,340 @@
+import math
+import tkinter as tk
+from tkinter import ttk
+
+import mplcursors
+import pandas as pd
+from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+from matplotlib.figure import Figure
+
+
+# Bucket sizes for the Sales by Date chart, smallest first:
+# (name, approximate length in days, resample rule, label format)
+BUCKETS = [
+    ("Day", 1, "D", "%Y-%m-%d"),
+    ("Week", 7, "W-MON", "Wk %Y-%m-%d"),
+    ("Month", 30.44, "MS", "%Y-%m"),
+    ("Year", 365.25, "YS", "%Y"),
+]
+MAX_BARS = 60  # bars drawn at most, whatever the date range
+MAX_BAR_LABELS = 31  # value labels are only drawn above this few bars
+
+RANGES = {
+    "Last 30 Days": 30,
+    "Last 90 Days": 90,
+    "Last 12 Months": 365,
+    "All Time": None,
+}
+
+
+def bucket_sales(sales_by_date, start=None, end=None, max_bars=MAX_BARS):
+    """Aggregate daily sales into day, week, month or year buckets.
+
+    ``sales_by_date`` is a Series of totals indexed by ISO date. Only days
+    from ``start`` to ``end`` (Timestamps, inclusive, None for open-ended)
+    are used, and the smallest bucket size that yields at most ``max_bars``
+    buckets is picked. Returns the bucket name and a Series of totals
+    indexed by bucket label, with empty buckets as zero.
+    """
+    series = sales_by_date.copy()
+    series.index = pd.to_datetime(series.index, errors="coerce")
+    series = series[series.index.notna()].sort_index()
+    start = series.index.min() if start is None else start
+    end = series.index.max() if end is None else end
+    series = series[(series.index >= start) & (series.index <= end)]
+    if series.empty:
+        return BUCKETS[0][0], pd.Series(dtype=float)
+    span_days = (end - start).days + 1
+    for name, length, rule, label_format in BUCKETS:
+        if span_days / length <= max_bars:
+            break
+    if rule == "W-MON":
+        buckets = series.resample(rule, label="left", closed="left").sum()
+    else:
+        buckets = series.resample(rule).sum()
+    buckets.index = buckets.index.strftime(label_format)
+    return name, buckets
+
+
+class ReportDashboard:
+    """Report window that is built once and refreshed in place.
+
+    The figures, canvases, metric labels and table are created the first
+    time the dashboard opens. ``update`` then changes bar heights, pie wedge
+    angles and label texts on the existing artists and asks the canvas for
+    an idle redraw, instead of building new figures on every open. Closing
+    the window only hides it; the figures are released when the window is
+    destroyed together with the main window.
+
+    Figures are created with ``matplotlib.figure.Figure`` rather than
+    ``pyplot`` so they are never registered with pyplot's global figure
+    manager and cannot accumulate there.
+    """
+
+    def __init__(self, parent):
+        self.window = tk.Toplevel(parent)
+        self.window.title("Report Dashboard")
+        self.window.geometry("1000x800")
+        self.window.configure(bg="#f0f0f0")
+        self.window.protocol("WM_DELETE_WINDOW", self.hide)
+        self.window.bind("<Destroy>", self._on_destroy)
+        self.cursor = None
+        self.sales_by_date = pd.Series(dtype=float)  # daily, full history
+        self.buckets = None  # what the bar chart currently shows
+        self.bucket_name = BUCKETS[0][0]
+        self.range_days = None  # None shows the whole history
+        self.range_end = None  # None keeps the range ending at the latest day
+        self.table_items = {}
+        # Close Button
+        close_button = ttk.Button(
+            self.window,
+            text="Close",
+            command=self.hide,
+            style="TButton",
+        )
+        close_button.pack(anchor="ne", padx=10, pady=10)
+        # Top Section: Metric Boxes (Left-Aligned)
+        box_frame = tk.Frame(self.window, bg="#f0f0f0")
+        box_frame.pack(side="left", anchor="nw", padx=20, pady=20, fill="y")
+        self.metric_labels = {
+            "total_orders": self._metric_box(box_frame, "Total Orders", "#4CAF50"),
+            "total_sales": self._metric_box(box_frame, "Total Sales (Rs)", "#FF9800"),
+            "orders_today": self._metric_box(box_frame, "Orders Today", "#2196F3"),
+            "sales_today": self._metric_box(box_frame, "Sales Today (Rs)", "#E91E63"),
+        }
+        # Range selector for the Sales by Date chart
+        range_frame = tk.Frame(self.window, bg="#f0f0f0")
+        range_frame.pack(side="top", fill="x", padx=20)
+        self.range_var = tk.StringVar(value="All Time")
+        range_combobox = ttk.Combobox(
+            range_frame,
+            textvariable=self.range_var,
+            values=list(RANGES),
+            state="readonly",
+            width=15,
+        )
+        range_combobox.pack(side="left", padx=5)
+        range_combobox.bind("<<ComboboxSelected>>", self._on_range_selected)
+        for text, command in (
+            ("◀", lambda: self.pan(-1)),
+            ("▶", lambda: self.pan(1)),
+            ("＋", lambda: self.zoom(0.5)),
+            ("－", lambda: self.zoom(2)),
+        ):
+            ttk.Button(range_frame, text=text, width=3, command=command).pack(side="left", padx=2)
+        self.range_label = ttk.Label(range_frame, text="", background="#f0f0f0")
+        self.range_label.pack(side="left", padx=10)
+        # Middle Section: Bar Chart and Pie Chart (Side-by-Side)
+        chart_frame = tk.Frame(self.window, bg="#f0f0f0")
+        chart_frame.pack(side="top", fill="both", expand=True, padx=20, pady=20)
+        # Bar Chart (Left Side)
+        self.bar_figure = Figure(figsize=(6, 4))
+        self.bar_axes = self.bar_figure.add_subplot()
+        self._reset_bar_axes()
+        self.bars = None
+        self.bar_labels = []
+        self.bar_canvas = FigureCanvasTkAgg(self.bar_figure, master=chart_frame)
+        self.bar_canvas.get_tk_widget().pack(side="left", fill="both", expand=True, padx=10)
+        # Pie Chart (Right Side)
+        self.pie_figure = Figure(figsize=(4, 4))
+        self.pie_axes = self.pie_figure.add_subplot()
+        self.pie_axes.set_title("Revenue Breakdown")
+        self.wedges = []
+        self.pie_labels = []
+        self.pie_pcts = []
+        self.pie_keys = None
+        self.pie_canvas = FigureCanvasTkAgg(self.pie_figure, master=chart_frame)
+        self.pie_canvas.get_tk_widget().pack(side="right", fill="both", expand=True, padx=10)
+        # Bottom Section: Table Below the Bar Chart
+        table_frame = tk.Frame(self.window, bg="#f0f0f0")
+        table_frame.pack(side="bottom", fill="both", expand=True, padx=20, pady=20)
+        self.table = ttk.Treeview(
+            table_frame,
+            columns=(
+                "Period",
+                "Total Sales (Rs)",
+            ),
+            show="headings",
+        )
+        self.table.pack(side="top", fill="both", expand=True)
+        self.table.heading("Period", text="Date")
+        self.table.heading("Total Sales (Rs)", text="Total Sales (Rs)")
+        self.table.column("Period", width=150)
+        self.table.column("Total Sales (Rs)", width=150)
+
+    @staticmethod
+    def _metric_box(parent, title, color):
+        """Create a metric box and return the label that shows its value."""
+        box = tk.Frame(parent, bg=color, padx=20, pady=20)
+        box.pack(side="top", padx=10, pady=10, fill="both", expand=True)
+        ttk.Label(box, text=title, font=("Arial", 14, "bold"), background=color, foreground="white").pack()
+        value_label = ttk.Label(box, text="", font=("Arial", 18), background=color, foreground="white")
+        value_label.pack()
+        return value_label
+
+    def is_alive(self):
+        return bool(self.window.winfo_exists())
+
+    def show(self):
+        self.window.deiconify()
+        self.window.lift()
+
+    def hide(self):
+        self.window.withdraw()
+
+    def is_visible(self):
+        return self.is_alive() and self.window.winfo_viewable()
+
+    def update(self, data):
+        """Show new figures (as produced by the app's ``report_data``)."""
+        self.metric_labels["total_orders"].configure(text=data["total_orders"])
+        self.metric_labels["total_sales"].configure(text=f"{data['total_sales']:.2f}")
+        self.metric_labels["orders_today"].configure(text=data["orders_today"])
+        self.metric_labels["sales_today"].configure(text=f"{data['sales_today']:.2f}")
+        self.sales_by_date = data["sales_by_date"]
+        self._update_pie(data["revenue_breakdown"])
+        self.pie_canvas.draw_idle()
+        self.show_range()
+
+    def show_range(self):
+        """Redraw the Sales by Date chart and table for the selected range."""
+        start, end = self._range_bounds()
+        self.bucket_name, buckets = bucket_sales(self.sales_by_date, start, end)
+        if buckets.empty:
+            self.range_label.configure(text="No sales in this range")
+        else:
+            self.range_label.configure(
+                text=f"{buckets.index[0]} to {buckets.index[-1]} by {self.bucket_name.lower()}"
+            )
+        self._update_bars(buckets)
+        self._update_table(buckets)
+        self.bar_canvas.draw_idle()
+
+    def _range_bounds(self):
+        if self.range_days is None or self.sales_by_date.empty:
+            return None, None
+        latest = pd.Timestamp(max(self.sales_by_date.index))
+        end = self.range_end if self.range_end is not None else latest
+        return end - pd.Timedelta(days=self.range_days - 1), end
+
+    def pan(self, direction):
+        """Move the range back (-1) or forward (1) by half its length."""
+        if self.range_days is None or self.sales_by_date.empty:
+            return
+        latest = pd.Timestamp(max(self.sales_by_date.index))
+        end = self.range_end if self.range_end is not None else latest
+        end += pd.Timedelta(days=direction * max(1, self.range_days // 2))
+        self.range_end = None if end >= latest else end
+        self.show_range()
+
+    def zoom(self, factor):
+        """Shrink (factor < 1) or grow (factor > 1) the range around its end."""
+        if self.sales_by_date.empty:
+            return
+        if self.range_days is None:
+            first = pd.Timestamp(min(self.sales_by_date.index))
+            latest = pd.Timestamp(max(self.sales_by_date.index))
+            self.range_days = (latest - first).days + 1
+        self.range_days = max(7, int(self.range_days * factor))
+        self.range_var.set("Custom")
+        self.show_range()
+
+    def _on_range_selected(self, event=None):
+        self.range_days = RANGES[self.range_var.get()]
+        self.range_end = None
+        self.show_range()
+
+    def _update_bars(self, buckets):
+        same_buckets = self.buckets is not None and list(buckets.index) == list(self.buckets.index)
+        self.buckets = buckets
+        if same_buckets:
+            # Only the heights changed: move the existing bars and labels
+            for bar, height in zip(self.bars, buckets.values):
+                bar.set_height(height)
+            for bar, label, height in zip(self.bars, self.bar_labels, buckets.values):
+                label.xy = (bar.get_x() + bar.get_width() / 2, height)
+                label.set_text(f"{height:.2f}")
+            self.bar_axes.relim()
+            self.bar_axes.autoscale_view()
+            return
+        # The buckets changed, so the bar container has to be rebuilt
+        if self.cursor is not None:
+            self.cursor.remove()
+            self.cursor = None
+        # Clearing the axes also drops the old bucket categories
+        self._reset_bar_axes()
+        self.bars = self.bar_axes.bar(list(buckets.index), buckets.values, color="skyblue")
+        # Add exact numbers on top of each bar while there is room for them
+        self.bar_labels = []
+        if len(buckets) <= MAX_BAR_LABELS:
+            self.bar_labels = self.bar_axes.bar_label(self.bars, fmt="%.2f", label_type="edge", fontsize=8)
+        # Rotate x-axis labels for better readability
+        for tick in self.bar_axes.get_xticklabels():
+            tick.set_rotation(45)
+            tick.set_horizontalalignment("right")
+        self.bar_axes.relim()
+        self.bar_axes.autoscale_view()
+        if not len(self.bars):
+            return
+        # Add hover tooltips using mplcursors
+        self.cursor = mplcursors.cursor(self.bars, hover=True)
+        self.cursor.connect(
+            "add",
+            lambda sel: sel.annotation.set_text(
+                f"{self.bucket_name}: {self.buckets.index[sel.target.index]}\n"
+                f"Revenue: {self.buckets.iloc[sel.target.index]:.2f} Rs"
+            ),
+        )
+
+    def _reset_bar_axes(self):
+        self.bar_axes.clear()
+        self.bar_axes.set_title(f"Sales by {self.bucket_name}")
+        self.bar_axes.set_xlabel(self.bucket_name)
+        self.bar_axes.set_ylabel("Total Sales (Rs)")
+
+    def _update_pie(self, revenue_breakdown):
+        keys = list(revenue_breakdown)
+        values = [float(value) for value in revenue_breakdown.values()]
+        if keys != self.pie_keys:
+            self.pie_axes.clear()
+            self.pie_axes.set_title("Revenue Breakdown")
+            # Draw equal placeholder wedges; the angles are set below
+            self.wedges, self.pie_labels, self.pie_pcts = self.pie_axes.pie(
+                [1] * len(keys), labels=keys, autopct="%1.1f%%", startangle=90
+            )
+            self.pie_keys = keys
+        total = sum(values)
+        angle = 90.0
+        for wedge, label, pct, value in zip(self.wedges, self.pie_labels, self.pie_pcts, values):
+            share = value / total if total else 0.0
+            theta1, theta2 = angle, angle + 360.0 * share
+            wedge.set_theta1(theta1)
+            wedge.set_theta2(theta2)
+            middle = math.radians((theta1 + theta2) / 2)
+            label.set_position((1.1 * math.cos(middle), 1.1 * math.sin(middle)))
+            label.set_horizontalalignment("left" if math.cos(middle) > 0 else "right")
+            pct.set_position((0.6 * math.cos(middle), 0.6 * math.sin(middle)))
+            pct.set_text(f"{share * 100:.1f}%")
+            for artist in (wedge, label, pct):
+                artist.set_visible(share > 0)
+            angle = theta2
+
+    def _update_table(self, buckets):
+        self.table.heading("Period", text=self.bucket_name)
+        dates = list(buckets.index)
+        if list(self.table_items) != dates:
+            self.table.delete(*self.table.get_children())
+            self.table_items = {
+                date: self.table.insert("", "end", values=(date, "")) for date in dates
+            }
+        for date, total in buckets.items():
+            self.table.item(self.table_items[date], values=(date, f"{total:.2f}"))
+
+    def _on_destroy(self, event):
+        if event.widget is not self.window:
+            return
+        if self.cursor is not None:
+            self.cursor.remove()
+            self.cursor = None
+        self.bar_figure.clear()
+        self.pie_figure.clear()
@@ -0,0 +1,58 @@
+from datetime import date, datetime, timedelta
+
+
+# Formats accepted in the date entry fields, tried in order
+DATE_FORMATS = ["%Y-%m-%d", "%Y/%m/%d", "%d/%m/%Y", "%d-%m-%Y", "%d.%m.%Y"]
+
+PRESETS = ["Today", "Yesterday", "This Week", "This Month", "This Year"]
+
+
+def parse_date(text):
+    """Parse a typed date and return it as a ``datetime.date``.
+
+    Accepts ISO dates (2025-03-07), day-first dates (07/03/2025, 07-03-2025,
+    07.03.2025) and the words "today" and "yesterday". Raises ValueError with
+    a message suitable for showing to the user.
+    """
+    text = text.strip()
+    if text.lower() == "today":
+        return date.today()
+    if text.lower() == "yesterday":
+        return date.today() - timedelta(days=1)
+    for date_format in DATE_FORMATS:
+        try:
+            return datetime.strptime(text, date_format).date()
+        except ValueError:
+            continue
+    raise ValueError(f"'{text}' is not a valid date. Use YYYY-MM-DD.")
+
+
+def parse_date_range(start_text, end_text):
+    """Parse and validate a typed range, returning ISO strings (start, end)."""
+    start = parse_date(start_text)
+    end = parse_date(end_text)
+    if start > end:
+        raise ValueError("Start date must be on or before end date.")
+    return start.isoformat(), end.isoformat()
+
+
+def preset_range(name, today=None):
+    """Return the ISO (start, end) dates for one of ``PRESETS``."""
+    today = today or date.today()
+    if name == "Today":
+        start = end = today
+    elif name == "Yesterday":
+        start = end = today - timedelta(days=1)
+    elif name == "This Week":
+        start = today - timedelta(days=today.weekday())
+        end = start + timedelta(days=6)
+    elif name == "This Month":
+        start = today.replace(day=1)
+        next_month = (start + timedelta(days=32)).replace(day=1)
+        end = next_month - timedelta(days=1)
+    elif name == "This Year":
+        start = today.replace(month=1, day=1)
+        end = today.replace(month=12, day=31)
+    else:
+        raise ValueError(f"Unknown date range: {name}")
+    return start.isoformat(), end.isoformat()
@@ -0,0 +1,85 @@
+import os
+import threading
+import time
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+
+class FileLock:
+    """Advisory lock on a file, shared by every terminal that opens it.
+
+    Terminals that keep their orders in one network folder take this lock
+    around each write, so only one of them writes at a time. It is an
+    ``fcntl`` record lock on POSIX, which also holds across NFS, and a
+    ``msvcrt`` byte-range lock on Windows, which holds across SMB shares.
+    Both are released by the operating system when the process exits, so a
+    crashed terminal never leaves the lock behind. The lock file itself is
+    empty and never removed.
+
+    Those locks belong to a process, not a thread, so threads of the same
+    process also queue on a ``threading.Lock``. ``acquire`` polls every
+    ``poll`` seconds and raises ``TimeoutError`` after ``timeout``.
+    """
+
+    def __init__(self, path, timeout=10.0, poll=0.01):
+        self.path = path
+        self.timeout = timeout
+        self.poll = poll
+        self._thread_lock = threading.Lock()
+        self._file = None
+
+    def acquire(self):
+        deadline = time.monotonic() + self.timeout
+        if not self._thread_lock.acquire(timeout=self.timeout):
+            raise TimeoutError(f"Could not lock {self.path}")
+        try:
+            file = open(self.path, "a+b")
+            while not self._try_lock(file):
+                if time.monotonic() >= deadline:
+                    file.close()
+                    raise TimeoutError(f"Could not lock {self.path}: another terminal is saving")
+                time.sleep(self.poll)
+        except BaseException:
+            self._thread_lock.release()
+            raise
+        self._file = file
+
+    @staticmethod
+    def _try_lock(file):
+        try:
+            if fcntl is not None:
+                fcntl.lockf(file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+            else:
+                file.seek(0)
+                msvcrt.locking(file.fileno(), msvcrt.LK_NBLCK, 1)
+        except OSError:
+            return False
+        return True
+
+    def release(self):
+        file, self._file = self._file, None
+        try:
+            if fcntl is not None:
+                fcntl.lockf(file.fileno(), fcntl.LOCK_UN)
+            else:
+                file.seek(0)
+                msvcrt.locking(file.fileno(), msvcrt.LK_UNLCK, 1)
+        finally:
+            file.close()
+            self._thread_lock.release()
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.release()
+
+
+def lock_path(path):
+    """Return the lock file guarding writes to ``path``."""
+    return os.fspath(path) + ".lock"
@@ -0,0 +1,85 @@
+import queue
+from concurrent.futures import ThreadPoolExecutor
+from tkinter import messagebox
+
+
+class IOExecutor:
+    """Runs storage and rendering work off the Tk event thread.
+
+    Writes go to a single writer thread so mutations are applied in the order
+    they were submitted; reads and rendering use a small pool. Finished work
+    is handed back through a queue that the Tk thread polls with
+    ``root.after``, so callbacks always run on the Tk thread and may touch
+    widgets. ``on_busy`` is called with True while any work is outstanding
+    and with False once everything has finished; work submitted with
+    ``quiet`` set, such as a periodic poll, does not count.
+    """
+
+    def __init__(self, root, on_busy=None, readers=2, poll_ms=50):
+        self.root = root
+        self.on_busy = on_busy
+        self.poll_ms = poll_ms
+        self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="io-writer")
+        self._readers = ThreadPoolExecutor(max_workers=readers, thread_name_prefix="io-reader")
+        self._results = queue.Queue()
+        self._pending = 0  # work shown by the busy indicator
+        self._outstanding = 0  # all work, quiet or not
+        self._polling = False
+
+    def submit_write(self, func, *args, on_done=None, on_error=None, quiet=False):
+        """Queue a mutation behind every previously submitted write."""
+        return self._submit(self._writer, func, args, on_done, on_error, quiet)
+
+    def submit_read(self, func, *args, on_done=None, on_error=None, quiet=False):
+        """Run a read or rendering job on the reader pool."""
+        return self._submit(self._readers, func, args, on_done, on_error, quiet)
+
+    def _submit(self, executor, func, args, on_done, on_error, quiet):
+        self._outstanding += 1
+        if not quiet:
+            self._pending += 1
+            if self._pending == 1 and self.on_busy:
+                self.on_busy(True)
+        future = executor.submit(func, *args)
+        future.add_done_callback(
+            lambda done: self._results.put((done, on_done, on_error, quiet))
+        )
+        if not self._polling:
+            self._polling = True
+            self.root.after(self.poll_ms, self._poll)
+        return future
+
+    def _poll(self):
+        busy_finished = False
+        while True:
+            try:
+                future, on_done, on_error, quiet = self._results.get_nowait()
+            except queue.Empty:
+                break
+            self._outstanding -= 1
+            if not quiet:
+                self._pending -= 1
+                busy_finished = True
+            try:
+                error = future.exception()
+                if error is not None:
+                    (on_error or self._show_error)(error)
+                elif on_done:
+                    on_done(future.result())
+            except Exception as e:
+                self._show_error(e)
+        if busy_finished and self._pending == 0 and self.on_busy:
+            self.on_busy(False)
+        if self._outstanding:
+            self.root.after(self.poll_ms, self._poll)
+        else:
+            self._polling = False
+
+    @staticmethod
+    def _show_error(error):
+        messagebox.showerror("Error", f"An error occurred: {error}")
+
+    def shutdown(self):
+        """Wait for queued work to finish and stop the worker threads."""
+        self._writer.shutdown(wait=True)
+        self._readers.shutdown(wait=True)
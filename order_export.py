@@ -0,0 +1,228 @@
+import hashlib
+import json
+import os
+from datetime import datetime
+
+from catalog import quantity_column, quantity_columns
+from order_journal import atomic_write
+from order_schema import frame_columns
+
+
+EXPORT_FORMATS = {".csv": "csv", ".parquet": "parquet", ".xlsx": "xlsx"}
+CHUNK_ROWS = 10_000  # orders converted and written at a time
+
+
+def export_columns(store):
+    """Return the exported columns: a "<product id> Quantity" column per product."""
+    return frame_columns(store.product_ids())
+
+
+def _normalize(chunk, columns):
+    """Give a compact chunk of orders the fixed column types every writer expects.
+
+    Phone numbers become ten-digit text as in the order table, dates ISO
+    text, quantities whole numbers and totals floats, and the columns are
+    ``columns``, so each chunk has the same schema.
+    """
+    import pandas as pd
+
+    phone = chunk["Phone Number"]
+    values = {
+        "Order No": chunk["Order No"].astype(str),
+        "Date": chunk["Date"].dt.strftime("%Y-%m-%d").fillna(""),
+        "Customer Name": chunk["Customer Name"].astype(str),
+        "Phone Number": phone.astype(str).str.zfill(10).where(phone.notna(), ""),
+        "Address": chunk["Address"].astype(str),
+        "Total": chunk["Total"] / 100,
+        "Status": chunk["Status"].astype(str),
+    }
+    for product_id in quantity_columns(columns):
+        column = quantity_column(product_id)
+        values[column] = chunk[column].astype("int64") if column in chunk else 0
+    return pd.DataFrame(values, columns=columns), chunk["Date"]
+
+
+def export_chunks(store, start=None, end=None, status=None, chunk_rows=CHUNK_ROWS, columns=None):
+    """Yield the orders to export as normalized DataFrames, chunk by chunk.
+
+    ``start`` and ``end`` are inclusive ISO dates (None for open-ended) and
+    ``status`` of None matches every status. Filtering happens per chunk,
+    so the full history is never materialized at once. ``columns`` default
+    to ``export_columns``.
+    """
+    import pandas as pd
+
+    columns = columns or export_columns(store)
+    for chunk in store.chunks(chunk_rows):
+        frame, dates = _normalize(chunk, columns)
+        keep = pd.Series(True, index=frame.index)
+        if start is not None:
+            keep &= dates >= pd.Timestamp(start)
+        if end is not None:
+            keep &= dates <= pd.Timestamp(end)
+        if status is not None:
+            keep &= frame["Status"] == status
+        if keep.any():
+            yield frame[keep]
+
+
+def _write_csv(chunks, path, columns):
+    rows = 0
+    with open(path, "w", newline="", encoding="utf-8") as file:
+        file.write(",".join(columns) + "\n")
+        for chunk in chunks:
+            chunk.to_csv(file, header=False, index=False)
+            rows += len(chunk)
+    return rows
+
+
+def _write_parquet(chunks, path, columns):
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError as e:
+        raise ImportError("Parquet export needs pyarrow: pip install pyarrow") from e
+
+    types = {"Total": pa.float64()}
+    types.update((quantity_column(product_id), pa.int64()) for product_id in quantity_columns(columns))
+    schema = pa.schema([(column, types.get(column, pa.string())) for column in columns])
+    rows = 0
+    with pq.ParquetWriter(path, schema) as writer:
+        for chunk in chunks:
+            writer.write_table(pa.Table.from_pandas(chunk, schema=schema, preserve_index=False))
+            rows += len(chunk)
+    return rows
+
+
+def _write_xlsx(chunks, path, columns):
+    import pandas as pd
+    from openpyxl import Workbook
+    from openpyxl.cell import WriteOnlyCell
+    from openpyxl.styles import Font, PatternFill
+    from openpyxl.utils import get_column_letter
+
+    # Write-only sheets stream rows to disk instead of keeping them in memory
+    workbook = Workbook(write_only=True)
+    header_font = Font(bold=True, color="FFFFFF")
+    header_fill = PatternFill("solid", fgColor="4CAF50")
+
+    def header(sheet, names, widths):
+        sheet.freeze_panes = "A2"
+        for number, width in enumerate(widths, 1):
+            sheet.column_dimensions[get_column_letter(number)].width = width
+        cells = []
+        for name in names:
+            cell = WriteOnlyCell(sheet, value=name)
+            cell.font = header_font
+            cell.fill = header_fill
+            cells.append(cell)
+        sheet.append(cells)
+
+    def money(sheet, value):
+        cell = WriteOnlyCell(sheet, value=value)
+        cell.number_format = "#,##0.00"
+        return cell
+
+    quantities = [quantity_column(product_id) for product_id in quantity_columns(columns)]
+    summary_columns = ["Date", "Orders"] + quantities + ["Total"]
+    orders_sheet = workbook.create_sheet("Orders")
+    header(orders_sheet, columns, [12, 12, 24, 14, 30] + [14] * len(quantities) + [14, 14])
+    total_position = columns.index("Total")
+    rows = 0
+    days = None
+    for chunk in chunks:
+        for values in chunk.itertuples(index=False):
+            values = list(values)
+            values[total_position] = money(orders_sheet, values[total_position])
+            orders_sheet.append(values)
+        rows += len(chunk)
+        # Per-day sums are small, so they are combined as the chunks go by
+        sums = chunk.groupby("Date").agg(
+            Orders=("Order No", "size"),
+            **{name: (name, "sum") for name in quantities + ["Total"]},
+        )
+        days = sums if days is None else days.add(sums, fill_value=0)
+
+    summary_sheet = workbook.create_sheet("Daily Summary")
+    header(summary_sheet, summary_columns, [12, 10] + [14] * len(quantities) + [16])
+    if days is None:
+        days = pd.DataFrame(columns=summary_columns[1:])
+    for day, values in days.sort_index().iterrows():
+        summary_sheet.append(
+            [day, int(values["Orders"])]
+            + [int(values[name]) for name in quantities]
+            + [money(summary_sheet, float(values["Total"]))]
+        )
+    bold = Font(bold=True)
+    total_cells = [WriteOnlyCell(summary_sheet, value="Total")]
+    for name in summary_columns[1:]:
+        value = days[name].sum() if len(days) else 0
+        cell = money(summary_sheet, float(value)) if name == "Total" else WriteOnlyCell(summary_sheet, value=int(value))
+        cell.font = bold
+        total_cells.append(cell)
+    total_cells[0].font = bold
+    summary_sheet.append(total_cells)
+    workbook.save(path)
+    return rows
+
+
+WRITERS = {"csv": _write_csv, "parquet": _write_parquet, "xlsx": _write_xlsx}
+
+
+def file_checksum(path, block_size=1 << 20):
+    """Return the SHA-256 hex digest of a file, read in blocks."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as file:
+        for block in iter(lambda: file.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def manifest_path(path):
+    return path + ".manifest.json"
+
+
+def export_orders(store, path, start=None, end=None, status=None, chunk_rows=CHUNK_ROWS):
+    """Export orders to a CSV, Parquet or XLSX file, with a checksum manifest.
+
+    The format follows the file extension. XLSX exports also get a "Daily
+    Summary" sheet. Rows are streamed ``chunk_rows`` at a time, and the
+    file is written through a temporary file so readers never see half an
+    export. Next to it, ``<path>.manifest.json`` records the SHA-256, size,
+    row count and filters. Returns the manifest as a dict.
+    """
+    extension = os.path.splitext(path)[1].lower()
+    if extension not in EXPORT_FORMATS:
+        raise ValueError(f"Unsupported export format: {path} (use {', '.join(EXPORT_FORMATS)})")
+    export_format = EXPORT_FORMATS[extension]
+    manifest = {
+        "file": os.path.basename(path),
+        "format": export_format,
+        "filters": {"start": start, "end": end, "status": status},
+        "created": datetime.now().isoformat(timespec="seconds"),
+    }
+
+    columns = export_columns(store)
+
+    def write(tmp_path):
+        chunks = export_chunks(store, start, end, status, chunk_rows, columns)
+        manifest["rows"] = WRITERS[export_format](chunks, tmp_path, columns)
+        manifest["bytes"] = os.path.getsize(tmp_path)
+        manifest["sha256"] = file_checksum(tmp_path)
+
+    atomic_write(path, write)
+    data = json.dumps(manifest, indent=2)
+
+    def write_manifest(tmp_path):
+        with open(tmp_path, "w") as file:
+            file.write(data)
+
+    atomic_write(manifest_path(path), write_manifest)
+    return manifest
+
+
+def verify_export(path):
+    """Return True if ``path`` still matches the checksum in its manifest."""
+    with open(manifest_path(path), "r") as file:
+        manifest = json.load(file)
+    return file_checksum(path) == manifest["sha256"]
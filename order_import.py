@@ -0,0 +1,203 @@
+import os
+import uuid
+from datetime import date, datetime, timedelta
+
+from catalog import quantity_column, quantity_columns
+from date_filters import DATE_FORMATS
+from order_service import INVALID_NUMBERS, NO_PRODUCT
+from order_store import COLUMNS
+
+
+CHUNK_ROWS = 10_000  # rows parsed and validated at a time
+INTEGER = r"[+-]?\d+"  # what int() accepts from a typed field
+QUANTITY = r"\+?\d+"  # the integers order_fields accepts as a quantity
+MAX_PHONE_DIGITS = 18  # keeps phone numbers within int64
+
+
+def _cell_text(value):
+    # Workbook cells come back typed; turn them into what would be typed
+    if value is None:
+        return ""
+    if isinstance(value, datetime):
+        return value.date().isoformat()
+    if isinstance(value, date):
+        return value.isoformat()
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value)
+
+
+def read_chunks(path, chunk_rows=CHUNK_ROWS):
+    """Yield the rows of a CSV file or workbook as DataFrames of text.
+
+    CSV files are read with chunked ``read_csv`` and workbooks with a
+    read-only openpyxl sheet, so at most ``chunk_rows`` rows are held at a
+    time however large the file is.
+    """
+    import pandas as pd
+
+    extension = os.path.splitext(path)[1].lower()
+    if extension == ".csv":
+        for chunk in pd.read_csv(path, dtype=str, keep_default_na=False, chunksize=chunk_rows):
+            chunk.columns = chunk.columns.str.strip()
+            yield chunk
+        return
+    if extension not in (".xlsx", ".xlsm"):
+        raise ValueError(f"Unsupported import file: {path}")
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(path, read_only=True, data_only=True)
+    try:
+        rows = workbook.active.iter_rows(values_only=True)
+        header = [_cell_text(value).strip() for value in next(rows, ())]
+        chunk = []
+        for row in rows:
+            values = [_cell_text(value) for value in row[: len(header)]]
+            chunk.append(values + [""] * (len(header) - len(values)))
+            if len(chunk) == chunk_rows:
+                yield pd.DataFrame(chunk, columns=header)
+                chunk = []
+        if chunk:
+            yield pd.DataFrame(chunk, columns=header)
+    finally:
+        workbook.close()
+
+
+def _parse_dates(text, today):
+    """Parse a column of typed dates like ``parse_date``; NaN where invalid."""
+    import pandas as pd
+
+    parsed = pd.Series(pd.NaT, index=text.index, dtype="datetime64[ns]")
+    for date_format in DATE_FORMATS:
+        missing = parsed.isna() & (text != "")
+        if not missing.any():
+            break
+        parsed[missing] = pd.to_datetime(text[missing], format=date_format, errors="coerce")
+    iso = parsed.dt.strftime("%Y-%m-%d")
+    words = text.str.lower()
+    iso[(text == "") | (words == "today")] = today.isoformat()
+    iso[words == "yesterday"] = (today - timedelta(days=1)).isoformat()
+    return iso
+
+
+def validate_chunk(df, catalog, first_line=2, today=None, taken=None):
+    """Validate imported rows with the rules of ``order_fields``, column-wise.
+
+    ``df`` holds the rows as text, with the workbook column names: a
+    "<product id> Quantity" column per product. Missing columns count as
+    empty. Empty quantities are zero, an empty status is "Pending" and an
+    empty date is ``today``. ``first_line`` is the file line of the first
+    row, for error messages. Totals are priced by an as-of join of the
+    rows' line items with the catalog's price history on the order date.
+    ``taken(order_no)`` tells whether an order number is already in use;
+    rows with such a number, or the number of an earlier row, are rejected.
+
+    Returns the accepted rows as a list of order dicts, without order
+    numbers assigned yet (see ``import_orders``), and a list of
+    (line, message) pairs for the rejected rows.
+    """
+    import pandas as pd
+
+    today = today or date.today()
+
+    def column(name):
+        if name not in df:
+            return pd.Series("", index=df.index)
+        return df[name].fillna("").astype(str).str.strip()
+
+    # The first rule a row breaks is the one reported, as in order_fields
+    error = pd.Series(None, index=df.index, dtype=object)
+
+    def reject(mask, message):
+        error.mask(mask & error.isna(), message, inplace=True)
+
+    for product_id in quantity_columns(df.columns):
+        if product_id not in catalog:
+            reject(~column(quantity_column(product_id)).isin(["", "0"]), f"Unknown product: {product_id}")
+    products = list(catalog)
+    quantities = pd.DataFrame(
+        {product_id: column(quantity_column(product_id)).replace("", "0") for product_id in products},
+        index=df.index,
+    )
+    qty_valid = quantities.apply(lambda text: text.str.fullmatch(QUANTITY)).all(axis=1)
+    reject(~qty_valid, INVALID_NUMBERS)
+    quantities = quantities.where(qty_valid, "0").apply(pd.to_numeric).astype("int64")
+    reject((quantities == 0).all(axis=1), NO_PRODUCT)
+
+    phone = column("Phone Number")
+    phone_valid = phone.str.fullmatch(INTEGER) & (phone.str.len() <= MAX_PHONE_DIGITS)
+    reject(~phone_valid, INVALID_NUMBERS)
+    phone = pd.to_numeric(phone.where(phone_valid, "0")).astype("int64")
+
+    typed_dates = column("Date")
+    dates = _parse_dates(typed_dates, today)
+    reject(dates.isna(), "'" + typed_dates + "' is not a valid date. Use YYYY-MM-DD.")
+
+    order_no = column("Order No")
+    in_use = order_no.where(error.isna()).duplicated()
+    if taken is not None:
+        in_use |= order_no.map(taken).astype(bool)
+    reject(in_use & (order_no != ""), "Order No " + order_no + " is already in use.")
+
+    accepted = error.isna()
+    lines = pd.RangeIndex(first_line, first_line + len(df))
+    errors = list(zip(lines[~accepted.to_numpy()].tolist(), error[~accepted].tolist()))
+    line_items = quantities.rename_axis(index="Order No", columns="Product").stack().rename("Quantity").reset_index()
+    line_items = line_items[line_items["Quantity"] != 0]
+    line_items.insert(1, "Date", dates.loc[line_items["Order No"]].to_numpy())
+    total = catalog.order_totals(line_items).reindex(df.index, fill_value=0.0)
+    items = [
+        {product_id: quantity for product_id, quantity in zip(products, row) if quantity}
+        for row in quantities.itertuples(index=False)
+    ]
+    values = {
+        "Order No": order_no,
+        "Date": dates,
+        "Customer Name": column("Customer Name"),
+        "Phone Number": phone,
+        "Address": column("Address"),
+        "Items": pd.Series(items, index=df.index, dtype=object),
+        "Total": total.astype(float),
+        "Status": column("Status").replace("", "Pending"),
+    }
+    orders = [
+        dict(zip(COLUMNS, row))
+        for row in zip(*(values[name][accepted].tolist() for name in COLUMNS))
+    ]
+    return orders, errors
+
+
+def import_orders(store, path, catalog, chunk_rows=CHUNK_ROWS, today=None):
+    """Import every valid order in a CSV file or workbook into ``store``.
+
+    Rows are read and validated ``chunk_rows`` at a time. Accepted rows
+    keep their "Order No", or get a new one if it is empty; rows whose
+    number is already in use, in the store or earlier in the file, are
+    rejected, so existing orders are never overwritten. All accepted rows
+    are committed together with ``OrderStore.add_many``, so an import that
+    fails part-way adds nothing.
+
+    Returns the number of orders added and the (line, message) pairs of
+    the rejected rows.
+    """
+    accepted, errors = [], []
+    numbers = set()
+
+    def taken(order_no):
+        return order_no in numbers or order_no in store
+
+    line = 2  # Line 1 is the header
+    for chunk in read_chunks(path, chunk_rows):
+        orders, chunk_errors = validate_chunk(chunk, catalog, line, today, taken)
+        accepted.extend(orders)
+        errors.extend(chunk_errors)
+        numbers.update(order["Order No"] for order in orders if order["Order No"])
+        line += len(chunk)
+    for order in accepted:
+        while not order["Order No"]:
+            order_no = str(uuid.uuid4())[:8]
+            if not taken(order_no):
+                numbers.add(order_no)
+                order["Order No"] = order_no
+    store.add_many(accepted)
+    return len(accepted), errors
@@ -0,0 +1,177 @@
+import glob
+import json
+import os
+import stat
+import tempfile
+import threading
+
+
+def atomic_write(path, write):
+    """Write ``path`` through a temporary file that is renamed into place.
+
+    ``write`` is called with the temporary path. Readers see either the old
+    file or the complete new one, never a partially written file. The new
+    file keeps the permissions of the one it replaces, or gets the usual
+    ones for a new file, not the owner-only mode of a temporary file.
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    suffix = os.path.splitext(path)[1]
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".tmp-", suffix=suffix)
+    os.close(fd)
+    try:
+        write(tmp_path)
+        with open(tmp_path, "rb") as file:
+            os.fsync(file.fileno())
+        os.chmod(tmp_path, _file_mode(path))
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    _fsync_directory(directory)
+
+
+def _read_umask():
+    # The umask can only be read by setting it, so this is done once, at
+    # import, before any other thread creates files
+    umask = os.umask(0)
+    os.umask(umask)
+    return umask
+
+
+UMASK = _read_umask()
+
+
+def _file_mode(path):
+    try:
+        return stat.S_IMODE(os.stat(path).st_mode)
+    except FileNotFoundError:
+        return 0o666 & ~UMASK
+
+
+def _fsync_directory(directory):
+    # Make the rename itself durable; not supported on Windows
+    if not hasattr(os, "O_DIRECTORY"):
+        return
+    fd = os.open(directory, os.O_RDONLY | os.O_DIRECTORY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+class OrderJournal:
+    """Append-only JSON Lines log of order mutations.
+
+    Every add, update and delete is written as one line and fsync'd before
+    the call returns, so a mutation costs one small append. When the store
+    compacts its changes into a snapshot the current log is rotated into a
+    numbered segment, and the segment is removed once the snapshot is safely
+    on disk. On startup any remaining segments and the live log are replayed
+    on top of the last snapshot.
+
+    The first record of an order after a snapshot can also hold its
+    ``base``: the order as this terminal last read it from storage, and its
+    stored version. Replaying then tells which stored orders another
+    terminal saved in the meantime, so they are merged instead of
+    overwritten.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._truncate_torn_tail()
+        self._file = open(self.path, "a", encoding="utf-8")
+
+    def _truncate_torn_tail(self):
+        # A crash mid-append can leave a partial last line; drop it so new
+        # records are not glued onto it
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, "rb+") as file:
+            data = file.read()
+            if data and not data.endswith(b"\n"):
+                file.truncate(data.rfind(b"\n") + 1)
+
+    def _segments(self):
+        segments = []
+        for segment in glob.glob(glob.escape(self.path) + ".*"):
+            number = segment.rsplit(".", 1)[1]
+            if number.isdigit():
+                segments.append((int(number), segment))
+        return sorted(segments)
+
+    def append(self, op, order_no, order=None, base=None):
+        """Durably record one mutation ("add", "update" or "delete").
+
+        ``base`` is an (order, version) pair for the first change of an
+        order since the last snapshot; the order is None for a new one.
+        """
+        self.append_many([(op, order_no, order, base)])
+
+    def append_many(self, records):
+        """Durably record (op, order_no, order, base) mutations with one fsync."""
+        with self._lock:
+            for op, order_no, order, base in records:
+                record = {"op": op, "order_no": str(order_no), "order": order}
+                if base is not None:
+                    record["base"], record["version"] = base
+                self._file.write(json.dumps(record, default=str) + "\n")
+            self._file.flush()
+            os.fsync(self._file.fileno())
+
+    def records(self):
+        """Yield every recorded mutation, oldest first."""
+        paths = [segment for _, segment in self._segments()] + [self.path]
+        for path in paths:
+            if not os.path.exists(path):
+                continue
+            with open(path, "r", encoding="utf-8") as file:
+                for line in file:
+                    try:
+                        yield json.loads(line)
+                    except ValueError:
+                        # A crash mid-append leaves at most one torn line
+                        break
+
+    def replay(self, orders):
+        """Apply every recorded mutation to ``orders`` in place.
+
+        Returns the order numbers touched, split into changed and deleted,
+        and the earliest recorded (base order, version) of each order that
+        has one.
+        """
+        changed, deleted, bases = set(), set(), {}
+        for record in self.records():
+            order_no = record["order_no"]
+            if "base" in record:
+                bases.setdefault(order_no, (record["base"], record["version"]))
+            if record["op"] == "delete":
+                orders.pop(order_no, None)
+                changed.discard(order_no)
+                deleted.add(order_no)
+            else:
+                orders[order_no] = record["order"]
+                deleted.discard(order_no)
+                changed.add(order_no)
+        return changed, deleted, bases
+
+    def rotate(self):
+        """Start a new log and return the number of the closed segment."""
+        with self._lock:
+            segments = self._segments()
+            number = segments[-1][0] + 1 if segments else 1
+            self._file.close()
+            os.replace(self.path, f"{self.path}.{number}")
+            self._file = open(self.path, "a", encoding="utf-8")
+        return number
+
+    def discard(self, upto):
+        """Remove rotated segments that are covered by a saved snapshot."""
+        for number, segment in self._segments():
+            if number <= upto:
+                os.remove(segment)
+
+    def close(self):
+        with self._lock:
+            self._file.close()
@@ -0,0 +1,82 @@
+"""Three-way merge of an order changed on two terminals at once.
+
+A terminal remembers each order as it was when it started changing it (the
+base). If another terminal saved the same order in the meantime, the two
+versions are merged against that base, one group of fields at a time:
+
+- a group changed on one side only takes that side's value
+- a group changed on both sides to different values is a conflict; the
+  local value is kept and the group is reported
+- "Items" are merged per product in the same way, and "Total" follows
+  them: when both sides changed different products the two price changes
+  are added up, otherwise the total of the side whose items were kept
+
+So a status change on one terminal and an address fix on the other both
+survive, and only edits of the same field need a second look.
+"""
+
+# Fields that change together and are merged as one
+FIELD_GROUPS = [
+    ("Date",),
+    ("Customer Name",),
+    ("Phone Number",),
+    ("Address",),
+    ("Status",),
+]
+
+
+def _pick(base, local, remote):
+    """Return the merged value of one field or group and whether it conflicts."""
+    if local == remote or remote == base:
+        return local, False
+    if local == base:
+        return remote, False
+    return local, True
+
+
+def _merge_items(base, local, remote):
+    merged, conflict = {}, False
+    for product_id in dict.fromkeys([*local, *remote, *base]):
+        quantity, clash = _pick(base.get(product_id, 0), local.get(product_id, 0), remote.get(product_id, 0))
+        conflict |= clash
+        if quantity:
+            merged[product_id] = quantity
+    return merged, conflict
+
+
+def merge_order(base, local, remote):
+    """Merge the local and remote versions of one order against ``base``.
+
+    ``base`` is None for an order the local terminal created; ``remote`` is
+    None if another terminal deleted it, in which case the local edit wins.
+    Returns the merged order and the names of the conflicting fields (local
+    values kept), with "deleted" for an edit of a deleted order.
+    """
+    if remote is None:
+        return dict(local), ["deleted"]
+    base = base or {}
+    merged = dict(local)
+    conflicts = []
+    for group in FIELD_GROUPS:
+        value, conflict = _pick(
+            tuple(base.get(field) for field in group),
+            tuple(local.get(field) for field in group),
+            tuple(remote.get(field) for field in group),
+        )
+        merged.update(zip(group, value))
+        if conflict:
+            conflicts.extend(group)
+
+    base_items = base.get("Items") or {}
+    local_items, remote_items = local.get("Items") or {}, remote.get("Items") or {}
+    merged["Items"], conflict = _merge_items(base_items, local_items, remote_items)
+    if conflict:
+        conflicts.append("Items")
+    if merged["Items"] == local_items:
+        # The same items can still be repriced, by a change of date
+        merged["Total"] = _pick(base.get("Total"), local.get("Total"), remote.get("Total"))[0]
+    elif merged["Items"] == remote_items:
+        merged["Total"] = remote.get("Total")
+    else:
+        merged["Total"] = (local.get("Total") or 0) + (remote.get("Total") or 0) - (base.get("Total") or 0)
+    return merged, conflicts
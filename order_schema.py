@@ -0,0 +1,168 @@
+"""Compact column types for DataFrames of orders.
+
+The store keeps orders as plain dicts. The DataFrames built from them for
+range queries, the order table and exports use these column types instead
+of Python objects and 64-bit numbers:
+
+- "Date": ``datetime64[s]``; dates that do not parse become NaT
+- "Status": categorical, with ``STATUSES`` first
+- "Customer Name" and "Address": categorical when values repeat
+- "Phone Number": nullable ``UInt32`` (every ten-digit local number fits),
+  or ``Int64`` when a number does not
+- "Items" becomes one "<product id> Quantity" column per product:
+  ``uint16``, or ``int64`` when a quantity does not fit
+- "Total": whole cents as ``int64``, so sums are exact
+
+``plain_orders`` turns such a frame back into the values the store holds,
+and ``compact_like`` converts a few more orders to the types of a frame.
+"""
+import math
+
+from catalog import quantity_column, quantity_columns
+from order_store import COLUMNS, STATUSES
+
+
+CATEGORY_RATIO = 0.5  # text columns become categorical below this distinct/rows ratio
+
+
+def _text(values):
+    text = values.fillna("").astype(str)
+    if text.nunique() <= CATEGORY_RATIO * len(text):
+        return text.astype("category")
+    return text
+
+
+def _integers(values, small, large, lower, upper):
+    """Return ``values`` as the ``small`` dtype if they fit in [lower, upper]."""
+    if values.isna().all() or (values.min() >= lower and values.max() <= upper):
+        return values.astype(small)
+    return values.astype(large)
+
+
+def frame_columns(products):
+    """Return the columns of a compact frame with quantities of ``products``."""
+    return (
+        ["Order No", "Date", "Customer Name", "Phone Number", "Address"]
+        + [quantity_column(product_id) for product_id in products]
+        + ["Total", "Status"]
+    )
+
+
+def compact_orders(df, products=None):
+    """Return a DataFrame of orders with the compact column types.
+
+    There is a quantity column for each of ``products`` (product ids), in
+    that order; by default for every product in the "Items" of ``df``.
+    """
+    import numpy as np
+    import pandas as pd
+
+    items = [value if isinstance(value, dict) else {} for value in df["Items"]]
+    if products is None:
+        products = {}
+        for order_items in items:
+            products.update(dict.fromkeys(order_items))
+
+    phone = pd.to_numeric(df["Phone Number"], errors="coerce").astype(float)
+    phone = np.trunc(phone.where(np.isfinite(phone)))
+    status = df["Status"].fillna("").astype(str)
+    others = sorted(set(status.unique()) - set(STATUSES))
+    total = pd.to_numeric(df["Total"], errors="coerce").fillna(0.0).astype(float)
+    frame = pd.DataFrame(
+        {
+            "Order No": df["Order No"].astype(str),
+            "Date": pd.to_datetime(df["Date"], errors="coerce").astype("datetime64[s]"),
+            "Customer Name": _text(df["Customer Name"]),
+            "Phone Number": _integers(phone, "UInt32", "Int64", 0, np.iinfo(np.uint32).max),
+            "Address": _text(df["Address"]),
+            "Status": pd.Categorical(status, categories=STATUSES + others),
+            "Total": (total * 100).round().astype("int64"),
+        },
+        index=df.index,
+    )
+    for product_id in products:
+        quantity = pd.Series([order_items.get(product_id, 0) for order_items in items], index=df.index, dtype="int64")
+        frame[quantity_column(product_id)] = _integers(quantity, "uint16", "int64", 0, np.iinfo(np.uint16).max)
+    return frame[frame_columns(products)]
+
+
+def _number(value):
+    """Return ``value`` as a finite float, or None like ``to_numeric`` would."""
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        return None
+    return number if math.isfinite(number) else None
+
+
+def compact_like(rows, frame):
+    """Return order dicts as a frame with the columns and types of ``frame``.
+
+    This converts the few rows added to an existing compact frame one value
+    at a time, without the per-column work of ``compact_orders``, and the
+    rows keep the types so the two join without conversions. Returns None
+    if the rows do not fit: a product without a column, a status without a
+    category or a number out of range.
+    """
+    import numpy as np
+    import pandas as pd
+
+    products = quantity_columns(frame.columns)
+    items = [row.get("Items") if isinstance(row.get("Items"), dict) else {} for row in rows]
+    if any(product_id not in products for order_items in items for product_id in order_items):
+        return None
+    phones = [_number(row.get("Phone Number")) for row in rows]
+    totals = [_number(row.get("Total")) or 0.0 for row in rows]
+    dates = pd.to_datetime(pd.Series([row.get("Date") for row in rows], dtype=object), errors="coerce")
+    values = {
+        "Order No": [str(row["Order No"]) for row in rows],
+        "Date": dates.astype("datetime64[s]").to_numpy(),
+        "Customer Name": ["" if row.get("Customer Name") is None else str(row["Customer Name"]) for row in rows],
+        "Phone Number": [None if phone is None else math.trunc(phone) for phone in phones],
+        "Address": ["" if row.get("Address") is None else str(row["Address"]) for row in rows],
+        "Total": [round(total * 100) for total in totals],
+        "Status": ["" if row.get("Status") is None else str(row["Status"]) for row in rows],
+    }
+    for product_id in products:
+        values[quantity_column(product_id)] = [order_items.get(product_id, 0) for order_items in items]
+
+    columns = {}
+    for column, dtype in frame.dtypes.items():
+        if isinstance(dtype, pd.CategoricalDtype) and not set(values[column]) <= set(dtype.categories):
+            return None
+        if dtype.kind in "iu" and values[column]:
+            info = np.iinfo(dtype.numpy_dtype if isinstance(dtype, pd.api.extensions.ExtensionDtype) else dtype)
+            present = [value for value in values[column] if value is not None]
+            if present and (min(present) < info.min or max(present) > info.max):
+                return None
+        columns[column] = pd.array(values[column], dtype=dtype)
+    return pd.DataFrame(columns)
+
+
+def plain_orders(frame):
+    """Return a compact frame with the values the store holds.
+
+    Dates become ISO strings, totals floats, phone numbers plain integers
+    (None where missing) and the quantity columns "Items" dicts, as in the
+    order dicts.
+    """
+    import pandas as pd
+
+    products = quantity_columns(frame.columns)
+    columns = [frame[quantity_column(product_id)].tolist() for product_id in products]
+    rows = zip(*columns) if products else [()] * len(frame)
+    items = [{product_id: quantity for product_id, quantity in zip(products, row) if quantity} for row in rows]
+    phone = frame["Phone Number"].astype(object)
+    return pd.DataFrame(
+        {
+            "Order No": frame["Order No"].astype(object),
+            "Date": frame["Date"].dt.strftime("%Y-%m-%d").astype(object),
+            "Customer Name": frame["Customer Name"].astype(object),
+            "Phone Number": phone.where(frame["Phone Number"].notna(), None),
+            "Address": frame["Address"].astype(object),
+            "Items": pd.Series(items, index=frame.index, dtype=object),
+            "Total": frame["Total"] / 100,
+            "Status": frame["Status"].astype(object),
+        },
+        columns=COLUMNS,
+    )
@@ -0,0 +1,235 @@
+import glob
+import os
+import re
+import socket
+import uuid
+from datetime import datetime
+
+from catalog import Catalog, quantity_column
+from order_journal import OrderJournal
+from order_store import OrderStore
+from rollups import SalesRollup
+from storage import migrate_excel_to_sqlite, open_storage
+
+
+# Default file locations, relative to the working directory
+CATALOG_FILE = "catalog.json"
+PRICE_FILE = "prices.json"  # price list of the 500g and 1kg sizes, before the catalog
+EXCEL_FILE = "watalappam_orders.xlsx"
+DATA_FILE = "watalappam_orders.db"
+# Terminals sharing the order database each keep their own journal and
+# rollup, which hold what that terminal has seen
+TERMINAL = re.sub(r"[^\w.-]", "_", socket.gethostname()) or "terminal"
+JOURNAL_FILE = f"watalappam_orders.{TERMINAL}.journal.jsonl"
+LEGACY_JOURNAL_FILE = "watalappam_orders.journal.jsonl"  # before terminals shared the database
+ROLLUP_FILE = f"watalappam_orders.{TERMINAL}.rollups.json"
+RECEIPT_FOLDER = "receipts/"
+
+# Validation messages, shared with the bulk importer
+INVALID_NUMBERS = "Please enter valid numbers for quantities and phone number."
+NO_PRODUCT = "Please select at least one product."
+
+
+def load_catalog(path=CATALOG_FILE, legacy_prices=PRICE_FILE):
+    """Load the product catalog, creating it from the old price list if needed."""
+    return Catalog.load(path, legacy_prices)
+
+
+def order_total(items, catalog, date=None):
+    """Return the price of an order's items at the catalog's prices on ``date``."""
+    return catalog.total(items, date)
+
+
+# Typed form fields besides the quantities, in ``order_fields`` argument order
+FORM_FIELDS = ["Customer Name", "Phone Number", "Address", "Status"]
+
+
+class OrderForm:
+    """Typed order details, validated and priced once per change.
+
+    ``update`` stores the text of the form fields as typed: ``FORM_FIELDS``
+    and a "<product id> Quantity" field per catalog product. ``check``
+    parses it and caches the outcome - the running total, the error of
+    each invalid field, and the parsed order columns - so repeated checks
+    of the same text, and the submit that follows them, do not parse it
+    again. Empty quantities count as zero. The order is priced as of
+    ``date`` - today for a new order, the order date when editing one. The
+    rules are those of ``order_fields``, which is built on this class.
+    """
+
+    def __init__(self, catalog, date=None):
+        self.catalog = catalog
+        self.date = date
+        self.values = dict.fromkeys(FORM_FIELDS, "")
+        self.total = 0.0
+        self.errors = {}
+        self._fields = None
+        self._checked = None
+
+    def update(self, values):
+        """Store typed values, given as a dict keyed by column name."""
+        self.values.update(values)
+
+    def set_catalog(self, catalog):
+        """Use a new or edited catalog for the next check."""
+        self.catalog = catalog
+        self._checked = None
+
+    def set_date(self, date):
+        """Price the order as of an ISO date (None for today) from the next check."""
+        self.date = date
+        self._checked = None
+
+    def quantity_fields(self):
+        """Return the quantity fields of the catalog's products, in order."""
+        return [quantity_column(product_id) for product_id in self.catalog]
+
+    def check(self):
+        """Validate the stored values and return the errors by field.
+
+        Errors are in the order ``order_fields`` reports them: quantities,
+        then the missing product, then the phone number.
+        """
+        fields = self.quantity_fields()
+        snapshot = tuple(self.values.get(field, "") for field in FORM_FIELDS + fields)
+        if snapshot == self._checked:
+            return self.errors
+        errors = {}
+        items = {}
+        for product_id, field in zip(self.catalog, fields):
+            try:
+                quantity = int(self.values.get(field) or 0)
+            except (TypeError, ValueError):
+                quantity = -1
+            if quantity < 0:
+                errors[field] = INVALID_NUMBERS
+                continue
+            if quantity:
+                items[product_id] = quantity
+        if not errors and not items:  # Ensure at least one product is selected
+            errors.update(dict.fromkeys(fields, NO_PRODUCT))
+        try:
+            phone = int(self.values["Phone Number"])
+        except (TypeError, ValueError):
+            errors["Phone Number"] = INVALID_NUMBERS
+        self.total = order_total(items, self.catalog, self.date)
+        self.errors = errors
+        self._fields = None
+        if not errors:
+            self._fields = {
+                "Customer Name": self.values["Customer Name"],
+                "Phone Number": phone,
+                "Address": self.values["Address"],
+                "Items": items,
+                "Total": self.total,
+                "Status": self.values["Status"],
+            }
+        self._checked = snapshot
+        return errors
+
+    def fields(self, date=None):
+        """Return the checked values as order columns, like ``order_fields``.
+
+        Raises ValueError with the first error if the values are invalid.
+        """
+        errors = self.check()
+        if errors:
+            raise ValueError(next(iter(errors.values())))
+        return {"Date": date or self.date or datetime.now().strftime("%Y-%m-%d"), **self._fields}
+
+
+def order_fields(name, phone, address, quantities, status, catalog, date=None):
+    """Validate typed order details and return them as order columns.
+
+    ``quantities`` maps product ids to quantities. They and the phone
+    number may be given as text, as typed into the order form; missing or
+    empty quantities count as zero. ``date`` defaults to today. Everything
+    except "Order No" is returned, with the total priced from ``catalog`` as
+    of the order date.
+    Raises ValueError with a message suitable for showing to the user.
+    """
+    for product_id in quantities:
+        if product_id not in catalog:
+            raise ValueError(f"Unknown product: {product_id}")
+    form = OrderForm(catalog, date)
+    form.update(dict(zip(FORM_FIELDS, (name, phone, address, status))))
+    form.update({quantity_column(product_id): quantity for product_id, quantity in quantities.items()})
+    return form.fields(date)
+
+
+def new_order_number():
+    return str(uuid.uuid4())[:8]
+
+
+def new_order(name, phone, address, quantities, status, catalog, date=None):
+    """Validate typed order details and return a new order with its number."""
+    order = {"Order No": new_order_number()}
+    order.update(order_fields(name, phone, address, quantities, status, catalog, date))
+    return order
+
+
+def _adopt_journal(old, new):
+    """Rename the journal ``old`` and its rotated segments to ``new``."""
+    for segment in glob.glob(glob.escape(old) + ".*"):
+        number = segment.rsplit(".", 1)[1]
+        if number.isdigit():
+            os.replace(segment, f"{new}.{number}")
+    if os.path.exists(old):
+        os.replace(old, new)
+
+
+def terminal_files(data_file):
+    """Return this terminal's journal and rollup files for ``data_file``.
+
+    They sit next to the order data and are named after it, so orders kept
+    in another file never share them; for ``DATA_FILE`` they are
+    ``JOURNAL_FILE`` and ``ROLLUP_FILE``.
+    """
+    stem = os.path.splitext(data_file)[0]
+    return f"{stem}.{TERMINAL}.journal.jsonl", f"{stem}.{TERMINAL}.rollups.json"
+
+
+def open_store(
+    data_file=DATA_FILE,
+    journal_file=None,
+    rollup_file=None,
+    excel_file=EXCEL_FILE,
+):
+    """Open the order store, importing the workbook on first run.
+
+    The journal and rollup default to the ``terminal_files`` of
+    ``data_file``. A journal from before each terminal had its own is
+    taken over by the first terminal to open the default journal. Pass
+    ``excel_file=None`` to start a missing ``data_file`` empty.
+    """
+    default_journal, default_rollup = terminal_files(data_file)
+    journal_file = journal_file or default_journal
+    rollup_file = rollup_file or default_rollup
+    if excel_file and not os.path.exists(data_file) and os.path.exists(excel_file):
+        migrate_excel_to_sqlite(excel_file, data_file)
+    if journal_file == JOURNAL_FILE and not os.path.exists(journal_file):
+        _adopt_journal(LEGACY_JOURNAL_FILE, journal_file)
+    return OrderStore(
+        open_storage(data_file),
+        journal=OrderJournal(journal_file),
+        rollup=SalesRollup.load(rollup_file),
+    )
+
+
+def sales_report(store, catalog, today=None):
+    """Return the figures shown on the report dashboard, from the rollups.
+
+    The revenue breakdown is by product name, with every day's quantities
+    priced as of that day (see ``SalesRollup.revenue_by_day``).
+    """
+    summary = store.sales_summary(today or datetime.now().strftime("%Y-%m-%d"))
+    totals, today = summary["totals"], summary["today"]
+    revenue = store.revenue_by_day(catalog).sum()
+    return {
+        "total_orders": int(totals["orders"]),
+        "total_sales": totals["total"],
+        "orders_today": int(today["orders"]),
+        "sales_today": today["total"],
+        "sales_by_date": summary["sales_by_date"],
+        "revenue_breakdown": catalog.by_name(revenue).to_dict(),
+    }
@@ -0,0 +1,666 @@
+import threading
+
+from catalog import items_from_columns, line_items
+from customer_index import CustomerIndex, phone_key
+from order_merge import merge_order
+from rollups import SalesRollup
+
+
+COLUMNS = [
+    "Order No",
+    "Date",
+    "Customer Name",
+    "Phone Number",
+    "Address",
+    "Items",
+    "Total",
+    "Status",
+]
+
+STATUSES = ["Pending", "In Progress", "Completed"]
+# Columns kept as text rather than categorical in the date index
+TEXT_COLUMNS = ["Customer Name", "Address"]
+# Orders changed since the date index was built that are patched into it;
+# with more it is rebuilt
+DATE_INDEX_PATCH_LIMIT = 1000
+
+
+def _dates(values):
+    """Parse order dates the way ``compact_orders`` does, as ``datetime64[D]``."""
+    import pandas as pd
+
+    dates = pd.to_datetime(pd.Series(values, dtype=object), errors="coerce").astype("datetime64[s]")
+    return dates.to_numpy(dtype="datetime64[D]")
+
+
+class OrderStore:
+    """In-memory order repository with write-behind persistence.
+
+    Orders are read from the storage backend once when the store is created
+    and kept in a dict keyed by "Order No". The "Items" of an order map
+    product ids to quantities; ``line_items`` returns them as a normalized
+    table. Add, update and delete only touch that dict and schedule a
+    flush, so the cost of a mutation does not depend on how many orders
+    are stored. Pending changes are handed to the backend
+    at most once per ``flush_delay`` seconds.
+
+    With a ``journal`` every mutation is also appended to the journal before
+    it is applied, so changes that have not been flushed yet survive a crash
+    and are replayed the next time the store is loaded.
+
+    With a ``rollup`` (a ``SalesRollup``) the per-day sales totals are kept
+    up to date on every mutation and saved along with each flush.
+
+    The ``CustomerIndex`` behind ``find_customers`` and ``for_customer`` is
+    built on first use and then kept up to date the same way.
+
+    A ``storage`` with ``shared`` set (``SQLiteStorage``) may also be
+    written by other terminals. The store then remembers the stored version
+    of every order and, for each changed order, the row it started from.
+    A flush writes only the changed orders, in one short transaction under
+    the storage's lock file; an order another terminal saved in the
+    meantime is merged with ``merge_order`` instead of overwritten. The
+    same transaction reads back whatever other terminals saved since the
+    last flush, so every flush also brings the store up to date; ``sync``
+    reports what came in.
+
+    pandas is only imported by the DataFrame queries, so scripts that just
+    add or look up orders start quickly.
+    """
+
+    def __init__(self, storage, flush_delay=1.0, journal=None, rollup=None):
+        self.storage = storage
+        self.flush_delay = flush_delay
+        self.journal = journal
+        self.rollup = rollup
+        self.orders = {}
+        self._lock = threading.RLock()
+        self._flush_lock = threading.Lock()
+        self._changed = set()
+        self._deleted = set()
+        self._timer = None
+        self._by_date = None
+        self._date_changes = {}
+        self._customers = None
+        self._builds = []
+        self._products = {}
+        self._shared = getattr(storage, "shared", False)
+        self._versions = {}
+        self._base = {}
+        self._revision = None
+        self._pulled = set()
+        self._conflicts = []
+        self.load()
+
+    def load(self):
+        """Read every order from the storage backend into memory."""
+        if self._shared:
+            with self.storage.transaction(write=False):
+                rows, versions, _, revision = self.storage.changes_since()
+        else:
+            rows, versions, revision = self.storage.load(), {}, None
+        with self._lock:
+            self.orders = {str(row["Order No"]): row for row in rows}
+            self._versions = versions
+            self._revision = revision
+            self._base = {}
+            self._by_date = None
+            self._customers = None
+            replayed = False
+            if self.journal is not None:
+                stored = dict(self.orders)
+                changed, deleted, bases = self.journal.replay(self.orders)
+                for order_no in changed:
+                    # Journals written before the catalog hold quantity columns
+                    self.orders[order_no] = items_from_columns(self.orders[order_no])
+                if self._shared:
+                    self._rebase(stored, changed, deleted, bases)
+                for order_no in changed:
+                    self._mark_dirty(order_no)
+                for order_no in deleted:
+                    self._mark_dirty(order_no, deleted=True)
+                replayed = bool(changed or deleted)
+            # The saved rollup matches the last snapshot; rebuild it if the
+            # journal or another terminal moved past that snapshot or it is
+            # missing or stale
+            if self.rollup is not None and (
+                replayed
+                or self.rollup.totals["orders"] != len(self.orders)
+                or self.rollup.revision != revision
+            ):
+                self.rollup.rebuild(self.orders.values())
+                self.rollup.revision = revision
+                if not replayed:
+                    # Nothing to flush, so save it now rather than rebuild
+                    # it again on every start
+                    self.rollup.save()
+            self._products = {}
+            for row in self.orders.values():
+                self._products.update(dict.fromkeys(row["Items"]))
+
+    def _rebase(self, stored, changed, deleted, bases):
+        """Merge replayed changes with what other terminals saved meanwhile.
+
+        ``stored`` holds the orders just loaded and ``bases`` the (order,
+        version) each replayed change was made from. Orders saved elsewhere
+        since are merged like a flush would; the stored orders become the
+        bases of the changes, which stay pending.
+        """
+        for order_no in list(changed | deleted):
+            row = stored.get(order_no)
+            # Journals from before bases were recorded: assume up to date
+            base, version = bases.get(order_no, (row, self._versions.get(order_no)))
+            if version != self._versions.get(order_no):
+                if order_no in changed:
+                    self.orders[order_no], fields = merge_order(base, self.orders[order_no], row)
+                    if fields:
+                        self._conflicts.append((order_no, fields))
+                elif row is not None:
+                    self.orders[order_no] = row
+                    deleted.discard(order_no)
+                    self._conflicts.append((order_no, ["restored"]))
+                    continue
+            self._base[order_no] = row
+
+    def __len__(self):
+        return len(self.orders)
+
+    def __contains__(self, order_no):
+        return str(order_no) in self.orders
+
+    def get(self, order_no):
+        """Return the order as a dict, or None if it does not exist."""
+        return self.orders.get(str(order_no))
+
+    def add(self, order):
+        """Add a new order. ``order`` is a dict keyed by column name."""
+        order_no = str(order["Order No"])
+        row = {col: order.get(col) for col in COLUMNS}
+        row["Order No"] = order_no
+        row["Items"] = dict(row["Items"] or {})
+        with self._lock:
+            self._log("add", order_no, row, self._keep_base(order_no))
+            self._roll(self.orders.get(order_no), row)
+            self.orders[order_no] = row
+            self._mark_dirty(order_no)
+
+    def add_many(self, orders):
+        """Add many new orders as one change, with a single journal write."""
+        rows = []
+        for order in orders:
+            row = {col: order.get(col) for col in COLUMNS}
+            row["Order No"] = str(order["Order No"])
+            row["Items"] = dict(row["Items"] or {})
+            rows.append(row)
+        with self._lock:
+            records = [("add", row["Order No"], row, self._keep_base(row["Order No"])) for row in rows]
+            if self.journal is not None:
+                self.journal.append_many(records)
+            for row in rows:
+                self._roll(self.orders.get(row["Order No"]), row)
+                self.orders[row["Order No"]] = row
+                self._mark_dirty(row["Order No"])
+
+    def update(self, order_no, changes):
+        """Update the given columns of an existing order."""
+        order_no = str(order_no)
+        with self._lock:
+            if order_no not in self.orders:
+                raise KeyError(order_no)
+            # Replace rather than mutate so a flush in progress sees a
+            # consistent row
+            row = {**self.orders[order_no], **changes}
+            self._log("update", order_no, row, self._keep_base(order_no))
+            self._roll(self.orders[order_no], row)
+            self.orders[order_no] = row
+            self._mark_dirty(order_no)
+
+    def delete(self, order_no):
+        """Remove an order. Missing orders are ignored."""
+        order_no = str(order_no)
+        with self._lock:
+            if order_no in self.orders:
+                self._log("delete", order_no, None, self._keep_base(order_no))
+                self._roll(self.orders.pop(order_no), None)
+                self._mark_dirty(order_no, deleted=True)
+
+    def between(self, start_date, end_date):
+        """Return orders dated within the inclusive range as a DataFrame.
+
+        ``start_date`` and ``end_date`` are ISO date strings. The range is
+        found by binary search over the date-sorted orders and returned as a
+        slice of that frame, without copying.
+        """
+        import numpy as np
+
+        frame, dates = self._date_index()
+        start = dates.searchsorted(np.datetime64(start_date, "D"), side="left")
+        end = dates.searchsorted(np.datetime64(end_date, "D"), side="right")
+        return frame.iloc[start:end]
+
+    def _date_index(self):
+        """Return the orders sorted by date along with the sorted date array.
+
+        The index is built on first use. Orders changed after that are
+        patched in by the next range query (see ``_patch_date_index``), so a
+        mutation does not cost a full sort; after more than
+        ``DATE_INDEX_PATCH_LIMIT`` changes it is rebuilt instead.
+        """
+        import numpy as np
+
+        with self._lock:
+            if self._by_date is not None and self._date_changes:
+                if len(self._date_changes) <= DATE_INDEX_PATCH_LIMIT:
+                    self._by_date = self._patch_date_index()
+                else:
+                    self._by_date = None
+            if self._by_date is None:
+                frame = self.to_frame()
+                # Names and addresses stay text here: patching categories
+                # with many values would hash them all again
+                frame = frame.astype({column: str for column in TEXT_COLUMNS})
+                dates = frame["Date"].to_numpy(dtype="datetime64[D]")
+                # Stable sort keeps insertion order within a day; NaT sorts last
+                order = np.argsort(dates, kind="stable")
+                frame = frame.iloc[order].reset_index(drop=True)
+                self._by_date = (frame, dates[order])
+            self._date_changes = {}
+            return self._by_date
+
+    def _patch_date_index(self):
+        """Return the date index with the changed orders moved into place.
+
+        The old row of each changed order is found by binary search on its
+        old date and cut out; the new rows are inserted at the positions of
+        their dates, after the orders already on that day. The slices in
+        between are joined once, without sorting or converting the rest of
+        the frame again. Returns None if an old row is not where its date
+        says, or a new row brings a product or status the frame has no
+        column or category for, so the index is rebuilt.
+        """
+        import numpy as np
+        import pandas as pd
+
+        from order_schema import compact_like
+
+        frame, dates = self._by_date
+        order_nos = frame["Order No"]
+        old_rows = [row for row in self._date_changes.values() if row is not None]
+        removed = []
+        for row, date in zip(old_rows, _dates([row["Date"] for row in old_rows])):
+            start = dates.searchsorted(date, side="left")
+            end = dates.searchsorted(date, side="right")
+            found = np.flatnonzero(order_nos.iloc[start:end].to_numpy() == row["Order No"])
+            if not len(found):
+                return None
+            removed.append(start + found[0])
+
+        rows = [self.orders[order_no] for order_no in self._date_changes if order_no in self.orders]
+        new = compact_like(rows, frame)
+        if new is None:
+            return None
+        new_dates = new["Date"].to_numpy(dtype="datetime64[D]")
+        by_date = np.argsort(new_dates, kind="stable")
+        new, new_dates = new.iloc[by_date], new_dates[by_date]
+        positions = dates.searchsorted(new_dates, side="right")
+
+        # Cut the frame at every removed row and insertion point, in order
+        cuts = sorted(
+            [(position, 0, i) for i, position in enumerate(positions)] + [(row, 1, None) for row in removed]
+        )
+        pieces, date_pieces, at = [], [], 0
+        for position, remove, i in cuts:
+            pieces.append(frame.iloc[at:position])
+            date_pieces.append(dates[at:position])
+            if remove:
+                at = position + 1
+            else:
+                pieces.append(new.iloc[i : i + 1])
+                date_pieces.append(new_dates[i : i + 1])
+                at = position
+        pieces.append(frame.iloc[at:])
+        date_pieces.append(dates[at:])
+        return pd.concat(pieces, ignore_index=True), np.concatenate(date_pieces)
+
+    def customer_index(self):
+        """Return the ``CustomerIndex`` of the stored orders.
+
+        The index is built on first use, outside the store lock (see
+        ``_build_unlocked``), and updated on every mutation after that. Only
+        read it while holding the store lock; ``find_customers`` and
+        ``for_customer`` do.
+        """
+        with self._lock:
+            if self._customers is not None:
+                return self._customers
+
+        def build(rows):
+            index = CustomerIndex()
+            index.rebuild(rows)
+            return index
+
+        def install(index):
+            if self._customers is None:
+                self._customers = index
+            return self._customers
+
+        return self._build_unlocked(build, install)
+
+    def find_customers(self, text, limit=10):
+        """Return up to ``limit`` customers whose name or phone starts with ``text``.
+
+        This never builds the index, so it is quick enough for every pause
+        in typing; until ``customer_index`` has built it there are no
+        suggestions.
+        """
+        with self._lock:
+            if self._customers is None:
+                return []
+            return self._customers.search(text, limit)
+
+    def for_customer(self, phone):
+        """Return the orders of the customer with this phone number, by date.
+
+        The orders come as a compact DataFrame, like ``to_frame``.
+        """
+        import pandas as pd
+
+        from order_schema import compact_orders
+
+        index = self.customer_index()
+        with self._lock:
+            rows = list(index.orders.get(phone_key(phone), {}).values())
+            products = list(self._products)
+        rows.sort(key=lambda row: str(row["Date"]))
+        return compact_orders(pd.DataFrame(rows, columns=COLUMNS), products)
+
+    def to_frame(self):
+        """Return all orders as a compact DataFrame in insertion order.
+
+        The columns have the types of ``order_schema.compact_orders``, with
+        a quantity column for every product in ``product_ids``.
+        """
+        import pandas as pd
+
+        from order_schema import compact_orders
+
+        with self._lock:
+            rows = list(self.orders.values())
+            products = list(self._products)
+        return compact_orders(pd.DataFrame(rows, columns=COLUMNS), products)
+
+    def product_ids(self):
+        """Return the id of every product ordered so far, in first-seen order."""
+        with self._lock:
+            return list(self._products)
+
+    def line_items(self):
+        """Return the line items of all orders as a normalized DataFrame.
+
+        One row per order and product: "Order No", "Product", "Quantity".
+        """
+        with self._lock:
+            rows = list(self.orders.values())
+        return line_items(rows)
+
+    def chunks(self, size=10_000):
+        """Yield all orders as DataFrames of at most ``size`` rows.
+
+        Frames are compact, as from ``to_frame``. Only the list of order
+        references is copied up front; each frame is built when it is
+        needed, so exports never hold every order twice. Orders are yielded
+        in insertion order, as of the call.
+        """
+        import pandas as pd
+
+        from order_schema import compact_orders
+
+        with self._lock:
+            rows = list(self.orders.values())
+            products = list(self._products)
+        for start in range(0, len(rows), size):
+            yield compact_orders(pd.DataFrame(rows[start : start + size], columns=COLUMNS), products)
+
+    def check_rollup(self):
+        """Rebuild the rollup from the raw orders and compare.
+
+        The rebuild runs outside the store lock (see ``_build_unlocked``).
+        The rebuilt figures replace the maintained ones and are saved, or
+        with the next flush if changes are pending. Returns True if the
+        incrementally maintained rollup was consistent.
+        """
+
+        def build(rows):
+            rebuilt = SalesRollup(self.rollup.path)
+            rebuilt.rebuild(rows)
+            return rebuilt
+
+        def install(rebuilt):
+            consistent = rebuilt.matches(self.rollup)
+            if not consistent:
+                self.rollup.replace(rebuilt)
+            return consistent
+
+        consistent = self._build_unlocked(build, install)
+        if not consistent:
+            with self._flush_lock:
+                if not (self._changed or self._deleted):
+                    self._save_rollup()
+        return consistent
+
+    def _build_unlocked(self, build, install):
+        """Build something from all orders without blocking the store.
+
+        ``build(rows)`` runs on a snapshot of the orders taken under the
+        lock, but does not hold it, so mutations and queries go on in the
+        meantime. The changes made meanwhile are recorded and replayed on
+        the result with its ``apply(old, new)``; then ``install(result)``
+        runs under the lock and its return value is returned.
+        """
+        with self._lock:
+            rows = list(self.orders.values())
+            changes = []
+            self._builds.append(changes)
+        try:
+            result = build(rows)
+            with self._lock:
+                for old, new in changes:
+                    result.apply(old, new)
+                return install(result)
+        finally:
+            with self._lock:
+                self._builds.remove(changes)
+
+    def sales_summary(self, today):
+        """Return a consistent ``SalesRollup.summary`` for the given ISO date."""
+        with self._lock:
+            return self.rollup.summary(today)
+
+    def revenue_by_day(self, catalog):
+        """Return a consistent ``SalesRollup.revenue_by_day``."""
+        with self._lock:
+            return self.rollup.revenue_by_day(catalog)
+
+    def _roll(self, old, new):
+        if self._by_date is not None:
+            # The row the date index holds, until it is patched
+            self._date_changes.setdefault((new or old)["Order No"], old)
+        if new is not None:
+            self._products.update(dict.fromkeys(new["Items"]))
+        if self.rollup is not None:
+            self.rollup.apply(old, new)
+        if self._customers is not None:
+            self._customers.apply(old, new)
+        for changes in self._builds:
+            changes.append((old, new))
+
+    def _keep_base(self, order_no):
+        """Remember an order as stored before its first change since a flush.
+
+        Returns the (order, version) pair the first time, for the journal,
+        and None after that or without a shared backend.
+        """
+        if not self._shared or order_no in self._base:
+            return None
+        base = self._base[order_no] = self.orders.get(order_no)
+        return base, self._versions.get(order_no)
+
+    def _log(self, op, order_no, row=None, base=None):
+        if self.journal is not None:
+            self.journal.append(op, order_no, row, base)
+
+    def _mark_dirty(self, order_no, deleted=False):
+        if deleted:
+            self._changed.discard(order_no)
+            self._deleted.add(order_no)
+        else:
+            self._deleted.discard(order_no)
+            self._changed.add(order_no)
+        if self._timer is None:
+            self._timer = threading.Timer(self.flush_delay, self.flush)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def flush(self):
+        """Hand pending changes to the storage backend.
+
+        This compacts the journal: the log is rotated before the snapshot is
+        written and the rotated segment is removed once the backend has
+        saved it. With a shared backend, changes saved by other terminals
+        are read in as well, even when there is nothing to write.
+        """
+        with self._flush_lock:
+            with self._lock:
+                self._timer = None
+                pending = bool(self._changed or self._deleted)
+                if not pending and not self._shared:
+                    return
+                # A shared backend only needs the changed orders
+                snapshot = None if self._shared else dict(self.orders)
+                changed_nos, deleted, bases = self._changed, self._deleted, self._base
+                changed = [self.orders[order_no] for order_no in changed_nos]
+                self._changed = set()
+                self._deleted = set()
+                self._base = {}
+                segment = self.journal.rotate() if self.journal and pending else None
+            try:
+                if self._shared:
+                    pulled = self._exchange(changed, deleted, bases)
+                else:
+                    self.storage.save(snapshot, changed, list(deleted))
+                    pulled = False
+            except Exception:
+                # Keep the changes pending; the journal still holds them
+                with self._lock:
+                    self._changed |= changed_nos - self._deleted
+                    self._deleted |= deleted - self._changed
+                    self._base = {**self._base, **bases}
+                raise
+            if segment is not None:
+                self.journal.discard(segment)
+            if self.rollup is not None and (pending or pulled):
+                self._save_rollup()
+
+    def _save_rollup(self):
+        with self._lock:
+            self.rollup.revision = self._revision
+            rollup_json = self.rollup.to_json()
+        self.rollup.save(rollup_json)
+
+    def _exchange(self, changed, deleted, bases):
+        """Write local changes to a shared backend and read everyone else's.
+
+        Only the versions of the changed orders are read under the lock,
+        plus the stored rows of the few another terminal saved first, which
+        are merged. Returns True if anything came in.
+        """
+        conflicts = []
+        with self.storage.transaction(write=bool(changed or deleted)):
+            if changed or deleted:
+                order_nos = [row["Order No"] for row in changed] + list(deleted)
+                current = self.storage.versions(order_nos)
+                stale = [order_no for order_no in order_nos if current.get(order_no) != self._versions.get(order_no)]
+                remote = {order["Order No"]: order for order in self.storage.get_many(stale)} if stale else {}
+                rows = []
+                for row in changed:
+                    order_no = row["Order No"]
+                    if order_no in stale:
+                        row, fields = merge_order(bases.get(order_no), row, remote.get(order_no))
+                        if fields:
+                            conflicts.append((order_no, fields))
+                    rows.append(row)
+                removed = []
+                for order_no in deleted:
+                    if order_no in remote:
+                        # Changed elsewhere since it was deleted here: keep
+                        # that change, which is read back below
+                        conflicts.append((order_no, ["restored"]))
+                    else:
+                        removed.append(order_no)
+                self.storage.write(rows, removed)
+            orders, versions, removed, revision = self.storage.changes_since(self._revision)
+        return self._take_in(orders, versions, removed, revision, conflicts)
+
+    def _take_in(self, orders, versions, deleted, revision, conflicts):
+        """Apply orders read back from a shared backend to the store.
+
+        Orders changed here while the flush ran stay pending: their pending
+        changes are merged onto the stored row, which becomes their base.
+        """
+        with self._lock:
+            pulled = set()
+            for row in orders:
+                order_no = str(row["Order No"])
+                self._versions[order_no] = versions[order_no]
+                if order_no in self._deleted:
+                    self._base[order_no] = row
+                    continue
+                old = self.orders.get(order_no)
+                new = row
+                if order_no in self._changed:
+                    new = merge_order(self._base.get(order_no), old, row)[0]
+                    self._base[order_no] = row
+                if old != new:
+                    self._roll(old, new)
+                    self.orders[order_no] = new
+                    pulled.add(order_no)
+            for order_no in deleted:
+                self._versions.pop(order_no, None)
+                if order_no in self._changed:
+                    self._base[order_no] = None
+                elif order_no in self.orders:
+                    self._roll(self.orders.pop(order_no), None)
+                    pulled.add(order_no)
+            self._revision = revision
+            self._pulled |= pulled
+            self._conflicts += conflicts
+        return bool(pulled)
+
+    def sync(self):
+        """Flush, and report what other terminals changed since the last call.
+
+        Returns the numbers of the orders changed or deleted in this store
+        by another terminal's save, and the orders changed on two terminals
+        at once as (order number, conflicting fields) pairs, where the
+        values of this terminal were kept. The fields are ["deleted"] for
+        an order edited here but deleted elsewhere (it is kept) and
+        ["restored"] for one deleted here but edited elsewhere (it is restored).
+        """
+        self.flush()
+        with self._lock:
+            pulled, self._pulled = self._pulled, set()
+            conflicts, self._conflicts = self._conflicts, []
+        return pulled, conflicts
+
+    def close(self):
+        """Cancel any scheduled flush and write pending changes now."""
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+        try:
+            self.flush()
+        finally:
+            # Changes that could not be saved stay in the journal
+            self.storage.close()
+            if self.journal is not None:
+                self.journal.close()
@@ -0,0 +1,303 @@
+from tkinter import ttk
+
+from catalog import items_text, quantity_column, quantity_columns
+
+
+def display_row(order):
+    """Format one order dict as the tuple of values shown in the table.
+
+    Produces the same values as ``display_rows`` for a single order.
+    """
+    # Ensure phone number is treated as an integer and formatted correctly
+    try:
+        phone_str = f"{int(order['Phone Number']):010d}"
+    except (ValueError, TypeError, OverflowError):
+        phone_str = "Invalid"  # Handle invalid phone numbers gracefully
+    try:
+        total_str = f"{float(order['Total']):.2f}"
+    except (ValueError, TypeError):
+        total_str = order["Total"]
+    return (
+        order["Order No"],
+        order["Date"],
+        order["Customer Name"],
+        phone_str,
+        order["Address"],
+        items_text(order["Items"]),
+        total_str,
+        order["Status"],
+    )
+
+
+def display_rows(df):
+    """Format a compact DataFrame of orders for the table, one column at a time.
+
+    ``df`` has the column types of ``order_schema.compact_orders``. Returns
+    the list of order numbers and the matching list of value tuples. Phone
+    numbers are zero-padded to ten digits (or shown as "Invalid"), the
+    quantity columns are joined into one "Items" text and totals get two
+    decimals, using column-wise operations instead of a Python loop over
+    ``iterrows``.
+    """
+    # Imported here so the window can open before numpy and pandas load
+    import numpy as np
+    import pandas as pd
+
+    phone = df["Phone Number"]
+    phone_str = phone.astype(str).str.zfill(10).where(phone.notna(), "Invalid")
+    # Order totals repeat a lot, so format each distinct value once
+    codes, uniques = pd.factorize(df["Total"])
+    total_str = np.array([f"{cents / 100:.2f}" for cents in uniques], dtype=object)[codes]
+    # So do the combinations of quantities
+    products = quantity_columns(df.columns)
+    if products:
+        quantities = df[[quantity_column(product_id) for product_id in products]]
+        codes = quantities.groupby(list(quantities.columns), sort=False).ngroup().to_numpy()
+        combinations = quantities.drop_duplicates().itertuples(index=False)
+        items_str = np.array(
+            [items_text({p: q for p, q in zip(products, row) if q}) for row in combinations], dtype=object
+        )[codes]
+    else:
+        items_str = np.full(len(df), "", dtype=object)
+    keys = df["Order No"].tolist()
+    rows = list(
+        zip(
+            keys,
+            df["Date"].dt.strftime("%Y-%m-%d").fillna("").tolist(),
+            df["Customer Name"].tolist(),
+            phone_str.tolist(),
+            df["Address"].tolist(),
+            items_str.tolist(),
+            total_str.tolist(),
+            df["Status"].tolist(),
+        )
+    )
+    return keys, rows
+
+
+class VirtualOrderTable:
+    """Order table that only materializes the rows in view.
+
+    All rows live in a plain list of value tuples. The Treeview holds a fixed
+    pool of items - enough to fill the viewport plus ``buffer_rows`` - and
+    scrolling rewrites the values of those items instead of inserting or
+    deleting any. The cost of a refresh depends on the window height, not on
+    the number of orders.
+
+    After the initial ``set_rows``, single edits are applied with
+    ``insert_row``, ``update_row`` and ``delete_row``. These keep the
+    selection and scroll position and only touch the pooled items that show
+    the affected rows.
+    """
+
+    def __init__(self, parent, columns, on_select=None, buffer_rows=5):
+        self.columns = columns
+        self.on_select = on_select
+        self.buffer_rows = buffer_rows
+        self.keys = []
+        self.rows = []
+        self._positions = {}
+        self.first = 0
+        self.visible_rows = 20
+        self.items = []
+        self.selected_key = None
+
+        self.tree = ttk.Treeview(parent, columns=columns, show="headings")
+        for col in columns:
+            self.tree.heading(col, text=col)
+            self.tree.column(col, width=100)
+        # The scrollbar tracks the position in the full list, not in the pool
+        self.v_scrollbar = ttk.Scrollbar(parent, orient="vertical", command=self._on_scrollbar)
+        self.v_scrollbar.pack(side="right", fill="y")
+        self.tree.pack(side="top", fill="both", expand=True)
+        h_scrollbar = ttk.Scrollbar(parent, orient="horizontal", command=self.tree.xview)
+        h_scrollbar.pack(side="bottom", fill="x")
+        self.tree.configure(xscrollcommand=h_scrollbar.set)
+
+        self.tree.bind("<<TreeviewSelect>>", self._on_tree_select)
+        self.tree.bind("<Configure>", self._on_configure)
+        self.tree.bind("<MouseWheel>", self._on_mousewheel)
+        self.tree.bind("<Button-4>", lambda event: self.scroll(-3))
+        self.tree.bind("<Button-5>", lambda event: self.scroll(3))
+        self.tree.bind("<Up>", lambda event: self._move_selection(-1))
+        self.tree.bind("<Down>", lambda event: self._move_selection(1))
+        self.tree.bind("<Prior>", lambda event: self.scroll(-self.visible_rows))
+        self.tree.bind("<Next>", lambda event: self.scroll(self.visible_rows))
+
+    def set_rows(self, keys, rows):
+        """Replace the backing rows. ``keys`` identify each row (order number)."""
+        self.keys = list(keys)
+        self.rows = list(rows)
+        self._positions = None
+        self.first = self._clamp(self.first)
+        self.refresh()
+
+    def position(self, key):
+        """Return the row index of ``key``, or None if it is not shown."""
+        if self._positions is None:
+            self._positions = {k: i for i, k in enumerate(self.keys)}
+        return self._positions.get(key)
+
+    def insert_row(self, key, row):
+        """Append one row, keeping the current view where it is."""
+        index = len(self.keys)
+        self.keys.append(key)
+        self.rows.append(row)
+        if self._positions is not None:
+            self._positions[key] = index
+        if index < self.first + len(self.items):
+            self._write_items(index - self.first)
+        self._update_scrollbar()
+
+    def update_row(self, key, row):
+        """Replace the values of one row in place."""
+        index = self.position(key)
+        if index is None:
+            return
+        self.rows[index] = row
+        offset = index - self.first
+        if 0 <= offset < len(self.items):
+            self.tree.item(self.items[offset], values=row, tags=())
+
+    def delete_row(self, key):
+        """Remove one row, keeping the rows in view where they are."""
+        index = self.position(key)
+        if index is None:
+            return
+        del self.keys[index]
+        del self.rows[index]
+        # Positions after the removed row shift down; rebuild on next lookup
+        self._positions = None
+        if key == self.selected_key:
+            self.clear_selection()
+        if index < self.first:
+            self.first -= 1
+        else:
+            first = self._clamp(self.first)
+            if first != self.first:
+                self.first = first
+                self.refresh()
+                return
+            self._write_items(index - self.first)
+        self._update_scrollbar()
+
+    def refresh(self):
+        """Write the rows in the current window into the item pool."""
+        self._resize_pool()
+        self._write_items(0)
+        self.tree.yview_moveto(0)
+        self._update_scrollbar()
+
+    def _write_items(self, start):
+        """Rewrite the pooled items from offset ``start`` to the end of the pool."""
+        selected_item = None
+        for i in range(max(start, 0), len(self.items)):
+            item = self.items[i]
+            index = self.first + i
+            if index < len(self.rows):
+                self.tree.item(item, values=self.rows[index], tags=())
+                if self.keys[index] == self.selected_key:
+                    selected_item = item
+            else:
+                self.tree.item(item, values=(), tags=("empty",))
+        if selected_item is not None:
+            if self.tree.selection() != (selected_item,):
+                self.tree.selection_set(selected_item)
+        elif start <= 0 and self.tree.selection():
+            self.tree.selection_remove(self.tree.selection())
+
+    def scroll(self, delta):
+        """Scroll by ``delta`` rows."""
+        first = self._clamp(self.first + delta)
+        if first != self.first:
+            self.first = first
+            self.refresh()
+        return "break"
+
+    def see(self, index):
+        """Scroll so that row ``index`` is in view."""
+        if index < self.first:
+            self.scroll(index - self.first)
+        elif index >= self.first + self.visible_rows:
+            self.scroll(index - self.first - self.visible_rows + 1)
+
+    def select(self, key):
+        """Select the row with ``key``, bring it into view and notify."""
+        index = self.position(key)
+        if index is None:
+            return
+        self.selected_key = key
+        self.see(index)
+        self.refresh()
+        if self.on_select:
+            self.on_select(key)
+
+    def clear_selection(self):
+        self.selected_key = None
+        if self.tree.selection():
+            self.tree.selection_remove(self.tree.selection())
+
+    def _clamp(self, first):
+        return max(0, min(first, len(self.rows) - self.visible_rows))
+
+    def _resize_pool(self):
+        wanted = self.visible_rows + self.buffer_rows
+        while len(self.items) < wanted:
+            self.items.append(self.tree.insert("", "end", values=()))
+        while len(self.items) > wanted:
+            self.tree.delete(self.items.pop())
+
+    def _update_scrollbar(self):
+        total = len(self.rows)
+        if total <= self.visible_rows:
+            self.v_scrollbar.set(0, 1)
+        else:
+            self.v_scrollbar.set(self.first / total, (self.first + self.visible_rows) / total)
+
+    def _on_scrollbar(self, action, amount, unit=None):
+        if action == "moveto":
+            first = self._clamp(int(float(amount) * len(self.rows)))
+            self.scroll(first - self.first)
+        elif action == "scroll":
+            step = self.visible_rows if unit == "pages" else 1
+            self.scroll(int(amount) * step)
+
+    def _on_mousewheel(self, event):
+        return self.scroll(-3 if event.delta > 0 else 3)
+
+    def _on_configure(self, event):
+        style = ttk.Style()
+        row_height = int(style.lookup("Treeview", "rowheight") or 20)
+        heading_height = row_height + 5
+        visible_rows = max(1, (event.height - heading_height) // row_height)
+        if visible_rows != self.visible_rows:
+            self.visible_rows = visible_rows
+            self.first = self._clamp(self.first)
+            self.refresh()
+
+    def _on_tree_select(self, event):
+        selection = self.tree.selection()
+        if not selection or selection[0] not in self.items:
+            return
+        index = self.first + self.items.index(selection[0])
+        if index >= len(self.keys):
+            return
+        key = self.keys[index]
+        # Re-selecting the same row after a scroll is not a new selection
+        if key == self.selected_key:
+            return
+        self.selected_key = key
+        if self.on_select:
+            self.on_select(key)
+
+    def _move_selection(self, delta):
+        if not self.keys:
+            return "break"
+        index = self.position(self.selected_key)
+        if index is None:
+            index = self.first
+        else:
+            index += delta
+        index = max(0, min(index, len(self.keys) - 1))
+        self.select(self.keys[index])
+        return "break"
@@ -0,0 +1,297 @@
+"""Render order receipts, one at a time or in bulk.
+
+Bulk rendering runs from the app or from the command line, for example
+``python cli.py receipts --from 2025-03-01 --to 2025-03-31 --status Completed``.
+Add ``--pdf receipts.pdf`` to write a single PDF instead of one PNG per
+order (needs reportlab). PIL and reportlab are only imported when a
+receipt is drawn.
+"""
+import functools
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+
+RECEIPT_SIZE = (600, 900)  # Adjusted height for compact receipt
+FOOTER_HEIGHT = 160  # Thank-you message and contact details
+ITEMS_TOP = 385  # First item row, below the fixed details and table header
+COLUMN_X = [20, 270, 340, 440]  # Item, Qty, Price and Total columns
+
+
+def _load_logo(path, size, mode=None):
+    from PIL import Image
+
+    try:
+        logo = Image.open(path)
+        if mode:
+            logo = logo.convert(mode)  # Ensure transparency
+        return logo.resize(size)
+    except Exception as e:
+        print(f"Error loading {path}: {e}")
+        return None
+
+
+@functools.lru_cache(maxsize=None)
+def load_assets():
+    """Load the receipt fonts and logos, once per process."""
+    from PIL import ImageFont
+
+    return {
+        "title_font": ImageFont.truetype("arial.ttf", 30),  # Larger font for title
+        "content_font": ImageFont.truetype("arial.ttf", 20),  # Larger font for content
+        "small_font": ImageFont.truetype("arial.ttf", 16),  # Slightly larger font for small text
+        "logo": _load_logo("logo.jpg", (100, 100)),
+        "whatsapp_logo": _load_logo("whatsapp_logo.png", (40, 40), "RGBA"),
+        "email_logo": _load_logo("email_logo.png", (40, 40), "RGBA"),
+    }
+
+
+@functools.lru_cache(maxsize=None)
+def receipt_template():
+    """Return the parts every receipt shares, drawn once per process.
+
+    The body holds the logo, the INVOICE title, the "Items Ordered" caption
+    and the item table header; the footer holds the thank-you message and
+    contact details, and is pasted below the items of each receipt.
+    """
+    from PIL import Image, ImageDraw
+
+    assets = load_assets()
+    body = Image.new("RGB", RECEIPT_SIZE, "white")
+    draw = ImageDraw.Draw(body)
+    if assets["logo"] is not None:
+        body.paste(assets["logo"], (20, 20))  # Paste the logo at the top-left corner
+    draw.text((580, 40), "INVOICE", fill="black", font=assets["title_font"], anchor="rm")
+    draw.text((20, ITEMS_TOP - 70), "Items Ordered:", fill="black", font=assets["content_font"])
+    for x, header in zip(COLUMN_X, ["Item", "Qty", "Price", "Total"]):
+        draw.text((x, ITEMS_TOP - 35), header, fill="black", font=assets["content_font"])
+
+    footer = Image.new("RGB", (RECEIPT_SIZE[0], FOOTER_HEIGHT), "white")
+    draw = ImageDraw.Draw(footer)
+    draw.text((20, 0), "Thank you for your order!", fill="black", font=assets["title_font"])
+    if assets["whatsapp_logo"] is not None:
+        footer.paste(assets["whatsapp_logo"], (20, 60), assets["whatsapp_logo"])  # Use mask for transparency
+    draw.text((70, 65), "WhatsApp - 0705081870", fill="black", font=assets["small_font"])
+    if assets["email_logo"] is not None:
+        footer.paste(assets["email_logo"], (20, 110), assets["email_logo"])
+    draw.text((70, 115), "Email - dessertsmore522@gmail.com", fill="black", font=assets["small_font"])
+    return body, footer
+
+
+def receipt_items(order_data, catalog):
+    """Return the (name, quantity, price, line total) rows of an order's receipt.
+
+    Items are priced as of the order date, as the order total was.
+    """
+    rows = []
+    for product_id, quantity in (order_data.get("Items") or {}).items():
+        if quantity > 0:
+            price = catalog.price(product_id, order_data.get("Date"))
+            rows.append((catalog.name(product_id), quantity, price, quantity * price))
+    return rows
+
+
+def render_receipt(order_data, catalog, folder):
+    """Render the receipt image for one order and return its file name.
+
+    Only the order-specific text is drawn here, onto a copy of
+    ``receipt_template``.
+    """
+    from PIL import ImageDraw
+
+    assets = load_assets()
+    body, footer = receipt_template()
+    receipt_image = body.copy()
+    draw = ImageDraw.Draw(receipt_image)
+    content_font, small_font = assets["content_font"], assets["small_font"]
+
+    # Right-aligned date below INVOICE
+    draw.text((580, 80), f"Date: {order_data['Date']}", fill="black", font=content_font, anchor="rm")
+
+    # Information Section
+    y_offset = 140
+    details = [
+        f"Order No: {order_data.get('Order No', 'N/A')}",
+        f"Customer Name: {order_data.get('Customer Name', 'N/A')}",
+        f"Phone Number: {order_data.get('Phone Number', 'N/A')}",
+        f"Address: {order_data.get('Address', 'N/A')}",
+    ]
+    for detail in details:
+        draw.text((20, y_offset), detail, fill="black", font=content_font)
+        y_offset += 35
+
+    # Rows (Only include items with non-zero quantities)
+    items = receipt_items(order_data, catalog)
+
+    y_offset = ITEMS_TOP
+    for item in items:
+        for x, text in zip(COLUMN_X, (item[0], str(item[1]), f"{item[2]:.2f}", f"{item[3]:.2f}")):
+            draw.text((x, y_offset), text, fill="black", font=small_font)
+        y_offset += 35
+
+    # Total Amount
+    y_offset += 20
+    draw.text((20, y_offset), "Total Amount:", fill="black", font=content_font)
+    draw.text((400, y_offset), f"{order_data.get('Total', 0):.2f}", fill="black", font=content_font)
+
+    # Thank You Message and Contact Information
+    receipt_image.paste(footer, (0, y_offset + 50))
+
+    # Save the receipt image
+    receipt_filename = os.path.join(folder, f"{order_data.get('Order No', 'unknown')}_receipt.png")
+    # Fast zlib setting: still lossless, at a much lower cost per receipt
+    receipt_image.save(receipt_filename, compress_level=1)
+    return receipt_filename
+
+
+def select_orders(store, start=None, end=None, status=None):
+    """Return the orders in ``store`` matching an ISO date range and status.
+
+    Either bound of the range may be None for an open-ended range, and a
+    ``status`` of None matches every status.
+    """
+    from order_schema import plain_orders
+
+    if start is None and end is None:
+        frame = store.to_frame()
+    else:
+        frame = store.between(start or "0001-01-01", end or "9999-12-31")
+    if status is not None:
+        frame = frame[frame["Status"] == status]
+    return plain_orders(frame).to_dict("records")
+
+
+def render_receipts(orders, catalog, folder, workers=None, on_progress=None):
+    """Render receipts for many orders in parallel worker processes.
+
+    ``on_progress`` is called with (done, total) after each receipt, from
+    the calling thread. Returns the file names written, in the order the
+    receipts finished, and a dict of error messages keyed by "Order No" for
+    orders that could not be rendered.
+    """
+    os.makedirs(folder, exist_ok=True)
+    filenames, failures = [], {}
+    if not orders:
+        return filenames, failures
+    # Spawned workers start clean instead of inheriting the Tk process state
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context) as executor:
+        futures = {
+            executor.submit(render_receipt, order, catalog, folder): order.get("Order No")
+            for order in orders
+        }
+        for done, future in enumerate(as_completed(futures), 1):
+            try:
+                filenames.append(future.result())
+            except Exception as e:
+                failures[futures[future]] = str(e)
+            if on_progress:
+                on_progress(done, len(orders))
+    return filenames, failures
+
+
+def _pdf_font():
+    from reportlab.pdfbase import pdfmetrics
+    from reportlab.pdfbase.ttfonts import TTFont
+
+    try:
+        # Registered TrueType fonts are embedded once per document, as a
+        # subset of the glyphs actually used
+        pdfmetrics.registerFont(TTFont("Arial", "arial.ttf"))
+        return "Arial"
+    except Exception as e:
+        print(f"Error loading arial.ttf, using Helvetica: {e}")
+        return "Helvetica"
+
+
+def export_receipts_pdf(orders, catalog, path, on_progress=None):
+    """Write the receipts for ``orders`` as the pages of one vector PDF.
+
+    Pages use the receipt layout of ``render_receipt``. The parts every
+    receipt shares are drawn once as form XObjects that each page refers
+    to, so the logos are stored in the file only once. Needs the optional
+    reportlab package. ``on_progress`` is called with (done, total) after
+    each page. Returns the number of pages written.
+    """
+    try:
+        from reportlab.pdfbase import pdfmetrics
+        from reportlab.pdfgen import canvas
+    except ImportError as e:
+        raise ImportError("PDF export needs reportlab: pip install reportlab") from e
+
+    font = _pdf_font()
+    width, height = RECEIPT_SIZE
+    pdf = canvas.Canvas(path, pagesize=RECEIPT_SIZE, pageCompression=1)
+
+    def text(x, y, value, size, right=False, middle=False):
+        # Convert the image layout (top-left origin, y at the text top) to
+        # PDF coordinates (bottom-left origin, y at the baseline)
+        ascent = pdfmetrics.getAscent(font, size)
+        if middle:
+            baseline = y + (ascent + pdfmetrics.getDescent(font, size)) / 2
+        else:
+            baseline = y + ascent
+        pdf.setFont(font, size)
+        draw = pdf.drawRightString if right else pdf.drawString
+        draw(x, height - baseline, value)
+
+    def logo(path, x, y, size):
+        try:
+            pdf.drawImage(path, x, height - y - size, size, size, mask="auto")
+        except Exception as e:
+            print(f"Error loading {path}: {e}")
+
+    pdf.beginForm("receipt_body")
+    logo("logo.jpg", 20, 20, 100)
+    text(580, 40, "INVOICE", 30, right=True, middle=True)
+    text(20, ITEMS_TOP - 70, "Items Ordered:", 20)
+    for x, header in zip(COLUMN_X, ["Item", "Qty", "Price", "Total"]):
+        text(x, ITEMS_TOP - 35, header, 20)
+    pdf.endForm()
+
+    # Drawn at the top of the page; each receipt shifts it below its items
+    pdf.beginForm("receipt_footer")
+    text(20, 0, "Thank you for your order!", 30)
+    logo("whatsapp_logo.png", 20, 60, 40)
+    text(70, 65, "WhatsApp - 0705081870", 16)
+    logo("email_logo.png", 20, 110, 40)
+    text(70, 115, "Email - dessertsmore522@gmail.com", 16)
+    pdf.endForm()
+
+    for done, order_data in enumerate(orders, 1):
+        pdf.doForm("receipt_body")
+        text(580, 80, f"Date: {order_data['Date']}", 20, right=True, middle=True)
+        y_offset = 140
+        for detail in (
+            f"Order No: {order_data.get('Order No', 'N/A')}",
+            f"Customer Name: {order_data.get('Customer Name', 'N/A')}",
+            f"Phone Number: {order_data.get('Phone Number', 'N/A')}",
+            f"Address: {order_data.get('Address', 'N/A')}",
+        ):
+            text(20, y_offset, detail, 20)
+            y_offset += 35
+        y_offset = ITEMS_TOP
+        for name, quantity, price, line_total in receipt_items(order_data, catalog):
+            for x, value in zip(COLUMN_X, (name, str(quantity), f"{price:.2f}", f"{line_total:.2f}")):
+                text(x, y_offset, value, 16)
+            y_offset += 35
+        y_offset += 20
+        text(20, y_offset, "Total Amount:", 20)
+        text(400, y_offset, f"{order_data.get('Total', 0):.2f}", 20)
+        pdf.saveState()
+        pdf.translate(0, -(y_offset + 50))
+        pdf.doForm("receipt_footer")
+        pdf.restoreState()
+        pdf.showPage()
+        if on_progress:
+            on_progress(done, len(orders))
+    pdf.save()
+    return len(orders)
+
+
+if __name__ == "__main__":
+    import sys
+
+    from cli import main
+
+    main(["receipts"] + sys.argv[1:])
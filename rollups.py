@@ -0,0 +1,251 @@
+import json
+import math
+import os
+
+from order_journal import atomic_write
+
+
+# Per-day measures kept by the rollup, and the order column each one sums;
+# the quantity sold of each product is kept under "items", by product id
+MEASURES = {
+    "orders": None,
+    "total": "Total",
+}
+
+
+def _number(value):
+    try:
+        value = float(value)
+    except (TypeError, ValueError):
+        return 0.0
+    return 0.0 if math.isnan(value) else value
+
+
+def _empty():
+    return {**dict.fromkeys(MEASURES, 0.0), "items": {}}
+
+
+def _day(value):
+    if hasattr(value, "strftime"):
+        return value.strftime("%Y-%m-%d")
+    return str(value)
+
+
+class SalesRollup:
+    """Per-day sales totals, maintained incrementally as orders change.
+
+    For every day the rollup keeps the number of orders, the sales total and
+    the quantity sold of each product, plus running grand totals. ``apply`` is
+    called with the old and new version of an order on every mutation, so
+    the report dashboard can read its figures without touching the raw
+    orders. The rollup is persisted as JSON next to the order data, along
+    with the ``revision`` of a shared database it was saved at, if any.
+
+    ``revenue_by_day`` prices the per-day quantities as of each day and
+    keeps the result in memory; a mutation only marks its day to be priced
+    again, and a catalog with other prices reprices every day.
+    """
+
+    def __init__(self, path=None):
+        self.path = path
+        self.days = {}
+        self.totals = _empty()
+        self.revision = None
+        self._revenue = None
+        self._revenue_key = None
+        self._stale_days = set()
+
+    @classmethod
+    def load(cls, path):
+        """Load a saved rollup, or return an empty one if none is saved."""
+        rollup = cls(path)
+        if os.path.exists(path):
+            with open(path, "r") as file:
+                data = json.load(file)
+            # Rollups saved before the product catalog count 500g and 1kg
+            # only; leaving them out makes the store rebuild the rollup
+            if "items" in data["totals"]:
+                rollup.days = data["days"]
+                rollup.totals = data["totals"]
+                rollup.revision = data.get("revision")
+        return rollup
+
+    def to_json(self):
+        return json.dumps({"days": self.days, "totals": self.totals, "revision": self.revision})
+
+    def save(self, data=None):
+        """Write the rollup (or a ``to_json`` snapshot of it) atomically."""
+        if data is None:
+            data = self.to_json()
+
+        def write(tmp_path):
+            with open(tmp_path, "w") as file:
+                file.write(data)
+
+        atomic_write(self.path, write)
+
+    def _add(self, order, sign):
+        date = _day(order["Date"])
+        self._stale_days.add(date)
+        day = self.days.setdefault(date, _empty())
+        for measure, column in MEASURES.items():
+            amount = sign * (1 if column is None else _number(order.get(column)))
+            day[measure] += amount
+            self.totals[measure] += amount
+        for product_id, quantity in (order.get("Items") or {}).items():
+            for items in (day["items"], self.totals["items"]):
+                items[product_id] = items.get(product_id, 0.0) + sign * _number(quantity)
+                if items[product_id] == 0:
+                    del items[product_id]
+        if day["orders"] <= 0:
+            del self.days[date]
+
+    def apply(self, old, new):
+        """Account for an order changing from ``old`` to ``new``.
+
+        Pass ``old=None`` for a new order and ``new=None`` for a deleted one.
+        """
+        if old is not None:
+            self._add(old, -1)
+        if new is not None:
+            self._add(new, 1)
+
+    def rebuild(self, orders):
+        """Recompute every day from raw order dicts."""
+        import pandas as pd
+
+        orders = list(orders)
+        df = pd.DataFrame(orders, columns=["Date"] + [c for c in MEASURES.values() if c])
+        self.days = {}
+        self.totals = _empty()
+        self._revenue = None
+        if df.empty:
+            return
+        df["Date"] = df["Date"].map(_day)
+        for column in MEASURES.values():
+            if column:
+                df[column] = pd.to_numeric(df[column], errors="coerce").fillna(0.0)
+        grouped = df.groupby("Date").agg(
+            orders=("Date", "size"),
+            **{measure: (column, "sum") for measure, column in MEASURES.items() if column},
+        )
+        self.days = {
+            day: {**{measure: float(value) for measure, value in values.items()}, "items": {}}
+            for day, values in grouped.to_dict("index").items()
+        }
+        self.totals = {measure: float(grouped[measure].sum()) for measure in MEASURES}
+        quantities = pd.DataFrame(
+            [
+                (day, product_id, quantity)
+                for day, order in zip(df["Date"], orders)
+                for product_id, quantity in (order.get("Items") or {}).items()
+            ],
+            columns=["Date", "Product", "Quantity"],
+        )
+        quantities["Quantity"] = pd.to_numeric(quantities["Quantity"], errors="coerce").fillna(0.0)
+        quantities = quantities[quantities["Quantity"] != 0]
+        for (day, product_id), quantity in quantities.groupby(["Date", "Product"], sort=False)["Quantity"].sum().items():
+            self.days[day]["items"][product_id] = float(quantity)
+        self.totals["items"] = {
+            product_id: float(quantity)
+            for product_id, quantity in quantities.groupby("Product", sort=False)["Quantity"].sum().items()
+        }
+
+    def replace(self, other):
+        """Take over the figures of ``other``, e.g. a freshly rebuilt rollup."""
+        self.days = other.days
+        self.totals = other.totals
+        self._revenue = None
+
+    def matches(self, other, tolerance=1e-6):
+        """Return True if ``other`` holds the same figures as this rollup.
+
+        Both the days and the overall totals are compared, as either can
+        drift on its own.
+        """
+        if self.days.keys() != other.days.keys():
+            return False
+
+        def same(mine, theirs):
+            if mine["items"].keys() != theirs["items"].keys():
+                return False
+            return all(abs(mine[measure] - theirs[measure]) <= tolerance for measure in MEASURES) and all(
+                abs(mine["items"][product_id] - theirs["items"][product_id]) <= tolerance
+                for product_id in mine["items"]
+            )
+
+        return same(self.totals, other.totals) and all(same(self.days[day], other.days[day]) for day in self.days)
+
+    def sales_by_date(self):
+        """Return the total sales per day as a Series sorted by date."""
+        import pandas as pd
+
+        return pd.Series(
+            {day: values["total"] for day, values in self.days.items()}, dtype=float
+        ).sort_index()
+
+    def daily_items(self, days=None):
+        """Return the quantity sold per day and product as line items.
+
+        The columns are "Date", "Product" and "Quantity"; ``days`` limits
+        them to some ISO dates.
+        """
+        import pandas as pd
+
+        days = self.days if days is None else {day: self.days[day] for day in days if day in self.days}
+        return pd.DataFrame(
+            [
+                (day, product_id, quantity)
+                for day, values in days.items()
+                for product_id, quantity in values["items"].items()
+            ],
+            columns=["Date", "Product", "Quantity"],
+        )
+
+    def revenue_by_day(self, catalog):
+        """Return revenue per day and product id, priced as of each day.
+
+        The DataFrame is indexed by ISO date, with a column per product.
+        Every day is priced at once by ``catalog.price_lines``, an as-of
+        join on the price history, and the result is kept. Later calls only
+        reprice the days changed since, one line at a time, unless the
+        catalog's prices changed.
+        """
+        import pandas as pd
+
+        key = catalog.price_key()
+        if self._revenue is None or key != self._revenue_key:
+            priced = catalog.price_lines(self.daily_items())
+            revenue = priced.groupby(["Date", "Product"])["Line Total"].sum().unstack(fill_value=0.0)
+        else:
+            revenue = self._revenue
+            if self._stale_days:
+                fresh = {
+                    day: {
+                        product_id: quantity * catalog.price(product_id, day)
+                        for product_id, quantity in self.days[day]["items"].items()
+                    }
+                    for day in self._stale_days
+                    if day in self.days
+                }
+                revenue = revenue.drop(index=list(self._stale_days), errors="ignore")
+                revenue = pd.concat([revenue, pd.DataFrame.from_dict(fresh, orient="index")])
+                revenue = revenue.fillna(0.0).sort_index()
+        revenue.index.name = "Date"
+        revenue.columns.name = None
+        self._revenue, self._revenue_key = revenue, key
+        self._stale_days = set()
+        return revenue.copy()
+
+    def summary(self, today):
+        """Return grand totals, the figures for ``today`` and sales by date."""
+        today = self.day(today)
+        return {
+            "totals": {**self.totals, "items": dict(self.totals["items"])},
+            "today": {**today, "items": dict(today["items"])},
+            "sales_by_date": self.sales_by_date(),
+        }
+
+    def day(self, date):
+        """Return the figures for one ISO date (zeros if there were no orders)."""
+        return self.days.get(date, _empty())
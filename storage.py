@@ -0,0 +1,449 @@
+import contextlib
+import math
+import os
+import sqlite3
+import threading
+
+from catalog import items_from_columns, quantity_column
+from file_lock import FileLock, lock_path
+from order_journal import atomic_write
+from order_schema import frame_columns
+
+
+# Column name in the workbook -> column name in the SQLite orders table;
+# "Items" live in the order_items table
+DB_COLUMNS = {
+    "Order No": "order_no",
+    "Date": "date",
+    "Customer Name": "customer_name",
+    "Phone Number": "phone_number",
+    "Address": "address",
+    "Total": "total",
+    "Status": "status",
+}
+# Quantity columns of the orders table before the product catalog
+LEGACY_ITEM_COLUMNS = {"qty_500g": "500g", "qty_1kg": "1kg"}
+# Order numbers per "IN (...)" query, well below SQLite's parameter limit
+PARAMETER_CHUNK = 500
+
+
+def open_storage(path):
+    """Return the storage backend for ``path`` based on its extension."""
+    extension = os.path.splitext(path)[1].lower()
+    if extension in (".db", ".sqlite", ".sqlite3"):
+        return SQLiteStorage(path)
+    if extension in (".xlsx", ".xls"):
+        return ExcelStorage(path)
+    raise ValueError(f"Unsupported order storage: {path}")
+
+
+def workbook_frame(orders):
+    """Return order dicts as a DataFrame laid out like the workbook.
+
+    The "Items" of the orders become one "<product id> Quantity" column per
+    product ordered, in first-seen order.
+    """
+    import pandas as pd
+
+    orders = list(orders)
+    products = {}
+    for order in orders:
+        products.update(dict.fromkeys(order.get("Items") or {}))
+    rows = []
+    for order in orders:
+        items = order.get("Items") or {}
+        row = {col: value for col, value in order.items() if col != "Items"}
+        row.update({quantity_column(product_id): items.get(product_id, 0) for product_id in products})
+        rows.append(row)
+    return pd.DataFrame(rows, columns=frame_columns(products))
+
+
+def export_excel(orders, path):
+    """Write an iterable of order dicts to an Excel workbook."""
+    workbook_frame(orders).to_excel(path, index=False)
+
+
+def migrate_excel_to_sqlite(excel_file, db_file):
+    """Import every order from ``excel_file`` into ``db_file``.
+
+    The migration runs once: if the database already holds orders nothing is
+    imported. Returns the number of orders that were imported.
+    """
+    target = SQLiteStorage(db_file)
+    try:
+        if target.count() > 0:
+            return 0
+        orders = ExcelStorage(excel_file).load()
+        target.save({}, orders, [])
+        return len(orders)
+    finally:
+        target.close()
+
+
+class ExcelStorage:
+    """Stores all orders in a single workbook, rewritten on every save.
+
+    Saves go through a temporary file that replaces the workbook in one
+    rename, so a crash mid-save leaves the previous workbook intact. The
+    items of each order are laid out as one "<product id> Quantity" column
+    per product, which is also how workbooks from before the product
+    catalog store their 500g and 1kg quantities.
+
+    Parsing a workbook is slow, so every load and save also keeps a
+    columnar copy next to it (``<workbook>.cache.arrow``, Arrow IPC)
+    stamped with the workbook's modification time and size. While the
+    stamp matches, loads memory-map the cache instead of parsing the
+    workbook; a workbook changed outside the app is parsed again and the
+    cache rewritten. The cache needs pyarrow and is skipped without it.
+
+    Saves hold a lock file next to the workbook and read it again first,
+    so orders another terminal saved to the same workbook are kept. The
+    whole workbook is still rewritten under that lock and orders changed by
+    both terminals are not merged; terminals sharing their orders should
+    use the SQLite database.
+    """
+
+    shared = False
+
+    def __init__(self, path):
+        self.path = path
+        self.cache_path = path + ".cache.arrow"
+        self.lock = FileLock(lock_path(path))
+
+    def load(self):
+        """Return every order as a list of dicts, creating the file if needed."""
+        import pandas as pd
+
+        if not os.path.exists(self.path):
+            export_excel([], self.path)
+        orders = self._read_cache()
+        if orders is None:
+            df = pd.read_excel(self.path, dtype={"Order No": str})
+            self._write_cache(df)
+            orders = df.to_dict("records")
+        return [items_from_columns(order) for order in orders]
+
+    def save(self, orders, changed, deleted):
+        """Write the ``changed`` and ``deleted`` orders into the workbook.
+
+        Under the lock the workbook is read again (from the cache unless
+        another terminal rewrote it) and only those orders are replaced or
+        removed before it is written back in full.
+        """
+        with self.lock:
+            current = {str(order["Order No"]): order for order in self.load()}
+            current.update((str(order["Order No"]), order) for order in changed)
+            for order_no in deleted:
+                current.pop(str(order_no), None)
+            df = workbook_frame(current.values())
+            atomic_write(self.path, lambda tmp_path: df.to_excel(tmp_path, index=False))
+            self._write_cache(df)
+
+    def close(self):
+        pass
+
+    def _cache_stamp(self):
+        stat = os.stat(self.path)
+        return {b"workbook_mtime_ns": str(stat.st_mtime_ns).encode(), b"workbook_size": str(stat.st_size).encode()}
+
+    def _read_cache(self):
+        """Return the cached orders as a list of dicts, or None if stale or missing."""
+        try:
+            import pyarrow as pa
+        except ImportError:
+            return None
+        if not os.path.exists(self.cache_path):
+            return None
+        try:
+            with pa.memory_map(self.cache_path) as source:
+                table = pa.ipc.open_file(source).read_all()
+                metadata = table.schema.metadata or {}
+                if any(metadata.get(key) != value for key, value in self._cache_stamp().items()):
+                    return None
+                # Built column by column, skipping pandas: much faster than
+                # to_pandas().to_dict("records") for the same rows
+                columns = {}
+                for name in table.column_names:
+                    values = table.column(name).to_pylist()
+                    if table.column(name).null_count:
+                        # Empty cells load as NaN from the workbook itself
+                        values = [math.nan if value is None else value for value in values]
+                    columns[name] = values
+        except (OSError, pa.ArrowInvalid):
+            return None
+        return [dict(zip(columns, row)) for row in zip(*columns.values())]
+
+    def _write_cache(self, df):
+        try:
+            import pyarrow as pa
+        except ImportError:
+            return
+        try:
+            table = pa.Table.from_pandas(df, preserve_index=False)
+        except (pa.ArrowInvalid, pa.ArrowTypeError):
+            # A column mixing text and numbers has no Arrow type; such
+            # workbooks are simply parsed on every load
+            return
+        table = table.replace_schema_metadata({**(table.schema.metadata or {}), **self._cache_stamp()})
+
+        def write(tmp_path):
+            with pa.OSFile(tmp_path, "wb") as sink, pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+
+        atomic_write(self.cache_path, write)
+
+
+class SQLiteStorage:
+    """Stores orders in SQLite tables keyed by order number.
+
+    ``Order No`` is the primary key, so the changed orders a save writes
+    and the stale ones a shared flush reads back are index seeks. Date,
+    status and customer queries run on the ``OrderStore`` in memory, so
+    those columns carry no index that every write would have to update.
+    The items of each order are rows of a normalized ``order_items`` table
+    (order number, product id, quantity). Saves only touch the rows that
+    changed.
+
+    Databases from before the product catalog had a 500g and a 1kg
+    quantity column in ``orders``; they are moved into ``order_items`` the
+    first time such a database is opened.
+
+    Several terminals can share one database file, e.g. in a network
+    folder. Every order has a ``version``, raised by each save of it, and
+    the ``revision`` of the database when it was last saved; the database
+    revision goes up by one per write transaction and deleted orders leave
+    a row in ``deleted_orders``. Writes run in a ``transaction`` that holds
+    a lock file next to the database (see ``FileLock``), which also
+    guards against network file systems whose own SQLite locking cannot be
+    trusted. ``versions`` tells a terminal which of its changes another
+    terminal saved first, and ``changes_since`` what it missed.
+    """
+
+    shared = True
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.RLock()
+        self.lock = FileLock(lock_path(path))
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        self._create_schema()
+
+    def _create_schema(self):
+        with self.lock, self._lock, self.conn:
+            self.conn.executescript(
+                """
+                CREATE TABLE IF NOT EXISTS orders (
+                    order_no TEXT PRIMARY KEY,
+                    date TEXT,
+                    customer_name TEXT,
+                    phone_number INTEGER,
+                    address TEXT,
+                    total REAL,
+                    status TEXT,
+                    version INTEGER NOT NULL DEFAULT 1,
+                    revision INTEGER NOT NULL DEFAULT 0
+                );
+                -- Indexes of earlier versions that no query used
+                DROP INDEX IF EXISTS idx_orders_date;
+                DROP INDEX IF EXISTS idx_orders_status;
+                DROP INDEX IF EXISTS idx_orders_phone;
+                CREATE TABLE IF NOT EXISTS order_items (
+                    order_no TEXT NOT NULL,
+                    product_id TEXT NOT NULL,
+                    quantity INTEGER NOT NULL,
+                    PRIMARY KEY (order_no, product_id)
+                );
+                CREATE INDEX IF NOT EXISTS idx_order_items_product ON order_items (product_id);
+                CREATE TABLE IF NOT EXISTS deleted_orders (
+                    order_no TEXT PRIMARY KEY,
+                    revision INTEGER NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS idx_deleted_orders_revision ON deleted_orders (revision);
+                CREATE TABLE IF NOT EXISTS sync_state (
+                    id INTEGER PRIMARY KEY CHECK (id = 0),
+                    revision INTEGER NOT NULL
+                );
+                INSERT OR IGNORE INTO sync_state (id, revision) VALUES (0, 0);
+                """
+            )
+            columns = {row["name"] for row in self.conn.execute("PRAGMA table_info(orders)")}
+            # Databases from before versions start every order at version 1
+            for column, default in (("version", 1), ("revision", 0)):
+                if column not in columns:
+                    self.conn.execute(f"ALTER TABLE orders ADD COLUMN {column} INTEGER NOT NULL DEFAULT {default}")
+            self.conn.execute("CREATE INDEX IF NOT EXISTS idx_orders_revision ON orders (revision)")
+            for column, product_id in LEGACY_ITEM_COLUMNS.items():
+                if column not in columns:
+                    continue
+                self.conn.execute(
+                    f"INSERT OR IGNORE INTO order_items (order_no, product_id, quantity) "
+                    f"SELECT order_no, ?, {column} FROM orders WHERE {column} > 0 ORDER BY rowid",
+                    (product_id,),
+                )
+                # Cleared first, so nothing is moved twice if the column
+                # cannot be dropped (SQLite before 3.35)
+                self.conn.execute(f"UPDATE orders SET {column} = NULL")
+                try:
+                    self.conn.execute(f"ALTER TABLE orders DROP COLUMN {column}")
+                except sqlite3.OperationalError:
+                    pass
+
+    def _query(self, sql, params=()):
+        """Run a query for orders and return them with their items."""
+        with self._lock:
+            rows = self.conn.execute(sql, params).fetchall()
+            items = self.conn.execute(
+                f"SELECT order_no, product_id, quantity FROM order_items "
+                f"WHERE order_no IN (SELECT order_no FROM ({sql})) ORDER BY rowid",
+                params,
+            ).fetchall()
+        items_by_order = {}
+        for order_no, product_id, quantity in items:
+            items_by_order.setdefault(order_no, {})[product_id] = quantity
+        return [self._from_db(row, items_by_order.get(row["order_no"], {})) for row in rows]
+
+    @staticmethod
+    def _from_db(row, items):
+        order = {col: row[db_col] for col, db_col in DB_COLUMNS.items()}
+        order["Items"] = items
+        return order
+
+    @staticmethod
+    def _to_db(order):
+        values = []
+        for col in DB_COLUMNS:
+            value = order.get(col)
+            if isinstance(value, float) and math.isnan(value):
+                value = None
+            elif hasattr(value, "strftime"):  # dates parsed by read_excel
+                value = value.strftime("%Y-%m-%d")
+            elif hasattr(value, "item"):  # numpy scalar
+                value = value.item()
+            values.append(value)
+        values[0] = str(values[0])
+        return values
+
+    def load(self):
+        """Return every order in insertion order."""
+        return self._query("SELECT * FROM orders ORDER BY rowid")
+
+    def count(self):
+        with self._lock:
+            return self.conn.execute("SELECT COUNT(*) FROM orders").fetchone()[0]
+
+    @contextlib.contextmanager
+    def transaction(self, write=True):
+        """Run the enclosed calls as one SQLite transaction.
+
+        A write transaction holds the lock file until it commits, so keep
+        it to a few small statements; a read transaction (``write=False``)
+        only gives a consistent view and does not wait for writers.
+        """
+        with self.lock if write else contextlib.nullcontext(), self._lock:
+            self.conn.execute("BEGIN IMMEDIATE" if write else "BEGIN")
+            try:
+                yield self
+            except BaseException:
+                self.conn.rollback()
+                raise
+            self.conn.commit()
+
+    def _chunks(self, order_nos):
+        order_nos = [str(order_no) for order_no in order_nos]
+        for start in range(0, len(order_nos), PARAMETER_CHUNK):
+            chunk = order_nos[start : start + PARAMETER_CHUNK]
+            yield ", ".join("?" for _ in chunk), chunk
+
+    def versions(self, order_nos):
+        """Return the stored version of each of ``order_nos`` that exists."""
+        versions = {}
+        with self._lock:
+            for placeholders, chunk in self._chunks(order_nos):
+                versions.update(
+                    self.conn.execute(
+                        f"SELECT order_no, version FROM orders WHERE order_no IN ({placeholders})", chunk
+                    ).fetchall()
+                )
+        return versions
+
+    def get_many(self, order_nos):
+        """Return the stored orders among ``order_nos``."""
+        orders = []
+        for placeholders, chunk in self._chunks(order_nos):
+            orders += self._query(f"SELECT * FROM orders WHERE order_no IN ({placeholders})", chunk)
+        return orders
+
+    def changes_since(self, revision=None):
+        """Return what was saved after database revision ``revision``.
+
+        Returns the changed orders in the order they were saved, their
+        versions by order number, the numbers of the deleted orders and the
+        current revision. With ``revision`` None every order is returned, in
+        insertion order. Run it in a ``transaction`` so the parts agree.
+        """
+        with self._lock:
+            current = self.conn.execute("SELECT revision FROM sync_state").fetchone()[0]
+            if revision is None:
+                orders = self.load()
+                versions = dict(self.conn.execute("SELECT order_no, version FROM orders"))
+                return orders, versions, [], current
+            # Ordered by revision so the revision index is used, not a scan
+            orders = self._query("SELECT * FROM orders WHERE revision > ? ORDER BY revision, rowid", (revision,))
+            versions = dict(self.conn.execute("SELECT order_no, version FROM orders WHERE revision > ?", (revision,)))
+            deleted = [
+                row[0] for row in self.conn.execute("SELECT order_no FROM deleted_orders WHERE revision > ?", (revision,))
+            ]
+        return orders, versions, deleted, current
+
+    def write(self, changed, deleted):
+        """Upsert the ``changed`` orders and remove the ``deleted`` ones.
+
+        The items of a changed order replace the ones stored for it. Every
+        written order gets the next version and the new database revision,
+        which is returned. Run it in a write ``transaction``.
+        """
+        columns = ", ".join(DB_COLUMNS.values())
+        placeholders = ", ".join("?" for _ in DB_COLUMNS)
+        updates = ", ".join(f"{db_col} = excluded.{db_col}" for db_col in list(DB_COLUMNS.values())[1:])
+        changed = list(changed)
+        replaced = [(str(order["Order No"]),) for order in changed]
+        removed = [(str(order_no),) for order_no in deleted]
+        items = [
+            (str(order["Order No"]), product_id, int(quantity))
+            for order in changed
+            for product_id, quantity in (order.get("Items") or {}).items()
+        ]
+        with self._lock:
+            self.conn.execute("UPDATE sync_state SET revision = revision + 1")
+            revision = self.conn.execute("SELECT revision FROM sync_state").fetchone()[0]
+            self.conn.executemany(
+                f"INSERT INTO orders ({columns}, revision) VALUES ({placeholders}, ?) "
+                f"ON CONFLICT(order_no) DO UPDATE SET {updates}, "
+                f"version = orders.version + 1, revision = excluded.revision",
+                [self._to_db(order) + [revision] for order in changed],
+            )
+            self.conn.executemany("DELETE FROM order_items WHERE order_no = ?", replaced + removed)
+            self.conn.executemany(
+                "INSERT INTO order_items (order_no, product_id, quantity) VALUES (?, ?, ?)", items
+            )
+            self.conn.executemany("DELETE FROM orders WHERE order_no = ?", removed)
+            self.conn.executemany("DELETE FROM deleted_orders WHERE order_no = ?", replaced)
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO deleted_orders (order_no, revision) VALUES (?, ?)",
+                [(order_no, revision) for (order_no,) in removed],
+            )
+        return revision
+
+    def save(self, orders, changed, deleted):
+        """Write the ``changed`` and ``deleted`` orders in one transaction.
+
+        Nothing is merged: this is for writers that own the database, like
+        the workbook migration.
+        """
+        with self.transaction():
+            self.write(changed, deleted)
+
+    def close(self):
+        with self._lock:
+            self.conn.close()
@@ -0,0 +1,94 @@
+from datetime import date
+
+import pytest
+
+from catalog import Catalog, line_items
+from order_service import sales_report
+from order_store import OrderStore
+from rollups import SalesRollup
+from storage import SQLiteStorage
+
+TODAY = date.today().isoformat()
+
+
+def priced(history):
+    """Return a catalog whose 500g price has the given versions; 1kg is unchanged."""
+    return Catalog(
+        {
+            "500g": {"name": "500g Watalappam", "price": history[-1][1], "history": history},
+            "1kg": {"name": "1kg Watalappam", "price": 1000},
+        }
+    )
+
+
+@pytest.fixture
+def rolled(tmp_path):
+    """An empty store that keeps a sales rollup."""
+    rollup = SalesRollup(str(tmp_path / "orders.rollups.json"))
+    store = OrderStore(SQLiteStorage(str(tmp_path / "orders.db")), rollup=rollup, flush_delay=3600)
+    yield store
+    store.close()
+
+
+def test_price_changes_cannot_start_before_today():
+    catalog = Catalog()
+    with pytest.raises(ValueError, match="today"):
+        catalog.set("500g", "500g Watalappam", 550, "2025-03-01")
+    assert catalog.price("500g", "2025-03-01") == 500.0
+    catalog.set("500g", "500g Watalappam", 500, "2025-03-01")  # Same price: only the name could change
+    catalog.set("500g", "500g Watalappam", 550)
+    catalog.set("2kg", "2kg Watalappam", 1800, "2025-03-01")  # A new product's first price
+    assert catalog.price("500g") == 550.0
+    assert catalog.price("500g", "2025-03-01") == 500.0
+
+
+def test_revenue_breakdown_adds_up_to_the_totals_after_a_price_change(rolled, order):
+    catalog = Catalog()
+    rolled.add(order("1", "2025-03-01", Items={"500g": 2, "1kg": 1}, Total=2000.0))
+    rolled.revenue_by_day(catalog)
+    catalog.set("500g", "500g Watalappam", 550)
+    items = {"500g": 1}
+    rolled.add(order("2", TODAY, Items=items, Total=catalog.total(items, TODAY)))
+    report = sales_report(rolled, catalog)
+    assert report["total_sales"] == 2550.0
+    assert sum(report["revenue_breakdown"].values()) == report["total_sales"]
+
+
+def test_lines_are_priced_as_of_their_order_date(order):
+    catalog = priced([["2025-01-01", 500], ["2025-03-01", 550]])
+    orders = [
+        order("1", "2024-12-31"),  # Before the first version
+        order("2", "2025-02-28"),
+        order("3", "2025-03-01"),
+        order("4", "not a date"),
+        order("5", "2025-02-28", Items={"1kg": 1, "2kg": 1}),
+    ]
+    lines = catalog.price_lines(line_items(orders))
+    assert list(lines["Order No"]) == ["1", "2", "3", "4", "5", "5"]
+    assert list(lines["Price"]) == [500.0, 500.0, 550.0, 550.0, 1000.0, 0.0]
+    assert list(lines["Line Total"]) == [1000.0, 1000.0, 1100.0, 1100.0, 1000.0, 0.0]
+
+
+def test_revenue_reprices_only_the_days_changed_since(order, monkeypatch):
+    catalog = priced([["2025-01-01", 500], ["2025-03-01", 550]])
+    rollup = SalesRollup()
+    rollup.rebuild([order("1", "2025-02-28"), order("2", "2025-03-01")])
+    assert rollup.revenue_by_day(catalog)["500g"].to_dict() == {"2025-02-28": 1000.0, "2025-03-01": 1100.0}
+
+    def price_lines(items):
+        raise AssertionError("every day was priced again")
+
+    monkeypatch.setattr(catalog, "price_lines", price_lines)
+    rollup.apply(None, order("3", "2025-02-28", Items={"500g": 1, "1kg": 1}))
+    rollup.apply(None, order("4", "2025-03-02"))
+    revenue = rollup.revenue_by_day(catalog)
+    assert revenue["500g"].to_dict() == {"2025-02-28": 1500.0, "2025-03-01": 1100.0, "2025-03-02": 1100.0}
+    assert revenue["1kg"].to_dict() == {"2025-02-28": 1000.0, "2025-03-01": 0.0, "2025-03-02": 0.0}
+
+
+def test_revenue_is_priced_again_when_prices_change(order):
+    rollup = SalesRollup()
+    rollup.rebuild([order("1", "2025-02-28"), order("2", "2025-03-01")])
+    rollup.revenue_by_day(priced([["2025-01-01", 500]]))
+    revenue = rollup.revenue_by_day(priced([["2025-01-01", 500], ["2025-03-01", 550]]))
+    assert revenue["500g"].to_dict() == {"2025-02-28": 1000.0, "2025-03-01": 1100.0}
@@ -0,0 +1,44 @@
+import os
+
+from cli import main
+from order_service import CATALOG_FILE, EXCEL_FILE, TERMINAL, open_store
+from storage import ExcelStorage
+
+
+def test_list_keeps_the_journal_and_rollup_next_to_the_data(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    os.mkdir("shop")
+    main(["--data", "shop/orders.db", "list"])
+    assert sorted(os.listdir("shop")) == sorted(
+        ["orders.db", "orders.db.lock", f"orders.{TERMINAL}.journal.jsonl", f"orders.{TERMINAL}.rollups.json"]
+    )
+
+
+def test_list_shows_phone_numbers_as_text(tmp_path, monkeypatch, capsys, order):
+    monkeypatch.chdir(tmp_path)
+    store = open_store("orders.db")
+    store.add(order())
+    store.add(order("2", **{"Phone Number": None}))
+    store.close()
+    main(["--data", "orders.db", "list"])
+    output = capsys.readouterr().out
+    assert "0771234567" in output
+    assert "771234567.0" not in output
+
+
+def test_catalog_commands_do_not_open_the_orders(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    main(["product", "2kg", "--name", "2kg Watalappam", "--price", "1900"])
+    main(["products"])
+    assert os.listdir() == [CATALOG_FILE]
+
+
+def test_only_the_default_database_imports_the_default_workbook(tmp_path, monkeypatch, capsys, order):
+    monkeypatch.chdir(tmp_path)
+    ExcelStorage(EXCEL_FILE).save({}, [order()], [])
+    main(["--data", "shop.db", "list"])
+    assert "Nimal" not in capsys.readouterr().out
+    main(["--data", "other.db", "--excel", EXCEL_FILE, "list"])
+    assert "Nimal" in capsys.readouterr().out
+    main(["list"])
+    assert "Nimal" in capsys.readouterr().out
@@ -0,0 +1,29 @@
+import threading
+
+from customer_index import CustomerIndex
+
+
+def test_no_suggestions_until_the_index_is_built(store, order):
+    store.add(order(**{"Customer Name": "Nimal Perera"}))
+    assert store.find_customers("nim") == []
+    store.customer_index()
+    assert [customer["Customer Name"] for customer in store.find_customers("nim")] == ["Nimal Perera"]
+
+
+def test_index_builds_without_the_lock_and_keeps_changes_made_meanwhile(store, order, monkeypatch):
+    store.add(order())
+    rebuild = CustomerIndex.rebuild
+
+    def rebuild_while_adding(self, orders):
+        rebuild(self, orders)
+        # Another thread saves an order while the index is being built
+        other = order("2", **{"Customer Name": "Kamal Silva", "Phone Number": 712345678})
+        adding = threading.Thread(target=store.add, args=(other,))
+        adding.start()
+        adding.join(timeout=5)
+        assert not adding.is_alive()
+
+    monkeypatch.setattr(CustomerIndex, "rebuild", rebuild_while_adding)
+    store.customer_index()
+    assert [customer["Customer Name"] for customer in store.find_customers("kam")] == ["Kamal Silva"]
+    assert len(store.for_customer(712345678)) == 1
@@ -0,0 +1,56 @@
+import pandas as pd
+import pytest
+
+
+@pytest.fixture
+def store(store, order):
+    """The shared store, filled with 100 March orders and with its date index built."""
+    store.add_many([order(str(n), f"2025-03-{n % 28 + 1:02d}") for n in range(100)])
+    store.between("2025-01-01", "2025-12-31")  # builds the date index
+    return store
+
+
+def rebuilt(store):
+    store._by_date = None
+    return store.between("2000-01-01", "2100-12-31")
+
+
+def assert_same_orders(patched, rebuilt):
+    def key(frame):
+        frame = frame.astype(object).sort_values(["Date", "Order No"], key=lambda column: column.astype(str))
+        return frame.reset_index(drop=True)
+
+    assert patched["Date"].is_monotonic_increasing
+    pd.testing.assert_frame_equal(key(patched), key(rebuilt), check_dtype=False)
+
+
+def test_changes_are_patched_into_the_index(store, order):
+    built = store._by_date[0]
+    store.update("5", {"Date": "2025-01-15", "Customer Name": "Kamal"})
+    store.update("6", {"Status": "Completed", "Items": {"500g": 3}})
+    store.delete("7")
+    store.add(order("new", "2025-03-02", **{"Phone Number": None}))
+    store.add(order("undated", "not a date"))
+    patched = store.between("2000-01-01", "2100-12-31")
+    assert store._by_date[0] is not built
+    assert "7" not in set(patched["Order No"])
+    assert patched["Order No"].iloc[0] == "5"
+    assert_same_orders(patched, rebuilt(store))
+
+
+def test_new_product_or_status_rebuilds_the_index(store):
+    store.update("5", {"Items": {"1kg": 1}})
+    store.update("6", {"Status": "Collected"})
+    patched = store.between("2000-01-01", "2100-12-31")
+    assert "1kg Quantity" in patched
+    assert "Collected" in set(patched["Status"])
+    assert_same_orders(patched, rebuilt(store))
+
+
+def test_repeated_changes_of_one_order_leave_one_row(store):
+    for date in ("2025-05-01", "2025-02-01", "2025-04-01"):
+        store.update("5", {"Date": date})
+        store.between("2025-01-01", "2025-12-31")
+    patched = store.between("2000-01-01", "2100-12-31")
+    assert list(patched["Order No"]).count("5") == 1
+    assert_same_orders(patched, rebuilt(store))
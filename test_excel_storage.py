@@ -0,0 +1,64 @@
+import os
+
+import pandas as pd
+import pytest
+
+from storage import ExcelStorage
+
+pytest.importorskip("pyarrow")
+
+
+@pytest.fixture
+def workbook(tmp_path, order):
+    storage = ExcelStorage(str(tmp_path / "orders.xlsx"))
+    storage.save({}, [order("1"), order("2", **{"Customer Name": "Kamal"})], [])
+    return storage
+
+
+@pytest.fixture
+def parses(monkeypatch):
+    """Count the workbooks parsed with ``pd.read_excel``."""
+    calls = []
+    read_excel = pd.read_excel
+
+    def counted(*args, **kwargs):
+        calls.append(args[0])
+        return read_excel(*args, **kwargs)
+
+    monkeypatch.setattr(pd, "read_excel", counted)
+    return calls
+
+
+def names(orders):
+    return {order["Order No"]: order["Customer Name"] for order in orders}
+
+
+def test_unchanged_workbook_loads_from_the_cache(workbook, parses):
+    assert names(workbook.load()) == {"1": "Nimal", "2": "Kamal"}
+    assert parses == []
+
+
+def test_outside_edit_of_the_workbook_is_parsed_again(workbook, parses):
+    # As if the workbook was edited in Excel: new contents, or only a new time
+    edited = pd.read_excel(workbook.path, dtype={"Order No": str})
+    edited.loc[1, "Customer Name"] = "Sunil"
+    edited.to_excel(workbook.path, index=False)
+    assert names(workbook.load()) == {"1": "Nimal", "2": "Sunil"}
+    assert len(parses) == 2
+    stat = os.stat(workbook.path)
+    os.utime(workbook.path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    assert names(workbook.load()) == {"1": "Nimal", "2": "Sunil"}
+    assert len(parses) == 3
+    workbook.load()
+    assert len(parses) == 3
+
+
+def test_truncated_cache_falls_back_to_the_workbook(workbook, parses):
+    size = os.path.getsize(workbook.cache_path)
+    with open(workbook.cache_path, "r+b") as file:
+        file.truncate(size // 2)
+    assert names(workbook.load()) == {"1": "Nimal", "2": "Kamal"}
+    assert parses == [workbook.path]
+    # The workbook was cached again
+    assert names(workbook.load()) == {"1": "Nimal", "2": "Kamal"}
+    assert parses == [workbook.path]
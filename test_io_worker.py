@@ -0,0 +1,29 @@
+from io_worker import IOExecutor
+
+
+class FakeRoot:
+    """Stands in for a Tk root: ``after`` callbacks run when ``run`` is called."""
+
+    def __init__(self):
+        self.callbacks = []
+
+    def after(self, ms, callback):
+        self.callbacks.append(callback)
+
+    def run(self, future):
+        future.result()
+        while self.callbacks:
+            self.callbacks.pop(0)()
+
+
+def test_quiet_work_does_not_show_the_busy_indicator():
+    root, busy = FakeRoot(), []
+    io = IOExecutor(root, on_busy=busy.append)
+    done = []
+    root.run(io.submit_write(lambda: 1, on_done=done.append, quiet=True))
+    assert done == [1]
+    assert busy == []
+    root.run(io.submit_write(lambda: 2, on_done=done.append))
+    assert done == [1, 2]
+    assert busy == [True, False]
+    io.shutdown()
@@ -0,0 +1,51 @@
+import json
+import os
+import sqlite3
+
+import pandas as pd
+
+from order_service import CATALOG_FILE, DATA_FILE, EXCEL_FILE, PRICE_FILE, load_catalog, open_store
+
+
+def test_first_run_migrates_the_legacy_workbook_and_prices(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    # The workbook and price list from before the catalog and the database
+    pd.DataFrame(
+        {
+            "Order No": ["1", "2"],
+            "Date": ["2025-03-01", "2025-03-02"],
+            "Customer Name": ["Nimal", "Kamal"],
+            "Phone Number": [771234567, 712345678],
+            "Address": ["Colombo", "Kandy"],
+            "500g Quantity": [2, 0],
+            "1kg Quantity": [0, 3],
+            "Total": [1100.0, 3300.0],
+            "Status": ["Pending", "Completed"],
+        }
+    ).to_excel(EXCEL_FILE, index=False)
+    with open(PRICE_FILE, "w") as file:
+        json.dump({"500g": 550, "1kg": 1100}, file)
+
+    store = open_store()
+    catalog = load_catalog()
+    assert {order_no: store.get(order_no)["Items"] for order_no in ("1", "2")} == {"1": {"500g": 2}, "2": {"1kg": 3}}
+    store.close()
+    with sqlite3.connect(DATA_FILE) as db:
+        rows = db.execute("SELECT order_no, product_id, quantity FROM order_items ORDER BY order_no").fetchall()
+        columns = [row[1] for row in db.execute("PRAGMA table_info(orders)")]
+    assert rows == [("1", "500g", 2), ("2", "1kg", 3)]
+    assert not any(column.endswith("quantity") for column in columns)
+
+    assert os.path.exists(CATALOG_FILE)
+    assert {product_id: catalog.price(product_id, "2025-03-01") for product_id in catalog} == {
+        "500g": 550.0,
+        "1kg": 1100.0,
+    }
+    assert catalog.name("1kg") == "1kg Watalappam"
+
+    # Once migrated, the database and catalog are what later runs open
+    os.remove(EXCEL_FILE)
+    store = open_store()
+    assert len(store) == 2
+    store.close()
+    assert load_catalog().price("500g") == 550.0
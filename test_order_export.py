@@ -0,0 +1,64 @@
+import json
+
+import pandas as pd
+import pytest
+
+from order_export import export_orders, file_checksum, manifest_path, verify_export
+
+COLUMNS = [
+    "Order No", "Date", "Customer Name", "Phone Number", "Address", "500g Quantity", "1kg Quantity", "Total", "Status",
+]
+EXPORTED = [
+    ["1", "2025-03-01", "Nimal", "0771234567", "Colombo", 2, 0, 1000.0, "Pending"],
+    ["2", "2025-03-01", "Nimal", "", "Colombo", 0, 1, 1000.0, "Pending"],
+    ["3", "2025-03-02", "Nimal", "0771234567", "Colombo", 1, 0, 500.0, "Completed"],
+]
+
+
+@pytest.fixture
+def exported(store, order, tmp_path):
+    """Export three orders, two chunks at a time, to a file with the given extension."""
+    store.add(order("1"))
+    store.add(order("2", Items={"1kg": 1}, **{"Phone Number": None}))
+    store.add(order("3", "2025-03-02", Items={"500g": 1}, Total=500.0, Status="Completed"))
+
+    def export(extension):
+        path = str(tmp_path / f"orders{extension}")
+        manifest = export_orders(store, path, chunk_rows=2)
+        with open(manifest_path(path)) as file:
+            assert json.load(file) == manifest
+        assert manifest["rows"] == 3
+        assert manifest["sha256"] == file_checksum(path)
+        assert verify_export(path)
+        return path
+
+    return export
+
+
+def assert_orders(frame):
+    assert list(frame.columns) == COLUMNS
+    assert frame.fillna("").values.tolist() == EXPORTED
+
+
+def test_csv_round_trip(exported):
+    path = exported(".csv")
+    assert_orders(pd.read_csv(path, dtype={"Order No": str, "Phone Number": str}))
+    with open(path, "a") as file:
+        file.write("4,2025-03-03\n")
+    assert not verify_export(path)
+
+
+def test_parquet_round_trip(exported):
+    pytest.importorskip("pyarrow")
+    assert_orders(pd.read_parquet(exported(".parquet")))
+
+
+def test_xlsx_round_trip_with_daily_summary(exported):
+    sheets = pd.read_excel(exported(".xlsx"), sheet_name=None, dtype={"Order No": str, "Phone Number": str})
+    assert list(sheets) == ["Orders", "Daily Summary"]
+    assert_orders(sheets["Orders"])
+    assert sheets["Daily Summary"].values.tolist() == [
+        ["2025-03-01", 2, 2, 1, 2000.0],
+        ["2025-03-02", 1, 1, 0, 500.0],
+        ["Total", 3, 3, 1, 2500.0],
+    ]
@@ -0,0 +1,68 @@
+import csv
+
+import pytest
+
+from catalog import Catalog
+from order_import import import_orders
+from order_service import INVALID_NUMBERS
+
+HEADER = [
+    "Order No", "Date", "Customer Name", "Phone Number", "Address",
+    "500g Quantity", "1kg Quantity", "2kg Quantity", "Status",
+]
+ROWS = [
+    ["10", "2025-03-01", "Nimal", "0771234567", "Colombo", "2", "", "", ""],
+    ["11", "2025-13-01", "Nimal", "0771234567", "Colombo", "2", "", "", ""],
+    ["12", "2025-03-01", "Nimal", "0771234567", "Colombo", "-1", "1", "", ""],
+    ["13", "2025-03-01", "Nimal", "0771234567", "Colombo", "1.5", "", "", ""],
+    ["14", "2025-03-01", "Nimal", "0771234567", "Colombo", "", "", "1", ""],
+    ["1", "2025-03-01", "Nimal", "0771234567", "Colombo", "1", "", "", ""],
+    ["10", "2025-03-02", "Nimal", "0771234567", "Colombo", "1", "", "", ""],
+    ["15", "2025-03-01", "Nimal", "077-123", "Colombo", "1", "", "", ""],
+    ["", "2025-03-02", "Kamal", "712345678", "Kandy", "", "1", "", "Completed"],
+]
+
+
+def write_csv(path, rows):
+    with open(path, "w", newline="") as file:
+        csv.writer(file).writerows([HEADER] + rows)
+
+
+def write_xlsx(path, rows):
+    from openpyxl import Workbook
+
+    workbook = Workbook()
+    for row in [HEADER] + rows:
+        workbook.active.append(row)
+    workbook.save(path)
+
+
+@pytest.mark.parametrize("extension, write", [(".csv", write_csv), (".xlsx", write_xlsx)])
+def test_bad_rows_are_rejected_by_line_and_the_rest_imported(store, order, tmp_path, extension, write):
+    store.add(order("1"))
+    path = str(tmp_path / f"orders{extension}")
+    write(path, ROWS)
+    # Two rows a chunk, so duplicates are also found across chunks
+    added, errors = import_orders(store, path, Catalog(), chunk_rows=2)
+    assert errors == [
+        (3, "'2025-13-01' is not a valid date. Use YYYY-MM-DD."),
+        (4, INVALID_NUMBERS),
+        (5, INVALID_NUMBERS),
+        (6, "Unknown product: 2kg"),
+        (7, "Order No 1 is already in use."),
+        (8, "Order No 10 is already in use."),
+        (9, INVALID_NUMBERS),
+    ]
+    assert added == 2
+    assert len(store) == 3
+    imported = store.get("10")
+    assert imported["Date"] == "2025-03-01"
+    assert imported["Phone Number"] == 771234567
+    assert imported["Items"] == {"500g": 2}
+    assert imported["Total"] == 1000.0
+    assert imported["Status"] == "Pending"
+    # The row without an Order No gets a new one
+    numbered = store.between("2025-03-02", "2025-03-02")
+    assert list(numbered["Customer Name"]) == ["Kamal"]
+    assert numbered["Order No"].iloc[0] not in ("", "1", "10")
+    assert store.get("1")["Items"] == {"500g": 2}
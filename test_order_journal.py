@@ -0,0 +1,28 @@
+import os
+import stat
+
+import pytest
+
+from order_journal import UMASK, atomic_write
+
+
+def write_text(tmp_path):
+    with open(tmp_path, "w") as file:
+        file.write("orders")
+
+
+@pytest.mark.skipif(os.name != "posix", reason="POSIX file modes")
+def test_atomic_write_keeps_the_mode_of_the_replaced_file(tmp_path):
+    path = tmp_path / "orders.xlsx"
+    path.write_text("old")
+    os.chmod(path, 0o664)
+    atomic_write(str(path), write_text)
+    assert stat.S_IMODE(os.stat(path).st_mode) == 0o664
+    assert path.read_text() == "orders"
+
+
+@pytest.mark.skipif(os.name != "posix", reason="POSIX file modes")
+def test_atomic_write_creates_files_with_the_umask_mode(tmp_path):
+    path = tmp_path / "catalog.json"
+    atomic_write(str(path), write_text)
+    assert stat.S_IMODE(os.stat(path).st_mode) == 0o666 & ~UMASK
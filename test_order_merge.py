@@ -0,0 +1,66 @@
+from order_merge import merge_order
+
+
+BASE = {
+    "Order No": "1",
+    "Date": "2025-03-01",
+    "Customer Name": "Nimal",
+    "Phone Number": 771234567,
+    "Address": "Colombo",
+    "Items": {"500g": 2},
+    "Total": 1000.0,
+    "Status": "Pending",
+}
+
+
+def test_changes_to_different_fields_are_both_kept():
+    local = {**BASE, "Status": "Completed"}
+    remote = {**BASE, "Address": "Kandy"}
+    merged, conflicts = merge_order(BASE, local, remote)
+    assert merged["Status"] == "Completed"
+    assert merged["Address"] == "Kandy"
+    assert conflicts == []
+
+
+def test_same_field_keeps_local_value_and_reports_it():
+    local = {**BASE, "Status": "Completed"}
+    remote = {**BASE, "Status": "In Progress"}
+    merged, conflicts = merge_order(BASE, local, remote)
+    assert merged["Status"] == "Completed"
+    assert conflicts == ["Status"]
+
+
+def test_same_change_on_both_sides_is_no_conflict():
+    local = remote = {**BASE, "Status": "Completed"}
+    assert merge_order(BASE, local, remote) == (local, [])
+
+
+def test_items_are_merged_per_product_and_totals_added_up():
+    local = {**BASE, "Items": {"500g": 3}, "Total": 1500.0}
+    remote = {**BASE, "Items": {"500g": 2, "1kg": 1}, "Total": 2000.0}
+    merged, conflicts = merge_order(BASE, local, remote)
+    assert merged["Items"] == {"500g": 3, "1kg": 1}
+    assert merged["Total"] == 2500.0
+    assert conflicts == []
+
+
+def test_missing_totals_count_as_zero():
+    base = {**BASE, "Total": None}
+    local = {**base, "Items": {"500g": 3}, "Total": 1500.0}
+    remote = {**base, "Items": {"500g": 2, "1kg": 1}, "Total": None}
+    merged, _ = merge_order(base, local, remote)
+    assert merged["Total"] == 1500.0
+
+
+def test_remote_item_change_brings_its_total():
+    local = {**BASE, "Status": "Completed"}
+    remote = {**BASE, "Items": {"1kg": 1}, "Total": 1100.0}
+    merged, _ = merge_order(BASE, local, remote)
+    assert merged["Items"] == {"1kg": 1}
+    assert merged["Total"] == 1100.0
+    assert merged["Status"] == "Completed"
+
+
+def test_edit_of_remotely_deleted_order_is_kept():
+    local = {**BASE, "Status": "Completed"}
+    assert merge_order(BASE, local, None) == (local, ["deleted"])
@@ -0,0 +1,70 @@
+import json
+import os
+import threading
+
+import pytest
+
+from order_store import OrderStore
+from rollups import SalesRollup
+from storage import SQLiteStorage
+
+
+@pytest.fixture
+def paths(store, order, tmp_path):
+    store.add(order())
+    store.flush()
+    return store.storage.path, str(tmp_path / "orders.rollups.json")
+
+
+def saved(path):
+    with open(path) as file:
+        return json.load(file)
+
+
+def test_rollup_rebuilt_on_load_is_saved(paths):
+    data, rollup = paths
+    store = OrderStore(SQLiteStorage(data), rollup=SalesRollup.load(rollup))
+    store.close()
+    assert saved(rollup)["totals"]["orders"] == 1
+
+
+def test_rollup_corrected_by_check_is_saved(paths):
+    data, rollup = paths
+    store = OrderStore(SQLiteStorage(data), rollup=SalesRollup.load(rollup))
+    os.remove(rollup)
+    store.rollup.days["2025-03-01"]["total"] = 5.0
+    assert store.check_rollup() is False
+    assert saved(rollup)["days"]["2025-03-01"]["total"] == 1000.0
+    store.close()
+
+
+def test_check_rollup_builds_without_the_lock_and_keeps_changes_made_meanwhile(paths, order, monkeypatch):
+    data, rollup = paths
+    store = OrderStore(SQLiteStorage(data), rollup=SalesRollup.load(rollup))
+    rebuild = SalesRollup.rebuild
+
+    def rebuild_while_adding(self, orders):
+        rebuild(self, orders)
+        # Another thread saves an order while the rollup is being rebuilt
+        adding = threading.Thread(target=store.add, args=(order("2", "2025-03-02"),))
+        adding.start()
+        adding.join(timeout=5)
+        assert not adding.is_alive()
+
+    monkeypatch.setattr(SalesRollup, "rebuild", rebuild_while_adding)
+    assert store.check_rollup() is True
+    assert store.rollup.totals["orders"] == 2
+    assert "2025-03-02" in store.rollup.days
+    store.close()
+
+
+def test_rollups_with_other_totals_do_not_match(order):
+    mine, theirs = SalesRollup(), SalesRollup()
+    mine.rebuild([order()])
+    theirs.rebuild([order()])
+    assert mine.matches(theirs)
+    theirs.totals["total"] += 500.0
+    assert not mine.matches(theirs)
+    theirs.rebuild([order()])
+    theirs.totals["items"]["1kg"] = 1.0
+    assert not mine.matches(theirs)
@@ -0,0 +1,127 @@
+import pytest
+
+from order_journal import OrderJournal
+from order_store import OrderStore
+from storage import SQLiteStorage
+
+
+@pytest.fixture
+def path(store, order):
+    store.add(order())
+    store.flush()
+    return store.storage.path
+
+
+def terminal(path, journal=None):
+    return OrderStore(SQLiteStorage(path), flush_delay=3600, journal=journal and OrderJournal(journal))
+
+
+def crash(store):
+    """Stop a store without flushing, as if the terminal lost power."""
+    store._timer.cancel()
+    store.journal.close()
+    store.storage.close()
+
+
+def stored(path):
+    store = terminal(path)
+    try:
+        return store.get("1")
+    finally:
+        store.close()
+
+
+def test_edits_of_different_fields_are_merged(path):
+    a, b = terminal(path), terminal(path)
+    a.update("1", {"Status": "Completed"})
+    b.update("1", {"Address": "Kandy"})
+    a.flush()
+    assert b.sync() == ({"1"}, [])
+    assert a.sync() == ({"1"}, [])
+    for order in (a.get("1"), b.get("1"), stored(path)):
+        assert (order["Status"], order["Address"]) == ("Completed", "Kandy")
+    a.close()
+    b.close()
+
+
+def test_edits_of_the_same_field_keep_the_later_save_and_report_it(path):
+    a, b = terminal(path), terminal(path)
+    a.update("1", {"Status": "Completed"})
+    b.update("1", {"Status": "In Progress"})
+    a.flush()
+    assert b.sync() == (set(), [("1", ["Status"])])
+    assert a.sync()[0] == {"1"}
+    assert a.get("1")["Status"] == stored(path)["Status"] == "In Progress"
+    a.close()
+    b.close()
+
+
+def test_edit_wins_over_a_delete_on_another_terminal(path):
+    a, b = terminal(path), terminal(path)
+    a.delete("1")
+    b.update("1", {"Address": "Kandy"})
+    a.flush()
+    assert b.sync() == (set(), [("1", ["deleted"])])
+    assert a.sync() == ({"1"}, [])
+    assert a.get("1")["Address"] == "Kandy"
+    a.close()
+    b.close()
+
+
+def test_delete_of_an_order_edited_elsewhere_restores_it(path):
+    a, b = terminal(path), terminal(path)
+    a.update("1", {"Address": "Kandy"})
+    b.delete("1")
+    a.flush()
+    assert b.sync() == ({"1"}, [("1", ["restored"])])
+    assert b.get("1")["Address"] == "Kandy"
+    assert stored(path)["Address"] == "Kandy"
+    a.close()
+    b.close()
+
+
+def test_replayed_change_is_merged_with_saves_made_after_the_crash(path, tmp_path):
+    journal = str(tmp_path / "a.journal.jsonl")
+    a = terminal(path, journal)
+    a.update("1", {"Status": "Completed"})
+    crash(a)
+    b = terminal(path)
+    b.update("1", {"Address": "Kandy"})
+    b.close()
+
+    a = terminal(path, journal)
+    assert a.sync() == (set(), [])
+    a.close()
+    order = stored(path)
+    assert (order["Status"], order["Address"]) == ("Completed", "Kandy")
+
+
+def test_replayed_change_of_a_field_changed_elsewhere_is_reported(path, tmp_path):
+    journal = str(tmp_path / "a.journal.jsonl")
+    a = terminal(path, journal)
+    a.update("1", {"Status": "Completed"})
+    crash(a)
+    b = terminal(path)
+    b.update("1", {"Status": "In Progress"})
+    b.close()
+
+    a = terminal(path, journal)
+    assert a.sync() == (set(), [("1", ["Status"])])
+    a.close()
+    assert stored(path)["Status"] == "Completed"
+
+
+def test_replayed_delete_of_an_order_edited_elsewhere_restores_it(path, tmp_path):
+    journal = str(tmp_path / "a.journal.jsonl")
+    a = terminal(path, journal)
+    a.delete("1")
+    crash(a)
+    b = terminal(path)
+    b.update("1", {"Address": "Kandy"})
+    b.close()
+
+    a = terminal(path, journal)
+    assert a.get("1")["Address"] == "Kandy"
+    assert a.sync() == (set(), [("1", ["restored"])])
+    a.close()
+    assert stored(path)["Address"] == "Kandy"
@@ -0,0 +1,7 @@
+from benchmarks import IMPORT_BUDGET_S, import_cost
+
+
+def test_app_and_cli_import_quickly_without_heavy_modules():
+    seconds, heavy = import_cost(("watalappam_business_app", "cli"))
+    assert heavy == []
+    assert seconds <= IMPORT_BUDGET_S
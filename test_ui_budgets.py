@@ -0,0 +1,30 @@
+import os
+import sys
+
+import pytest
+
+from benchmarks import DASHBOARD_GROWTH_BUDGET_MB, FIRST_PAINT_BUDGET_S, dashboard_memory_growth, first_paint_time
+
+
+pytestmark = pytest.mark.skipif(
+    sys.platform.startswith("linux") and not os.environ.get("DISPLAY"),
+    reason="needs a display",
+)
+
+
+@pytest.fixture
+def root():
+    tk = pytest.importorskip("tkinter")
+    root = tk.Tk()
+    root.withdraw()
+    yield root
+    root.destroy()
+
+
+def test_reopening_the_dashboard_does_not_leak(root):
+    pytest.importorskip("matplotlib")
+    assert dashboard_memory_growth(root, opens=200) <= DASHBOARD_GROWTH_BUDGET_MB
+
+
+def test_first_paint_does_not_wait_for_the_orders():
+    assert first_paint_time(100_000) <= FIRST_PAINT_BUDGET_S
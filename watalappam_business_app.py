@@ -1,15 +1,39 @@
 import tkinter as tk
-from tkinter import ttk, messagebox
-import pandas as pd
-from datetime import datetime
+from tkinter import ttk, messagebox, filedialog
 import os
-import json
-import uuid
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-import mplcursors
-from PIL import Image, ImageDraw, ImageFont
-from PIL import ImageTk
+import queue
+from datetime import date
+from catalog import quantity_column
+from customer_index import phone_key, phone_text
+from date_filters import PRESETS, parse_date, parse_date_range, preset_range
+from io_worker import IOExecutor
+from order_export import export_orders
+from order_import import import_orders
+from order_service import (
+    CATALOG_FILE,
+    DATA_FILE,
+    EXCEL_FILE,
+    FORM_FIELDS,
+    JOURNAL_FILE,
+    NO_PRODUCT,
+    PRICE_FILE,
+    RECEIPT_FOLDER,
+    ROLLUP_FILE,
+    OrderForm,
+    load_catalog,
+    new_order_number,
+    open_store,
+    sales_report,
+)
+from order_store import STATUSES
+from order_table import VirtualOrderTable, display_row, display_rows
+from receipts import export_receipts_pdf, render_receipt, render_receipts, select_orders
+
+
+SUGGEST_DELAY_MS = 150  # typing pause before customer suggestions are looked up
+CHECK_DELAY_MS = 100  # typing pause before the order form is validated and totalled
+SYNC_INTERVAL_MS = 5000  # how often orders saved by other terminals are read in
+SYNC_PATCH_ROWS = 200  # more changed orders than this reload the table instead
 
 
 class WatalappamBusinessApp:
@@ -37,44 +61,101 @@ class WatalappamBusinessApp:
             "tree_fg": "white",
         }
         # File paths
-        self.price_file = "prices.json"
-        self.excel_file = "watalappam_orders.xlsx"
-        self.receipt_folder = "receipts/"
+        self.catalog_file = CATALOG_FILE
+        self.price_file = PRICE_FILE
+        self.excel_file = EXCEL_FILE
+        self.data_file = DATA_FILE
+        self.journal_file = JOURNAL_FILE
+        self.rollup_file = ROLLUP_FILE
+        self.receipt_folder = RECEIPT_FOLDER
         if not os.path.exists(self.receipt_folder):
             os.makedirs(self.receipt_folder)
-        # Load prices and initialize Excel file
-        self.load_prices()
-        if not os.path.exists(self.excel_file):
-            df = pd.DataFrame(
-                columns=[
-                    "Order No",
-                    "Date",
-                    "Customer Name",
-                    "Phone Number",
-                    "Address",
-                    "500g Quantity",
-                    "1kg Quantity",
-                    "Total",
-                    "Status",
-                ]
-            )
-            df.to_excel(self.excel_file, index=False)
+        # The order store is opened in the background once the window is up
+        self.load_catalog()
+        self.store = None
+        self.opening = None
         # Variables for form fields
         self.customer_name_var = tk.StringVar()
         self.phone_number_var = tk.StringVar()
         self.address_var = tk.StringVar()
-        self.qty_500g_var = tk.StringVar(value="0")
-        self.qty_1kg_var = tk.StringVar(value="0")
+        # Quantity of each catalog product, keyed by product id
+        self.quantity_vars = {product_id: tk.StringVar(value="0") for product_id in self.catalog}
         self.total_var = tk.StringVar(value="0.00")
         self.status_var = tk.StringVar(value="Pending")
+        self.form_message_var = tk.StringVar()
+        # Parsed form values, checked once per pause in typing
+        self.form = OrderForm(self.catalog)
+        self.form_check_job = None
+        self.show_all_errors = False  # only flag typos until an order is submitted
         self.selected_order = None
-        # Recalculate total when quantity changes
-        self.qty_500g_var.trace("w", self.calculate_total)
-        self.qty_1kg_var.trace("w", self.calculate_total)
+        self.date_filter = None  # (start, end) while the table is filtered
+        self.customer_filter = None  # phone number while the table shows one customer
+        self.customer_suggestions = []
+        self.suggest_job = None
+        self.autofilling = False  # set while the form is filled in by the app
+        self.dashboard = None
+        self.dashboard_refresh_job = None
+        # Storage and rendering work runs off the Tk thread
+        self.io = IOExecutor(self.root, on_busy=self.set_busy)
+        # Revalidate and recalculate the total when the form changes
+        for var in self.form_vars() + tuple(self.quantity_vars.values()):
+            var.trace("w", self.schedule_form_check)
+        # Suggest repeat customers as a name or phone number is typed
+        self.customer_name_var.trace("w", self.schedule_customer_suggestions)
+        self.phone_number_var.trace("w", self.schedule_customer_suggestions)
         # Create widgets
         self.create_widgets()
         # Apply custom styles
         self.apply_styles()
+        # Write pending orders to disk before the window closes
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
+        # Everything else waits until the window has been drawn
+        self.root.after_idle(self.finish_startup)
+
+    def finish_startup(self):
+        """Load what the first paint does not need, in the background."""
+        self.io.submit_read(
+            self.load_header_logo,
+            on_done=self.show_header_logo,
+            on_error=lambda e: print(f"Error loading logo: {e}"),
+        )
+        # Opening reads every order and may import the workbook, so it is
+        # queued as a write: nothing else can touch the store before it
+        self.show_form_message("Loading orders...")
+        self.opening = self.io.submit_write(
+            open_store,
+            self.data_file,
+            self.journal_file,
+            self.rollup_file,
+            self.excel_file,
+            on_done=self.store_opened,
+            on_error=lambda e: self.show_form_message(f"Could not open the orders: {e}", error=True),
+        )
+
+    def store_opened(self, store):
+        """Fill the order table once the store is open and start syncing."""
+        self.store = store
+        self.check_form()
+        self.load_recent_orders()
+        # Rebuild the sales rollups from raw orders once in the background
+        self.io.submit_read(self.store.check_rollup)
+        # Customer suggestions start once this index is built
+        self.io.submit_read(self.store.customer_index)
+        self.root.after(SYNC_INTERVAL_MS, self.sync_orders)
+
+    @staticmethod
+    def load_header_logo():
+        from PIL import Image
+
+        logo_image = Image.open("logo.jpg")
+        return logo_image.resize((50, 50))
+
+    def show_header_logo(self, logo_image):
+        from PIL import ImageTk
+
+        logo_photo = ImageTk.PhotoImage(logo_image)
+        self.logo_label.configure(image=logo_photo)
+        self.logo_label.image = logo_photo
 
     def apply_styles(self):
         """Apply custom styles to buttons and other widgets."""
@@ -108,30 +189,99 @@ class WatalappamBusinessApp:
             foreground=self.light_theme["fg"],
             font=("Arial", 12, "bold"),
         )
+        # Order form entries with an invalid value
+        style.configure("Error.TEntry", fieldbackground="#ffe0e0")
+
+    def on_close(self):
+        """Flush pending order changes and close the application.
 
-    def load_prices(self):
-        """Load prices from JSON file."""
-        if os.path.exists(self.price_file):
-            with open(self.price_file, "r") as file:
-                self.prices = json.load(file)
+        If they cannot be saved, e.g. while the shared folder is out of
+        reach, they stay in the journal and are saved on the next start.
+        """
+        self.io.shutdown()
+        if self.store is None and self.opening is not None and self.opening.exception() is None:
+            # Opened just now, before its result was handed back
+            self.store = self.opening.result()
+        try:
+            if self.store is not None:
+                self.store.close()
+        except Exception as e:
+            messagebox.showwarning(
+                "Orders Not Saved",
+                f"Recent changes could not be saved ({e}). They will be saved the next time the app starts.",
+            )
+        self.root.destroy()
+
+    def store_ready(self):
+        """Return True once the orders are loaded, else say they are loading."""
+        if self.store is None:
+            self.show_form_message("Orders are still loading, please wait.", error=True)
+            return False
+        return True
+
+    def set_busy(self, busy):
+        """Show or hide the busy indicator while background work is running."""
+        if busy:
+            self.busy_indicator.pack(side="right", padx=10)
+            self.busy_indicator.start(10)
         else:
-            self.prices = {"500g": 500, "1kg": 1000}
-            self.save_prices()
+            self.busy_indicator.stop()
+            self.busy_indicator.pack_forget()
 
-    def save_prices(self):
-        """Save prices to JSON file."""
-        with open(self.price_file, "w") as file:
-            json.dump(self.prices, file)
+    def load_catalog(self):
+        """Load the product catalog, creating it from the old prices file."""
+        self.catalog = load_catalog(self.catalog_file, self.price_file)
 
-    def calculate_total(self, *args):
-        """Calculate the total price based on quantities."""
-        try:
-            qty_500g = int(self.qty_500g_var.get() or 0)
-            qty_1kg = int(self.qty_1kg_var.get() or 0)
-            total = (qty_500g * self.prices["500g"]) + (qty_1kg * self.prices["1kg"])
-            self.total_var.set(f"{total:.2f}")
-        except ValueError:
-            self.total_var.set("0.00")
+    def save_catalog(self, catalog):
+        """Save an edited catalog and show quantity fields for any new products."""
+        self.catalog = catalog
+        self.catalog.save()
+        for product_id in self.catalog:
+            if product_id not in self.quantity_vars:
+                self.quantity_vars[product_id] = tk.StringVar(value="0")
+                self.quantity_vars[product_id].trace("w", self.schedule_form_check)
+        self.create_quantity_entries()
+        self.form.set_catalog(self.catalog)
+        self.check_form()
+
+    def schedule_form_check(self, *args):
+        """Check the order form once typing pauses, not on every keystroke."""
+        if self.form_check_job is not None:
+            self.root.after_cancel(self.form_check_job)
+        self.form_check_job = self.root.after(CHECK_DELAY_MS, self.check_form)
+
+    def check_form(self):
+        """Validate the form, update the total and show errors inline.
+
+        Returns the errors by field. The form caches what it parsed, so the
+        submit that follows a check does not parse the fields again.
+        """
+        if self.form_check_job is not None:
+            self.root.after_cancel(self.form_check_job)
+            self.form_check_job = None
+        self.form.update(dict(zip(FORM_FIELDS, self.form_values())))
+        self.form.update(
+            {quantity_column(product_id): var.get() for product_id, var in self.quantity_vars.items()}
+        )
+        errors = self.form.check()
+        self.total_var.set(f"{self.form.total:.2f}")
+        shown = errors
+        if not self.show_all_errors:
+            # While typing, only flag fields holding something that is not a number
+            shown = {
+                field: error
+                for field, error in errors.items()
+                if error != NO_PRODUCT and str(self.form.values[field]).strip()
+            }
+        for field, entry in {**self.form_entries, **self.quantity_entries}.items():
+            entry.configure(style="Error.TEntry" if field in shown else "TEntry")
+        self.show_form_message(next(iter(shown.values()), ""), error=True)
+        return errors
+
+    def show_form_message(self, message, error=False):
+        """Show a message below the order form instead of in a popup."""
+        self.form_message_label.configure(foreground="#d32f2f" if error else "#2e7d32")
+        self.form_message_var.set(message)
 
     def create_widgets(self):
         """Create all GUI widgets."""
@@ -139,16 +289,11 @@ class WatalappamBusinessApp:
         header_frame = tk.Frame(self.root, bg="#4CAF50", pady=20)
         header_frame.pack(fill="x")
 
-        # Add Logo
-        try:
-            logo_image = Image.open("logo.jpg")
-            logo_image = logo_image.resize((50, 50))
-            logo_photo = ImageTk.PhotoImage(logo_image)
-            logo_label = tk.Label(header_frame, image=logo_photo, bg="#4CAF50")
-            logo_label.image = logo_photo
-            logo_label.pack(side="left", padx=10)
-        except Exception as e:
-            print(f"Error loading logo: {e}")
+        # Add Logo; a blank placeholder keeps the layout until it has loaded
+        placeholder = tk.PhotoImage(width=50, height=50)
+        self.logo_label = tk.Label(header_frame, image=placeholder, bg="#4CAF50")
+        self.logo_label.image = placeholder
+        self.logo_label.pack(side="left", padx=10)
 
         # Add Application Name
         app_name_label = tk.Label(
@@ -176,6 +321,9 @@ class WatalappamBusinessApp:
         )
         self.info_button.pack(side="right", padx=10)
 
+        # Busy indicator, shown while background work is running
+        self.busy_indicator = ttk.Progressbar(header_frame, mode="indeterminate", length=100)
+
         # Frame for top-right buttons (Clear Form and Dark Mode)
         top_button_frame = tk.Frame(self.root, bg=self.light_theme["bg"])
         top_button_frame.pack(anchor="ne", padx=10, pady=10)
@@ -210,11 +358,38 @@ class WatalappamBusinessApp:
         )
         self.receipt_button.pack(side="left", padx=5)
 
+        # Bulk Receipts Button
+        self.bulk_receipts_button = ttk.Button(
+            top_button_frame,
+            text="🗂️ Bulk Receipts",
+            command=self.open_bulk_receipts,
+            style="TButton",
+        )
+        self.bulk_receipts_button.pack(side="left", padx=5)
+
+        # Export Button
+        self.export_button = ttk.Button(
+            top_button_frame,
+            text="📤 Export",
+            command=self.export_orders_file,
+            style="TButton",
+        )
+        self.export_button.pack(side="left", padx=5)
+
+        # Import Button
+        self.import_button = ttk.Button(
+            top_button_frame,
+            text="📥 Import",
+            command=self.import_order_file,
+            style="TButton",
+        )
+        self.import_button.pack(side="left", padx=5)
+
         # Main form frame
         frame = tk.Frame(self.root, bg=self.light_theme["bg"], padx=20, pady=20)
         frame.pack()
 
-        # Left side fields: Customer Name, 500g Quantity, 1kg Quantity, Order Status
+        # Left side fields: Customer Name, product quantities, Order Status
         ttk.Label(
             frame,
             text="Customer Name:",
@@ -222,29 +397,20 @@ class WatalappamBusinessApp:
             foreground=self.light_theme["fg"],
             font=("Arial", 12),
         ).grid(row=0, column=0, padx=5, pady=5, sticky="w")
-        ttk.Entry(frame, textvariable=self.customer_name_var, font=("Arial", 12)).grid(
-            row=0, column=1, padx=5, pady=5
-        )
-        ttk.Label(
-            frame,
-            text="500g Quantity:",
-            background=self.light_theme["bg"],
-            foreground=self.light_theme["fg"],
-            font=("Arial", 12),
-        ).grid(row=1, column=0, padx=5, pady=5, sticky="w")
-        ttk.Entry(frame, textvariable=self.qty_500g_var, font=("Arial", 12)).grid(
-            row=1, column=1, padx=5, pady=5
-        )
+        self.customer_name_entry = ttk.Entry(frame, textvariable=self.customer_name_var, font=("Arial", 12))
+        self.customer_name_entry.grid(row=0, column=1, padx=5, pady=5)
         ttk.Label(
             frame,
-            text="1kg Quantity:",
+            text="Quantities:",
             background=self.light_theme["bg"],
             foreground=self.light_theme["fg"],
             font=("Arial", 12),
-        ).grid(row=2, column=0, padx=5, pady=5, sticky="w")
-        ttk.Entry(frame, textvariable=self.qty_1kg_var, font=("Arial", 12)).grid(
-            row=2, column=1, padx=5, pady=5
-        )
+        ).grid(row=1, column=0, padx=5, pady=5, sticky="nw")
+        # One quantity entry per catalog product, rebuilt when products are added
+        self.quantity_frame = tk.Frame(frame, bg=self.light_theme["bg"])
+        self.quantity_frame.grid(row=1, column=1, rowspan=2, padx=5, pady=5, sticky="n")
+        self.quantity_entries = {}
+        self.create_quantity_entries()
         ttk.Label(
             frame,
             text="Order Status:",
@@ -255,7 +421,7 @@ class WatalappamBusinessApp:
         status_combobox = ttk.Combobox(
             frame,
             textvariable=self.status_var,
-            values=["Pending", "In Progress", "Completed"],
+            values=STATUSES,
             font=("Arial", 12),
         )
         status_combobox.grid(row=3, column=1, padx=5, pady=5)
@@ -282,9 +448,18 @@ class WatalappamBusinessApp:
             foreground=self.light_theme["fg"],
             font=("Arial", 12),
         ).grid(row=0, column=2, padx=5, pady=5, sticky="w")
-        ttk.Entry(frame, textvariable=self.phone_number_var, font=("Arial", 12)).grid(
-            row=0, column=3, padx=5, pady=5
-        )
+        self.phone_number_entry = ttk.Entry(frame, textvariable=self.phone_number_var, font=("Arial", 12))
+        self.phone_number_entry.grid(row=0, column=3, padx=5, pady=5)
+        # Entries that get a red background while their value is invalid
+        self.form_entries = {"Phone Number": self.phone_number_entry}
+        # Customer suggestions, placed below whichever of the two is typed in
+        self.suggestion_list = tk.Listbox(self.root, height=6, font=("Arial", 11), activestyle="dotbox")
+        self.suggestion_list.bind("<ButtonRelease-1>", self.pick_customer)
+        self.suggestion_list.bind("<Return>", self.pick_customer)
+        self.suggestion_list.bind("<Escape>", self.hide_customer_suggestions)
+        for entry in (self.customer_name_entry, self.phone_number_entry):
+            entry.bind("<Down>", self.focus_customer_suggestions)
+            entry.bind("<Escape>", self.hide_customer_suggestions)
         ttk.Label(
             frame,
             text="Address:",
@@ -335,6 +510,27 @@ class WatalappamBusinessApp:
             command=self.reset_date_filter,
             style="TButton",
         ).pack(side="left", padx=5)
+        # Quick date range presets
+        self.date_preset_var = tk.StringVar(value="Quick Range")
+        date_preset_combobox = ttk.Combobox(
+            button_frame,
+            textvariable=self.date_preset_var,
+            values=PRESETS,
+            state="readonly",
+            width=12,
+            font=("Arial", 12),
+        )
+        date_preset_combobox.pack(side="left", padx=5)
+        date_preset_combobox.bind("<<ComboboxSelected>>", self.apply_date_preset)
+
+        # Validation errors and confirmations, shown without a popup
+        self.form_message_label = ttk.Label(
+            frame,
+            textvariable=self.form_message_var,
+            background=self.light_theme["bg"],
+            font=("Arial", 11),
+        )
+        self.form_message_label.grid(row=5, column=0, columnspan=4, sticky="w", padx=5)
 
         # Buttons
         button_frame = tk.Frame(self.root, bg=self.light_theme["bg"])
@@ -363,13 +559,13 @@ class WatalappamBusinessApp:
             style="TButton",
         ).pack(side="right", padx=5)
         ttk.Button(
-            right_buttons, text="Edit Prices", command=self.edit_prices, style="TButton"
+            right_buttons, text="Edit Products", command=self.edit_products, style="TButton"
         ).pack(side="right")
 
-        # Resizable Treeview with Scrollbars
+        # Resizable, virtualized order table with scrollbars
         tree_frame = tk.Frame(self.root, bg=self.light_theme["bg"])
         tree_frame.pack(fill="both", expand=True, padx=20, pady=10)
-        self.tree = ttk.Treeview(
+        self.order_table = VirtualOrderTable(
             tree_frame,
             columns=(
                 "Order No",
@@ -377,29 +573,13 @@ class WatalappamBusinessApp:
                 "Customer",
                 "Phone Number",
                 "Address",
-                "500g Qty",
-                "1kg Qty",
+                "Items",
                 "Total",
                 "Status",
             ),
-            show="headings",
-        )
-        self.tree.pack(side="top", fill="both", expand=True)
-        for col in self.tree["columns"]:
-            self.tree.heading(col, text=col)
-            self.tree.column(col, width=100)
-        # Add a vertical scrollbar
-        v_scrollbar = ttk.Scrollbar(tree_frame, orient="vertical", command=self.tree.yview)
-        v_scrollbar.pack(side="right", fill="y")
-        self.tree.configure(yscrollcommand=v_scrollbar.set)
-        # Add a horizontal scrollbar
-        h_scrollbar = ttk.Scrollbar(tree_frame, orient="horizontal", command=self.tree.xview)
-        h_scrollbar.pack(side="bottom", fill="x")
-        self.tree.configure(xscrollcommand=h_scrollbar.set)
-        # Bind the TreeviewSelect event to detect row selection
-        self.tree.bind("<<TreeviewSelect>>", self.on_order_select)
-        # Load recent orders
-        self.load_recent_orders()
+            on_select=self.on_order_select,
+        )
+        self.tree = self.order_table.tree
 
     def toggle_dark_mode(self):
         """Toggle between light and dark mode."""
@@ -431,203 +611,269 @@ class WatalappamBusinessApp:
 
     def add_order(self):
         """Add a new order to the system."""
-        try:
-            name = self.customer_name_var.get()
-            phone = self.phone_number_var.get()
-            address = self.address_var.get()
-            qty_500g = int(self.qty_500g_var.get() or 0)
-            qty_1kg = int(self.qty_1kg_var.get() or 0)
-            if qty_500g == 0 and qty_1kg == 0:  # Ensure at least one product is selected
-                messagebox.showerror(
-                    "Error", "Please select at least one product (500g or 1kg)."
-                )
-                return
-            total = float(self.total_var.get())
-            order_no = str(uuid.uuid4())[:8]
-            date = datetime.now().strftime("%Y-%m-%d")
-            status = self.status_var.get()  # Get the order status
-            # Ensure phone number is treated as an integer
-            phone = int(phone)  # Convert to integer
-            # Update the order data in Excel
-            df = pd.read_excel(self.excel_file)
-            new_order = pd.DataFrame(
-                [
-                    [
-                        order_no,
-                        date,
-                        name,
-                        phone,
-                        address,
-                        qty_500g,
-                        qty_1kg,
-                        total,
-                        status,
-                    ]
-                ],
-                columns=[
-                    "Order No",
-                    "Date",
-                    "Customer Name",
-                    "Phone Number",
-                    "Address",
-                    "500g Quantity",
-                    "1kg Quantity",
-                    "Total",
-                    "Status",
-                ],
-            )
-            df = pd.concat([df, new_order], ignore_index=True)
-            df.to_excel(self.excel_file, index=False)
-            self.load_recent_orders()
-            messagebox.showinfo("Success", "Order added successfully!")
-            self.clear_form()  # Clear form after adding order
-        except ValueError:
-            messagebox.showerror(
-                "Error", "Please enter valid numbers for quantities and phone number."
-            )
+        if not self.store_ready():
+            return
+        self.show_all_errors = True
+        if self.check_form():
+            return
+        order = {"Order No": new_order_number(), **self.form.fields()}
+        order_no = order["Order No"]
+        self.clear_form()  # Clear form after adding order
+
+        def on_done(result):
+            self.refresh_order_row(order_no)
+            self.show_form_message(f"Order {order_no} added.")
+
+        self.io.submit_write(self.store.add, order, on_done=on_done)
 
     def update_order(self):
         """Update an existing order."""
         if not self.selected_order:
-            messagebox.showerror("Error", "Please select an order to update.")
+            self.show_form_message("Please select an order to update.", error=True)
             return
-        try:
-            name = self.customer_name_var.get()
-            phone = self.phone_number_var.get()
-            address = self.address_var.get()
-            qty_500g = int(self.qty_500g_var.get() or 0)
-            qty_1kg = int(self.qty_1kg_var.get() or 0)
-            if qty_500g == 0 and qty_1kg == 0:
-                messagebox.showerror(
-                    "Error", "Please select at least one product (500g or 1kg)."
-                )
-                return
-            total = float(self.total_var.get())
-            order_no = self.selected_order
-            date = datetime.now().strftime("%Y-%m-%d")
-            status = self.status_var.get()
-            # Ensure phone number is treated as an integer
-            phone = int(phone)  # Convert to integer
-            df = pd.read_excel(self.excel_file)
-            df.loc[
-                df["Order No"] == order_no,
-                [
-                    "Date",
-                    "Customer Name",
-                    "Phone Number",
-                    "Address",
-                    "500g Quantity",
-                    "1kg Quantity",
-                    "Total",
-                    "Status",
-                ],
-            ] = [
-                date,
-                name,
-                phone,
-                address,
-                qty_500g,
-                qty_1kg,
-                total,
-                status,
-            ]
-            df.to_excel(self.excel_file, index=False)
-            self.load_recent_orders()
-            messagebox.showinfo("Success", "Order updated successfully!")
-            self.clear_form()  # Clear form after updating order
-        except ValueError:
-            messagebox.showerror(
-                "Error", "Please enter valid numbers for quantities and phone number."
+        self.show_all_errors = True
+        if self.check_form():
+            return
+        changes = self.form.fields()
+        order_no = self.selected_order
+
+        def on_done(result):
+            self.refresh_order_row(order_no)
+            self.show_form_message(f"Order {order_no} updated.")
+
+        self.io.submit_write(self.store.update, order_no, changes, on_done=on_done)
+
+    def create_quantity_entries(self):
+        """Lay out a quantity entry for every product in the catalog."""
+        for widget in self.quantity_frame.winfo_children():
+            widget.destroy()
+        self.quantity_entries = {}
+        for row, product_id in enumerate(self.catalog):
+            ttk.Label(
+                self.quantity_frame,
+                text=f"{self.catalog.name(product_id)}:",
+                background=self.light_theme["bg"],
+                foreground=self.light_theme["fg"],
+                font=("Arial", 11),
+            ).grid(row=row, column=0, padx=(0, 5), pady=2, sticky="w")
+            entry = ttk.Entry(
+                self.quantity_frame, textvariable=self.quantity_vars[product_id], width=6, font=("Arial", 12)
             )
+            entry.grid(row=row, column=1, pady=2)
+            self.quantity_entries[quantity_column(product_id)] = entry
+
+    def form_vars(self):
+        """Return the variables of the typed order details, in ``FORM_FIELDS`` order."""
+        return (
+            self.customer_name_var,
+            self.phone_number_var,
+            self.address_var,
+            self.status_var,
+        )
+
+    def form_values(self):
+        """Return the typed order details, in ``FORM_FIELDS`` order."""
+        return tuple(var.get() for var in self.form_vars())
 
     def delete_order(self):
         """Delete the selected order."""
         if not self.selected_order:
-            messagebox.showerror("Error", "Please select an order to delete.")
+            self.show_form_message("Please select an order to delete.", error=True)
             return
         # Confirm deletion
         confirm = messagebox.askyesno("Confirm Delete", "Are you sure you want to delete this order?")
         if not confirm:
             return
-        try:
-            # Remove the order from the Excel file
-            df = pd.read_excel(self.excel_file)
-            df = df[df["Order No"] != self.selected_order]  # Filter out the selected order
-            df.to_excel(self.excel_file, index=False)
-            # Reload the orders in the Treeview
-            self.load_recent_orders()
-            messagebox.showinfo("Success", "Order deleted successfully!")
-            self.clear_form()  # Clear form after deletion
-        except Exception as e:
+        order_no = self.selected_order
+        self.clear_form()  # Clear form after deletion
+
+        def on_done(result):
+            self.refresh_order_row(order_no)
+            self.show_form_message(f"Order {order_no} deleted.")
+
+        def on_error(e):
             messagebox.showerror("Error", f"An error occurred while deleting the order: {e}")
 
+        # Remove the order from the store, then from the table
+        self.io.submit_write(self.store.delete, order_no, on_done=on_done, on_error=on_error)
+
+    def refresh_order_row(self, order_no):
+        """Patch the order table for one changed order instead of reloading it."""
+        self.schedule_dashboard_refresh()
+        order = self.store.get(order_no)
+        shown = self.order_table.position(order_no) is not None
+        if order is None or not self.matches_filter(order):
+            if shown:
+                self.order_table.delete_row(order_no)
+        elif shown:
+            self.order_table.update_row(order_no, display_row(order))
+        else:
+            self.order_table.insert_row(order_no, display_row(order))
+
+    def matches_filter(self, order):
+        """Return True if the order belongs in the currently filtered view."""
+        if self.customer_filter is not None:
+            return phone_key(order["Phone Number"]) == self.customer_filter
+        if self.date_filter is None:
+            return True
+        start_date, end_date = self.date_filter
+        return start_date <= str(order["Date"]) <= end_date
+
     def load_recent_orders(self):
         """Load recent orders into the Treeview."""
-        df = pd.read_excel(self.excel_file)
-        for row in self.tree.get_children():
-            self.tree.delete(row)
-        for index, row in df.iterrows():
-            # Ensure phone number is treated as an integer and formatted correctly
-            try:
-                phone = int(row["Phone Number"])  # Convert to integer
-                phone_str = f"{phone:010d}"  # Format as 10-digit string with leading zeros
-            except (ValueError, TypeError):
-                phone_str = "Invalid"  # Handle invalid phone numbers gracefully
-            self.tree.insert(
-                "",
-                "end",
-                values=(
-                    row["Order No"],
-                    row["Date"],
-                    row["Customer Name"],
-                    phone_str,
-                    row["Address"],
-                    row["500g Quantity"],
-                    row["1kg Quantity"],
-                    row["Total"],
-                    row["Status"],
-                ),
-            )
+        self.date_filter = None
+        self.customer_filter = None
+        self.io.submit_read(
+            lambda: display_rows(self.store.to_frame()), on_done=self.show_rows
+        )
+
+    def show_rows(self, keys_and_rows):
+        """Show formatted rows produced by ``display_rows`` in the order table."""
+        keys, rows = keys_and_rows
+        self.order_table.set_rows(keys, rows)
 
     def filter_orders_by_date(self):
         """Filter orders by date range."""
+        if not self.store_ready():
+            return
         start_date = self.start_date_var.get()
         end_date = self.end_date_var.get()
         if not start_date or not end_date:
             messagebox.showerror("Error", "Please enter both start and end dates.")
             return
-        df = pd.read_excel(self.excel_file)
-        filtered_df = df[(df["Date"] >= start_date) & (df["Date"] <= end_date)]
-        for row in self.tree.get_children():
-            self.tree.delete(row)
-        for index, row in filtered_df.iterrows():
-            # Ensure phone number is treated as an integer and formatted correctly
-            try:
-                phone = int(row["Phone Number"])  # Convert to integer
-                phone_str = f"{phone:010d}"  # Format as 10-digit string with leading zeros
-            except (ValueError, TypeError):
-                phone_str = "Invalid"  # Handle invalid phone numbers gracefully
-            self.tree.insert(
-                "",
-                "end",
-                values=(
-                    row["Order No"],
-                    row["Date"],
-                    row["Customer Name"],
-                    phone_str,
-                    row["Address"],
-                    row["500g Quantity"],
-                    row["1kg Quantity"],
-                    row["Total"],
-                    row["Status"],
-                ),
+        try:
+            start_date, end_date = parse_date_range(start_date, end_date)
+        except ValueError as e:
+            messagebox.showerror("Error", str(e))
+            return
+        # Show the normalized dates that are actually being filtered on
+        self.start_date_var.set(start_date)
+        self.end_date_var.set(end_date)
+        self.date_filter = (start_date, end_date)
+        self.customer_filter = None
+        self.io.submit_read(
+            lambda: display_rows(self.store.between(start_date, end_date)),
+            on_done=self.show_rows,
+        )
+
+    def apply_date_preset(self, event=None):
+        """Fill the date fields from the selected quick range and filter."""
+        start_date, end_date = preset_range(self.date_preset_var.get())
+        self.start_date_var.set(start_date)
+        self.end_date_var.set(end_date)
+        self.filter_orders_by_date()
+
+    def export_orders_file(self):
+        """Export the orders in view to a CSV, Parquet or Excel file."""
+        if not self.store_ready():
+            return
+        path = filedialog.asksaveasfilename(
+            title="Export Orders",
+            defaultextension=".xlsx",
+            initialfile=os.path.basename(self.excel_file),
+            filetypes=[("Excel workbook", "*.xlsx"), ("CSV file", "*.csv"), ("Parquet file", "*.parquet")],
+        )
+        if not path:
+            return
+        start_date, end_date = self.date_filter or (None, None)
+        self.io.submit_read(
+            export_orders,
+            self.store,
+            path,
+            start_date,
+            end_date,
+            on_done=lambda manifest: messagebox.showinfo(
+                "Success", f"{manifest['rows']} orders exported to {path}"
+            ),
+            on_error=lambda e: messagebox.showerror(
+                "Error", f"An error occurred while exporting orders: {e}"
+            ),
+        )
+
+    def import_order_file(self):
+        """Add the orders in a CSV file or workbook, skipping invalid rows."""
+        if not self.store_ready():
+            return
+        path = filedialog.askopenfilename(
+            title="Import Orders",
+            filetypes=[("Order lists", "*.csv *.xlsx"), ("All files", "*.*")],
+        )
+        if not path:
+            return
+
+        def on_done(result):
+            added, errors = result
+            self.reload_view()
+            self.schedule_dashboard_refresh()
+            message = f"{added} orders imported."
+            if errors:
+                shown = "\n".join(f"Row {line}: {error}" for line, error in errors[:10])
+                more = f"\n...and {len(errors) - 10} more" if len(errors) > 10 else ""
+                message += f"\n{len(errors)} rows were rejected:\n{shown}{more}"
+                messagebox.showwarning("Import", message)
+            else:
+                messagebox.showinfo("Import", message)
+
+        # Queued as a write so it lands in order with other changes
+        self.io.submit_write(import_orders, self.store, path, self.catalog.copy(), on_done=on_done)
+
+    def reload_view(self):
+        """Reload the order table, keeping the date or customer filter."""
+        if self.customer_filter is not None:
+            self.show_customer_orders(self.customer_filter)
+        elif self.date_filter is None:
+            self.load_recent_orders()
+        else:
+            start_date, end_date = self.date_filter
+            self.io.submit_read(
+                lambda: display_rows(self.store.between(start_date, end_date)),
+                on_done=self.show_rows,
             )
 
+    def sync_orders(self):
+        """Save pending orders and read in those saved by other terminals.
+
+        Runs every ``SYNC_INTERVAL_MS``, queued behind the other writes
+        but without the busy indicator, which would flash on every poll.
+        """
+
+        def on_done(result):
+            self.show_synced(*result)
+            self.root.after(SYNC_INTERVAL_MS, self.sync_orders)
+
+        def on_error(e):
+            self.show_form_message(f"Could not sync orders: {e}", error=True)
+            self.root.after(SYNC_INTERVAL_MS, self.sync_orders)
+
+        self.io.submit_write(self.store.sync, on_done=on_done, on_error=on_error, quiet=True)
+
+    def show_synced(self, changed, conflicts):
+        """Show orders changed by other terminals and any merge conflicts."""
+        if len(changed) > SYNC_PATCH_ROWS:
+            self.reload_view()
+            self.schedule_dashboard_refresh()
+        else:
+            for order_no in changed:
+                self.refresh_order_row(order_no)
+        if self.selected_order in changed:
+            self.show_form_message(f"Order {self.selected_order} was changed on another terminal.", error=True)
+        for order_no, fields in conflicts:
+            if fields == ["restored"]:
+                message = f"Order {order_no} was changed on another terminal, so it was not deleted."
+            elif fields == ["deleted"]:
+                message = f"Order {order_no} was deleted on another terminal; your changes brought it back."
+            else:
+                message = f"Order {order_no} was also changed on another terminal; kept your {', '.join(fields)}."
+            self.show_form_message(message, error=True)
+
     def reset_date_filter(self):
         """Reset the date filter and reload all orders."""
+        if not self.store_ready():
+            return
         # Clear the date fields
         self.start_date_var.set("")
         self.end_date_var.set("")
+        self.date_preset_var.set("Quick Range")
         # Reload all orders into the Treeview
         self.load_recent_orders()
         # Optional: Show a confirmation message
@@ -635,238 +881,184 @@ class WatalappamBusinessApp:
 
     def clear_form(self):
         """Clear the form fields."""
+        self.hide_customer_suggestions()
+        self.autofilling = True
         self.customer_name_var.set("")
         self.phone_number_var.set("")
+        self.autofilling = False
         self.address_var.set("")
-        self.qty_500g_var.set("0")
-        self.qty_1kg_var.set("0")
-        self.total_var.set("0.00")
+        for var in self.quantity_vars.values():
+            var.set("0")
         self.status_var.set("Pending")
+        self.show_all_errors = False
+        self.form.set_date(None)
+        self.check_form()
         self.selected_order = None  # Reset selected order
+        self.order_table.clear_selection()
+
+    def on_order_select(self, order_no):
+        """Handle order selection from the order table."""
+        order_data = self.store.get(order_no)
+        if order_data is None:
+            return
+        self.selected_order = order_no
+        try:
+            phone_str = f"{int(order_data['Phone Number']):010d}"
+        except (ValueError, TypeError):
+            phone_str = ""
+        self.hide_customer_suggestions()
+        self.autofilling = True
+        self.customer_name_var.set(order_data["Customer Name"])
+        self.phone_number_var.set(phone_str)
+        self.autofilling = False
+        self.address_var.set(order_data["Address"])
+        for product_id, var in self.quantity_vars.items():
+            var.set(order_data["Items"].get(product_id, 0))
+        self.status_var.set(order_data["Status"])
+        self.show_all_errors = False
+        # Edits are priced as of the order date, not at today's prices
+        self.form.set_date(str(order_data["Date"]))
+        self.check_form()
+        # Show the total the order was placed at, not one at today's prices
+        self.total_var.set(order_data["Total"])
 
-    def on_order_select(self, event):
-        """Handle order selection from the Treeview."""
-        selected_item = self.tree.selection()[0]
-        order_data = self.tree.item(selected_item)["values"]
-        self.selected_order = order_data[0]
-        self.customer_name_var.set(order_data[2])
-        self.phone_number_var.set(order_data[3])  # Display phone number as is (string)
-        self.address_var.set(order_data[4])
-        self.qty_500g_var.set(order_data[5])
-        self.qty_1kg_var.set(order_data[6])
-        self.total_var.set(order_data[7])
-        self.status_var.set(order_data[8])
-
-    def edit_prices(self):
-        """Open the edit prices dialog."""
-        new_prices = EditPricesDialog(self.root, self.prices, self.save_prices)
-        self.root.wait_window(new_prices.top)
+    def schedule_customer_suggestions(self, *args):
+        """Look up matching customers once typing pauses."""
+        if self.autofilling:
+            return
+        if self.suggest_job is not None:
+            self.root.after_cancel(self.suggest_job)
+        self.suggest_job = self.root.after(SUGGEST_DELAY_MS, self.show_customer_suggestions)
 
-    def open_report_dashboard(self):
-        """Open the report dashboard."""
-        self.dashboard = tk.Toplevel(self.root)
-        self.dashboard.title("Report Dashboard")
-        self.dashboard.geometry("1000x800")
-        self.dashboard.configure(bg="#f0f0f0")
-        # Close Button
-        close_button = ttk.Button(
-            self.dashboard,
-            text="Close",
-            command=self.dashboard.destroy,
-            style="TButton",
+    def show_customer_suggestions(self):
+        """List the customers matching the name or phone number being typed."""
+        self.suggest_job = None
+        entry = self.root.focus_get()
+        if entry is self.customer_name_entry:
+            text = self.customer_name_var.get()
+        elif entry is self.phone_number_entry:
+            text = self.phone_number_var.get()
+        else:
+            return
+        if self.store is None:
+            return
+        self.customer_suggestions = self.store.find_customers(text) if len(text.strip()) >= 2 else []
+        if not self.customer_suggestions:
+            self.hide_customer_suggestions()
+            return
+        self.suggestion_list.delete(0, "end")
+        for customer in self.customer_suggestions:
+            self.suggestion_list.insert(
+                "end",
+                f"{customer['Customer Name']}  {phone_text(customer['Phone Number'])}  {customer['Address']}",
+            )
+        self.suggestion_list.configure(height=len(self.customer_suggestions))
+        self.suggestion_list.place(
+            x=entry.winfo_rootx() - self.root.winfo_rootx(),
+            y=entry.winfo_rooty() - self.root.winfo_rooty() + entry.winfo_height(),
         )
-        close_button.pack(anchor="ne", padx=10, pady=10)
-        # Load data for calculations
-        df = pd.read_excel(self.excel_file)
-        # Top Section: Metric Boxes (Left-Aligned)
-        box_frame = tk.Frame(self.dashboard, bg="#f0f0f0")
-        box_frame.pack(side="left", anchor="nw", padx=20, pady=20, fill="y")
-        # Total Orders Box
-        total_orders = len(df)
-        self.create_metric_box(box_frame, "Total Orders", total_orders, "#4CAF50")
-        # Total Sales Box
-        total_sales = df["Total"].sum()
-        self.create_metric_box(box_frame, "Total Sales (Rs)", f"{total_sales:.2f}", "#FF9800")
-        # Orders Today Box
-        today = datetime.now().strftime("%Y-%m-%d")
-        orders_today = len(df[df["Date"] == today])
-        self.create_metric_box(box_frame, "Orders Today", orders_today, "#2196F3")
-        # Sales Today Box
-        sales_today = df[df["Date"] == today]["Total"].sum()
-        self.create_metric_box(box_frame, "Sales Today (Rs)", f"{sales_today:.2f}", "#E91E63")
-        # Middle Section: Bar Chart and Pie Chart (Side-by-Side)
-        chart_frame = tk.Frame(self.dashboard, bg="#f0f0f0")
-        chart_frame.pack(side="top", fill="both", expand=True, padx=20, pady=20)
-        # Bar Chart (Left Side)
-        fig1, ax1 = plt.subplots(figsize=(6, 4))  # Adjust size for better fit
-        sales_by_date = df.groupby("Date")["Total"].sum()
-        # Create the bar chart
-        bars = ax1.bar(sales_by_date.index, sales_by_date.values, color="skyblue")
-        ax1.set_title("Sales by Date")
-        ax1.set_xlabel("Date")
-        ax1.set_ylabel("Total Sales (Rs)")
-        # Add exact numbers on top of each bar
-        ax1.bar_label(bars, fmt='%.2f', label_type='edge', fontsize=8)  # Display values with 2 decimal places
-        # Rotate x-axis labels for better readability
-        plt.xticks(rotation=45, ha="right")
-        # Add hover tooltips using mplcursors
-        cursor = mplcursors.cursor(bars, hover=True)
-        cursor.connect(
-            "add",
-            lambda sel: sel.annotation.set_text(
-                f"Date: {sales_by_date.index[sel.target.index]}\nRevenue: {sales_by_date.iloc[sel.target.index]:.2f} Rs"
-            ),
+        self.suggestion_list.lift()
+
+    def focus_customer_suggestions(self, event=None):
+        if self.customer_suggestions:
+            self.suggestion_list.focus_set()
+            self.suggestion_list.selection_clear(0, "end")
+            self.suggestion_list.selection_set(0)
+            self.suggestion_list.activate(0)
+
+    def hide_customer_suggestions(self, event=None):
+        self.customer_suggestions = []
+        self.suggestion_list.place_forget()
+
+    def pick_customer(self, event=None):
+        """Fill in the chosen customer's details and show their orders."""
+        selection = self.suggestion_list.curselection()
+        if not selection:
+            return
+        customer = self.customer_suggestions[selection[0]]
+        self.hide_customer_suggestions()
+        self.autofilling = True
+        self.customer_name_var.set(customer["Customer Name"])
+        self.phone_number_var.set(phone_text(customer["Phone Number"]))
+        self.autofilling = False
+        self.address_var.set(customer["Address"])
+        self.show_customer_orders(customer["Phone Number"])
+
+    def show_customer_orders(self, phone):
+        """Show only the orders of the customer with this phone number."""
+        self.date_filter = None
+        self.customer_filter = phone
+        self.io.submit_read(
+            lambda: display_rows(self.store.for_customer(phone)), on_done=self.show_rows
         )
-        canvas1 = FigureCanvasTkAgg(fig1, master=chart_frame)
-        canvas1.get_tk_widget().pack(side="left", fill="both", expand=True, padx=10)
-        # Pie Chart (Right Side)
-        fig2, ax2 = plt.subplots(figsize=(4, 4))
-        revenue_500g = (df["500g Quantity"] * self.prices["500g"]).sum()
-        revenue_1kg = (df["1kg Quantity"] * self.prices["1kg"]).sum()
-        revenue_breakdown = {"500g": revenue_500g, "1kg": revenue_1kg}
-        ax2.pie(revenue_breakdown.values(), labels=revenue_breakdown.keys(), autopct="%1.1f%%", startangle=90)
-        ax2.set_title("Revenue Breakdown")
-        canvas2 = FigureCanvasTkAgg(fig2, master=chart_frame)
-        canvas2.get_tk_widget().pack(side="right", fill="both", expand=True, padx=10)
-        # Bottom Section: Table Below the Bar Chart
-        table_frame = tk.Frame(self.dashboard, bg="#f0f0f0")
-        table_frame.pack(side="bottom", fill="both", expand=True, padx=20, pady=20)
-        # Create a Treeview for the table
-        self.table = ttk.Treeview(
-            table_frame,
-            columns=(
-                "Date",
-                "Total Sales (Rs)",
-            ),
-            show="headings",
-        )
-        self.table.pack(side="top", fill="both", expand=True)
-        # Configure column headings
-        self.table.heading("Date", text="Date")
-        self.table.heading("Total Sales (Rs)", text="Total Sales (Rs)")
-        self.table.column("Date", width=150)
-        self.table.column("Total Sales (Rs)", width=150)
-        # Populate the table with data
-        for index, row in sales_by_date.items():
-            self.table.insert("", "end", values=(index, f"{row:.2f}"))
-
-    def create_metric_box(self, parent, title, value, color):
-        """Create a metric box with a title, value, and background color."""
-        box = tk.Frame(parent, bg=color, padx=20, pady=20)
-        box.pack(side="top", padx=10, pady=10, fill="both", expand=True)
-        ttk.Label(box, text=title, font=("Arial", 14, "bold"), background=color, foreground="white").pack()
-        ttk.Label(box, text=value, font=("Arial", 18), background=color, foreground="white").pack()
+
+    def edit_products(self):
+        """Open the dialog for editing the product catalog."""
+        dialog = EditProductsDialog(self.root, self.catalog, self.save_catalog)
+        self.root.wait_window(dialog.top)
+
+    def open_report_dashboard(self):
+        """Load the report figures in the background, then open the dashboard."""
+        if not self.store_ready():
+            return
+        self.io.submit_read(self.report_data, on_done=self.show_report_dashboard)
+
+    def report_data(self):
+        """Read the figures shown on the report dashboard from the rollups."""
+        return sales_report(self.store, self.catalog)
+
+    def show_report_dashboard(self, data):
+        """Show the report dashboard, creating it the first time."""
+        if self.dashboard is None or not self.dashboard.is_alive():
+            # matplotlib is only loaded once the dashboard is first opened
+            from dashboard import ReportDashboard
+
+            self.dashboard = ReportDashboard(self.root)
+        self.dashboard.update(data)
+        self.dashboard.show()
+
+    def schedule_dashboard_refresh(self):
+        """Refresh an open dashboard shortly after orders change.
+
+        Several changes in quick succession are folded into one refresh.
+        """
+        if self.dashboard_refresh_job is not None:
+            self.root.after_cancel(self.dashboard_refresh_job)
+        self.dashboard_refresh_job = self.root.after(300, self.refresh_dashboard)
+
+    def refresh_dashboard(self):
+        """Reload the figures of the dashboard if it is on screen."""
+        self.dashboard_refresh_job = None
+        if self.dashboard is not None and self.dashboard.is_visible():
+            self.io.submit_read(self.report_data, on_done=self.dashboard.update)
 
     def generate_receipt(self):
         """Generate a receipt for the selected order and save it as an image."""
         if not self.selected_order:
-            messagebox.showerror("Error", "Please select an order to generate a receipt.")
+            self.show_form_message("Please select an order to generate a receipt.", error=True)
             return
 
         # Load the selected order data
-        df = pd.read_excel(self.excel_file)
-        try:
-            order_data = df[df["Order No"] == self.selected_order].iloc[0]
-        except IndexError:
-            messagebox.showerror("Error", "Selected order not found in the database.")
+        order_data = self.store.get(self.selected_order)
+        if order_data is None:
+            self.show_form_message("The selected order no longer exists.", error=True)
             return
 
-        # Create a blank image for the receipt
-        img_width, img_height = 600, 900  # Adjusted height for compact receipt
-        receipt_image = Image.new("RGB", (img_width, img_height), "white")
-        draw = ImageDraw.Draw(receipt_image)
-
-        # Load the logo
-        try:
-            logo = Image.open("logo.jpg")
-            logo = logo.resize((100, 100))
-            receipt_image.paste(logo, (20, 20))  # Paste the logo at the top-left corner
-        except Exception as e:
-            print(f"Error loading logo: {e}")
-
-        # Set up fonts with increased sizes
-        title_font = ImageFont.truetype("arial.ttf", 30)  # Larger font for title
-        content_font = ImageFont.truetype("arial.ttf", 20)  # Larger font for content
-        small_font = ImageFont.truetype("arial.ttf", 16)  # Slightly larger font for small text
-
-        # Header Section
-        draw.text((580, 40), "INVOICE", fill="black", font=title_font, anchor="rm")  # Right-aligned INVOICE
-        draw.text((580, 80), f"Date: {order_data['Date']}", fill="black", font=content_font, anchor="rm")  # Right-aligned date below INVOICE
-
-        # Information Section
-        y_offset = 140  # Start lower to accommodate larger fonts
-        details = [
-            f"Order No: {order_data.get('Order No', 'N/A')}",
-            f"Customer Name: {order_data.get('Customer Name', 'N/A')}",
-            f"Phone Number: {order_data.get('Phone Number', 'N/A')}",
-            f"Address: {order_data.get('Address', 'N/A')}",
-            "",
-            "Items Ordered:",
-        ]
-        for detail in details:
-            draw.text((20, y_offset), detail, fill="black", font=content_font)
-            y_offset += 35  # Increased spacing for larger fonts
-
-        # Table for Items
-        headers = ["Item", "Qty", "Price", "Total"]
-        column_widths = [250, 70, 100, 100]  # Adjust column widths for better alignment
-        x_offset = 20
-        for i, header in enumerate(headers):
-            draw.text((x_offset, y_offset), header, fill="black", font=content_font)
-            x_offset += column_widths[i]
-        y_offset += 35  # Increased spacing for larger fonts
-        x_offset = 20
-
-        # Rows (Only include items with non-zero quantities)
-        items = []
-        if order_data.get('500g Quantity', 0) > 0:
-            items.append(("500g Watalappam", order_data.get('500g Quantity', 0), self.prices["500g"], order_data.get('500g Quantity', 0) * self.prices["500g"]))
-        if order_data.get('1kg Quantity', 0) > 0:
-            items.append(("1kg Watalappam", order_data.get('1kg Quantity', 0), self.prices["1kg"], order_data.get('1kg Quantity', 0) * self.prices["1kg"]))
-
-        for item in items:
-            draw.text((x_offset, y_offset), item[0], fill="black", font=small_font)
-            draw.text((x_offset + column_widths[0], y_offset), str(item[1]), fill="black", font=small_font)
-            draw.text((x_offset + column_widths[0] + column_widths[1], y_offset), f"{item[2]:.2f}", fill="black", font=small_font)
-            draw.text((x_offset + column_widths[0] + column_widths[1] + column_widths[2], y_offset), f"{item[3]:.2f}", fill="black", font=small_font)
-            y_offset += 35  # Increased spacing for larger fonts
-
-        # Total Amount
-        y_offset += 20
-        total_label = "Total Amount:"
-        total_value = f"{order_data.get('Total', 0):.2f}"  # Removed "Rs" here
-        # Calculate positions for better alignment
-        total_label_x = 20
-        total_value_x = 400  # Fixed position for the value
-        draw.text((total_label_x, y_offset), total_label, fill="black", font=content_font)
-        draw.text((total_value_x, y_offset), total_value, fill="black", font=content_font)
-
-        # Thank You Message
-        y_offset += 50
-        thank_you_message = "Thank you for your order!"
-        draw.text((20, y_offset), thank_you_message, fill="black", font=title_font)
-
-        # Contact Information
-        y_offset += 60
-        try:
-            whatsapp_logo = Image.open("whatsapp_logo.png").convert("RGBA")  # Ensure transparency
-            whatsapp_logo = whatsapp_logo.resize((40, 40))  # Larger logo size
-            receipt_image.paste(whatsapp_logo, (20, y_offset), whatsapp_logo)  # Use mask for transparency
-        except Exception as e:
-            print(f"Error loading WhatsApp logo: {e}")
-        draw.text((70, y_offset + 5), "WhatsApp - 0705081870", fill="black", font=small_font)
-        try:
-            email_logo = Image.open("email_logo.png").convert("RGBA")  # Ensure transparency
-            email_logo = email_logo.resize((40, 40))  # Larger logo size
-            receipt_image.paste(email_logo, (20, y_offset + 50), email_logo)  # Use mask for transparency
-        except Exception as e:
-            print(f"Error loading Email logo: {e}")
-        draw.text((70, y_offset + 55), "Email - dessertsmore522@gmail.com", fill="black", font=small_font)
+        self.io.submit_read(
+            render_receipt,
+            order_data,
+            self.catalog.copy(),
+            self.receipt_folder,
+            on_done=lambda receipt_filename: messagebox.showinfo(
+                "Success", f"Receipt generated successfully! Saved as {receipt_filename}"
+            ),
+        )
 
-        # Save the receipt image
-        receipt_filename = f"{self.receipt_folder}{order_data.get('Order No', 'unknown')}_receipt.png"
-        receipt_image.save(receipt_filename)
-        messagebox.showinfo("Success", f"Receipt generated successfully! Saved as {receipt_filename}")
+    def open_bulk_receipts(self):
+        """Open the dialog for rendering receipts for many orders at once."""
+        if not self.store_ready():
+            return
+        BulkReceiptsDialog(self.root, self)
 
     def show_developer_info(self):
         """Show developer information in a new window."""
@@ -893,35 +1085,176 @@ class WatalappamBusinessApp:
         close_button.pack(pady=10)
 
 
-class EditPricesDialog:
-    def __init__(self, parent, prices, save_prices_callback):
+class BulkReceiptsDialog:
+    def __init__(self, parent, app):
+        self.top = tk.Toplevel(parent)
+        self.top.title("Bulk Receipts")
+        self.top.geometry("350x310")
+        self.app = app
+        self.start_var = tk.StringVar(value=app.start_date_var.get())
+        self.end_var = tk.StringVar(value=app.end_date_var.get())
+        self.status_var = tk.StringVar(value="All")
+        self.format_var = tk.StringVar(value="PNG images")
+        # Progress is reported from a worker thread and shown by polling
+        self.progress = queue.Queue()
+        self.create_widgets()
+
+    def create_widgets(self):
+        ttk.Label(self.top, text="From (leave empty for all dates):").pack(pady=2)
+        ttk.Entry(self.top, textvariable=self.start_var).pack(pady=2)
+        ttk.Label(self.top, text="To:").pack(pady=2)
+        ttk.Entry(self.top, textvariable=self.end_var).pack(pady=2)
+        ttk.Label(self.top, text="Status:").pack(pady=2)
+        ttk.Combobox(
+            self.top, textvariable=self.status_var, values=["All"] + STATUSES, state="readonly"
+        ).pack(pady=2)
+        ttk.Label(self.top, text="Save as:").pack(pady=2)
+        ttk.Combobox(
+            self.top, textvariable=self.format_var, values=["PNG images", "One PDF file"], state="readonly"
+        ).pack(pady=2)
+        self.progress_bar = ttk.Progressbar(self.top, mode="determinate", length=250)
+        self.progress_bar.pack(pady=5)
+        self.progress_label = ttk.Label(self.top, text="")
+        self.progress_label.pack()
+        self.start_button = ttk.Button(self.top, text="Generate", command=self.generate)
+        self.start_button.pack(pady=5)
+
+    def generate(self):
+        start, end = self.start_var.get().strip(), self.end_var.get().strip()
+        try:
+            if start or end:
+                start, end = parse_date_range(start or "0001-01-01", end or "9999-12-31")
+        except ValueError as e:
+            messagebox.showerror("Error", str(e), parent=self.top)
+            return
+        status = None if self.status_var.get() == "All" else self.status_var.get()
+        pdf_path = None
+        if self.format_var.get() == "One PDF file":
+            pdf_path = filedialog.asksaveasfilename(
+                parent=self.top,
+                defaultextension=".pdf",
+                filetypes=[("PDF files", "*.pdf")],
+                initialfile="receipts.pdf",
+            )
+            if not pdf_path:
+                return
+        self.start_button.configure(state="disabled")
+        self.app.io.submit_read(
+            self.render,
+            start or None,
+            end or None,
+            status,
+            pdf_path,
+            on_done=self.finished,
+            on_error=self.failed,
+        )
+        self.poll_progress()
+
+    def render(self, start, end, status, pdf_path=None):
+        orders = select_orders(self.app.store, start, end, status)
+        self.progress.put((0, len(orders)))
+        on_progress = lambda done, total: self.progress.put((done, total))
+        if pdf_path:
+            pages = export_receipts_pdf(orders, self.app.catalog.copy(), pdf_path, on_progress)
+            return f"{pages} receipts saved to {pdf_path}", {}
+        filenames, failures = render_receipts(
+            orders, self.app.catalog.copy(), self.app.receipt_folder, on_progress=on_progress
+        )
+        return f"{len(filenames)} receipts saved in {self.app.receipt_folder}", failures
+
+    def poll_progress(self):
+        if not self.top.winfo_exists():
+            return
+        while not self.progress.empty():
+            done, total = self.progress.get_nowait()
+            self.progress_bar.configure(maximum=max(total, 1), value=done)
+            self.progress_label.configure(text=f"{done} of {total} receipts")
+        if str(self.start_button["state"]) == "disabled":
+            self.top.after(100, self.poll_progress)
+
+    def finished(self, result):
+        message, failures = result
+        if self.top.winfo_exists():
+            self.start_button.configure(state="normal")
+        if failures:
+            message += f"\n{len(failures)} failed, for example order {next(iter(failures))}: {next(iter(failures.values()))}"
+            messagebox.showwarning("Bulk Receipts", message)
+        else:
+            messagebox.showinfo("Bulk Receipts", message)
+
+    def failed(self, error):
+        if self.top.winfo_exists():
+            self.start_button.configure(state="normal")
+        messagebox.showerror("Error", f"An error occurred: {error}")
+
+
+class EditProductsDialog:
+    def __init__(self, parent, catalog, save_catalog_callback):
         self.top = tk.Toplevel(parent)
-        self.top.title("Edit Prices")
-        self.top.geometry("300x200")
-        self.prices = prices
-        self.save_prices_callback = save_prices_callback
-        self.price_500g_var = tk.StringVar(value=str(prices["500g"]))
-        self.price_1kg_var = tk.StringVar(value=str(prices["1kg"]))
+        self.top.title("Edit Products")
+        self.top.geometry("420x360")
+        self.catalog = catalog
+        self.save_catalog_callback = save_catalog_callback
+        # Name and price of each product, keyed by product id
+        self.product_vars = {
+            product_id: (tk.StringVar(value=product["name"]), tk.StringVar(value=str(product["price"])))
+            for product_id, product in catalog.products.items()
+        }
+        self.new_id_var = tk.StringVar()
+        self.new_name_var = tk.StringVar()
+        self.new_price_var = tk.StringVar()
+        self.effective_var = tk.StringVar(value=date.today().isoformat())
         self.create_widgets()
 
     def create_widgets(self):
-        ttk.Label(self.top, text="500g Price:").pack(pady=5)
-        ttk.Entry(self.top, textvariable=self.price_500g_var).pack(pady=5)
-        ttk.Label(self.top, text="1kg Price:").pack(pady=5)
-        ttk.Entry(self.top, textvariable=self.price_1kg_var).pack(pady=5)
-        ttk.Button(self.top, text="Save", command=self.save_prices).pack(pady=10)
+        table = ttk.Frame(self.top)
+        table.pack(padx=10, pady=10)
+        for column, header in enumerate(["Product", "Name", "Price"]):
+            ttk.Label(table, text=header).grid(row=0, column=column, padx=5, pady=5)
+        for row, (product_id, (name_var, price_var)) in enumerate(self.product_vars.items(), 1):
+            ttk.Label(table, text=product_id).grid(row=row, column=0, padx=5, pady=2, sticky="w")
+            ttk.Entry(table, textvariable=name_var, width=22).grid(row=row, column=1, padx=5, pady=2)
+            ttk.Entry(table, textvariable=price_var, width=10).grid(row=row, column=2, padx=5, pady=2)
+        ttk.Label(self.top, text="New product (id, name, price):").pack(pady=5)
+        new_row = ttk.Frame(self.top)
+        new_row.pack()
+        ttk.Entry(new_row, textvariable=self.new_id_var, width=8).pack(side="left", padx=2)
+        ttk.Entry(new_row, textvariable=self.new_name_var, width=22).pack(side="left", padx=2)
+        ttk.Entry(new_row, textvariable=self.new_price_var, width=10).pack(side="left", padx=2)
+        # Orders placed before this date keep the prices they were placed at
+        effective_row = ttk.Frame(self.top)
+        effective_row.pack(pady=5)
+        ttk.Label(effective_row, text="New prices apply from:").pack(side="left", padx=2)
+        ttk.Entry(effective_row, textvariable=self.effective_var, width=12).pack(side="left", padx=2)
+        ttk.Button(self.top, text="Save", command=self.save_products).pack(pady=10)
 
-    def save_prices(self):
+    def save_products(self):
         try:
-            price_500g = float(self.price_500g_var.get())
-            price_1kg = float(self.price_1kg_var.get())
-            self.prices["500g"] = price_500g
-            self.prices["1kg"] = price_1kg
-            self.save_prices_callback()
-            self.top.destroy()
-            messagebox.showinfo("Success", "Prices updated successfully!")
+            effective = parse_date(self.effective_var.get()).isoformat()
+            products = {
+                product_id: (name_var.get().strip(), float(price_var.get()))
+                for product_id, (name_var, price_var) in self.product_vars.items()
+            }
+            new_id = self.new_id_var.get().strip()
+            if new_id:
+                products[new_id] = (self.new_name_var.get().strip() or new_id, float(self.new_price_var.get()))
         except ValueError:
-            messagebox.showerror("Error", "Please enter valid prices.")
+            messagebox.showerror(
+                "Error", "Please enter valid product ids, prices and date.", parent=self.top
+            )
+            return
+        # Edit a copy, so nothing changes unless every value is valid
+        catalog = self.catalog.copy()
+        try:
+            for product_id, (name, price) in products.items():
+                # A new product's first price applies to every date
+                catalog.set(product_id, name or product_id, price, effective if product_id in catalog else None)
+        except ValueError as e:
+            messagebox.showerror("Error", str(e), parent=self.top)
+            return
+        self.save_catalog_callback(catalog)
+        self.top.destroy()
+        messagebox.showinfo("Success", "Products updated successfully!")
 
 
 if __name__ == "__main__":